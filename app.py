@@ -1,22 +1,149 @@
-from flask import Flask, render_template, request, jsonify, send_file, session
+from flask import Flask, render_template, request, jsonify, send_file, session, Response, stream_with_context, g
+import json
 import os
+import tempfile
+import threading
+import time
 import config
 from services.screening_engine import ScreeningEngine
+from services.job_manager import ScreeningJobManager
+from services.gdpr_service import get_gdpr_service
+from services.export_service import ExportService
+from services.retention import RetentionJanitor
+from utils import metrics, profiling
 from utils.file_handler import FileHandler
 from utils.output_generator import OutputGenerator
+from utils.results_store import ResultsStore
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = config.SECRET_KEY
 app.config['UPLOAD_FOLDER'] = config.UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = config.MAX_FILE_SIZE * 50  # Allow multiple files
 
-# Initialize services
-screening_engine = ScreeningEngine()
-file_handler = FileHandler()
-output_generator = OutputGenerator()
+# Services are created by create_app(). Importing this module must stay free
+# of side effects: parser worker processes (forkserver/spawn) re-import __main__
+screening_engine = None
+file_handler = None
+output_generator = None
+results_store = None
+job_manager = None
+export_service = None
+retention_janitor = None
+_services_ready = False
+_create_lock = threading.Lock()
 
-# Store results in session (for demo - in production use database)
-screening_results = {}
+
+def create_app() -> Flask:
+    """
+    Create the services and start background work, once per process
+
+    Run under a WSGI server with the factory, e.g. gunicorn 'app:create_app()'.
+    Serving the module-level app directly (flask run, gunicorn app:app) also
+    works: the first request calls this.
+    """
+    global _services_ready
+    with _create_lock:
+        if not _services_ready:
+            _create_services()
+            _services_ready = True
+    return app
+
+
+def _create_services():
+    global screening_engine, file_handler, output_generator, results_store
+    global job_manager, export_service, retention_janitor
+
+    os.makedirs(config.UPLOAD_FOLDER, exist_ok=True)
+    os.makedirs(config.OUTPUT_FOLDER, exist_ok=True)
+    os.makedirs(config.GDPR_CHROMA_PATH, exist_ok=True)
+
+    screening_engine = ScreeningEngine()
+    file_handler = FileHandler()
+    output_generator = OutputGenerator()
+
+    # Results live in SQLite so every app process can serve them
+    results_store = ResultsStore()
+    # Sessions left queued or running by a process that has since exited will never finish
+    orphaned = results_store.fail_orphaned()
+    if orphaned:
+        print(f"Marked {orphaned} interrupted screening session(s) as failed")
+    job_manager = ScreeningJobManager(screening_engine, store=results_store)
+    export_service = ExportService(results_store, output_generator)
+
+    # Expire old uploads, exports, reports and results so disk and memory stay flat
+    retention_janitor = RetentionJanitor(file_handler, results_store, job_manager,
+                                         export_folder=export_service.export_folder)
+    if config.RETENTION_ENABLED:
+        retention_janitor.start()
+    elif config.RESULTS_MAX_AGE_SECONDS:
+        # Without the janitor, stored results still expire on startup and after each save
+        results_store.evict_older_than(config.RESULTS_MAX_AGE_SECONDS)
+
+    # Load the GDPR model and index in the background so the first question doesn't wait
+    if config.GDPR_WARMUP:
+        get_gdpr_service().start()
+
+
+@app.before_request
+def ensure_services():
+    if not _services_ready:
+        create_app()
+
+
+HTTP_IN_FLIGHT = metrics.gauge('hrms_http_requests_in_flight', 'HTTP requests currently being handled')
+HTTP_SECONDS = metrics.histogram('hrms_http_request_duration_seconds', 'HTTP request duration',
+                                 ['endpoint', 'method', 'status'])
+
+# Monitoring endpoints that would only add noise to the profile list
+UNPROFILED_ENDPOINTS = {'metrics_endpoint', 'profiles_index', 'download_profile', 'static'}
+
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    HTTP_IN_FLIGHT.inc()
+    if request.endpoint not in UNPROFILED_ENDPOINTS and (config.PROFILING_ENABLED or is_profiling_admin()):
+        profiling.start({'endpoint': request.endpoint or 'unknown', 'method': request.method,
+                         'path': request.path})
+
+
+@app.after_request
+def record_request_duration(response):
+    started = g.get('request_started')
+    if started is not None:
+        HTTP_SECONDS.observe(time.perf_counter() - started, endpoint=request.endpoint or 'unknown',
+                             method=request.method, status=response.status_code)
+    profile = profiling.current()
+    if profile is not None:
+        profile.label['status'] = response.status_code
+        response.headers['X-Profile-Id'] = profile.profile_id
+    return response
+
+
+@app.teardown_request
+def finish_request(error=None):
+    if g.pop('request_started', None) is not None:
+        HTTP_IN_FLIGHT.dec()
+    profiling.finish()
+
+
+def is_profiling_admin() -> bool:
+    """Whether the request carries the profiling admin token (header only, so it stays out of logs)"""
+    token = config.PROFILING_ADMIN_TOKEN
+    return bool(token) and request.headers.get('X-Profile-Token') == token
+
+
+def sse_response(events):
+    """Stream (event, data) tuples to the client as server-sent events"""
+    def generate():
+        for event, data in events:
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 
 @app.route('/')
@@ -52,6 +179,7 @@ def screen_resumes():
         min_experience = int(request.form.get('min_experience', 0))
         max_experience = int(request.form.get('max_experience', 20))
         organizations = request.form.get('organizations', '')
+        bypass_cache = request.form.get('bypass_cache', '').lower() in ('1', 'true', 'on')
         
         # Parse organizations
         org_list = [org.strip() for org in organizations.split(',') if org.strip()] if organizations else None
@@ -65,83 +193,174 @@ def screen_resumes():
         if not job_description:
             return jsonify({'error': 'Job description is required'}), 400
         
-        # Save files
-        saved_paths, session_id = file_handler.save_files(files)
+        # Save files (content-addressed, hashed while writing); the save is
+        # timed into the session's metrics alongside the screening stages
+        upload_metrics = metrics.SessionMetrics()
+        with metrics.recording(upload_metrics):
+            uploads, session_id = file_handler.save_uploads(files)
+        saved_paths = [upload['path'] for upload in uploads]
         
         if not saved_paths:
             return jsonify({'error': 'No valid files uploaded'}), 400
         
-        # Screen resumes
-        results = screening_engine.screen_resumes(
+        # Store results once screening finishes
+        def store_results(job_id, results):
+            if 'metrics' in results:
+                results['metrics']['stages'].update(upload_metrics.summary()['stages'])
+            results_store.save_results(job_id, results, saved_paths)
+            if not config.RETENTION_ENABLED and config.RESULTS_MAX_AGE_SECONDS:
+                results_store.evict_older_than(config.RESULTS_MAX_AGE_SECONDS)
+            if config.EXPORTS_PRECOMPUTE:
+                # Build downloads off the job thread so completion isn't delayed
+                threading.Thread(target=profiling.bind(export_service.build_all), args=(job_id,), daemon=True).start()
+        
+        # Screen resumes in the background; progress is reported per candidate
+        job_manager.submit(
+            job_id=session_id,
             resume_files=saved_paths,
             job_description=job_description,
             min_experience=min_experience,
             max_experience=max_experience,
-            preferred_organizations=org_list
+            preferred_organizations=org_list,
+            on_complete=store_results,
+            use_cache=not bypass_cache,
+            content_hashes={upload['path']: upload['sha256'] for upload in uploads}
         )
         
-        # Store results
-        screening_results[session_id] = {
-            'results': results,
-            'file_paths': saved_paths
-        }
-        
-        return jsonify({'session_id': session_id})
+        return jsonify({
+            'session_id': session_id,
+            'duplicates': sum(1 for upload in uploads if upload['duplicate']),
+            'status_url': f'/screen/status/{session_id}',
+            'events_url': f'/screen/events/{session_id}'
+        }), 202
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/screen/status/<session_id>')
+def screening_status(session_id):
+    """Report progress and partial results of a screening job"""
+    job = job_manager.get_status(session_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    return jsonify(job)
+
+
+@app.route('/screen/events/<session_id>')
+def screening_events(session_id):
+    """Stream per-candidate progress of a screening job as server-sent events"""
+    if job_manager.get_status(session_id, include_candidates=False) is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    return Response(
+        stream_with_context(job_manager.iter_events(session_id)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 @app.route('/results/<session_id>')
 def show_results(session_id):
     """Display screening results"""
-    if session_id not in screening_results:
-        return "Results not found", 404
+    page = max(1, request.args.get('page', 1, type=int))
+    page_size = config.RESULTS_PAGE_SIZE
+    offset = (page - 1) * page_size
     
-    results = screening_results[session_id]['results']
-    return render_template('results.html', results=results, session_id=session_id)
+    results = results_store.get_results(session_id, offset=offset, limit=page_size)
+    if results is None:
+        job = job_manager.get_status(session_id, include_candidates=False)
+        if job is None or job['status'] == 'completed':
+            return "Results not found", 404
+        
+        # Still screening: the page fills in candidates from the event stream
+        pending = {'candidates': [], 'top_candidate': None, 'total_candidates': job['total']}
+        return render_template('results.html', results=pending, session_id=session_id, job=job,
+                               page=1, pages=1, offset=0)
+    
+    pages = max(1, -(-results['total_candidates'] // page_size))
+    return render_template('results.html', results=results, session_id=session_id, job=None,
+                           page=page, pages=pages, offset=offset)
 
 
 @app.route('/candidate-report/<session_id>/<int:candidate_index>')
 def candidate_report(session_id, candidate_index):
     """Show detailed report for a candidate"""
-    if session_id not in screening_results:
+    session_info = results_store.get_session(session_id)
+    if session_info is None or session_info['status'] != 'completed':
         return "Results not found", 404
     
-    results = screening_results[session_id]['results']
-    candidates = results.get('candidates', [])
-    
-    if candidate_index >= len(candidates):
+    candidate = results_store.get_candidate(session_id, candidate_index)
+    if candidate is None:
         return "Candidate not found", 404
     
-    candidate = candidates[candidate_index]
     html_report = output_generator.generate_candidate_report(candidate, session_id)
     
     return html_report
 
 
+def send_export(session_id, kind, download_name=None, **kwargs):
+    """Serve a stored export with ETag / Last-Modified so repeat downloads get 304s"""
+    filepath = export_service.get_export(session_id, kind)
+    if filepath is None:
+        return "Results not found", 404
+    
+    return send_file(
+        filepath,
+        as_attachment=True,
+        download_name=download_name or export_service.download_name(session_id, kind),
+        conditional=True,
+        etag=True,
+        max_age=0,
+        **kwargs
+    )
+
+
 @app.route('/download/excel/<session_id>')
 def download_excel(session_id):
     """Download Excel report"""
-    if session_id not in screening_results:
-        return "Results not found", 404
-    
-    results = screening_results[session_id]['results']
-    filepath = output_generator.generate_excel(results, session_id)
+    if config.EXCEL_DIRECT_DOWNLOAD:
+        session_info = results_store.get_session(session_id)
+        if session_info is None or session_info['status'] != 'completed':
+            return "Results not found", 404
+        
+        # Build the file in an anonymous temp file and stream it straight out
+        candidates = lambda: results_store.iter_candidates(session_id)
+        buffer = tempfile.TemporaryFile()
+        output_generator.write_excel_stream(candidates, buffer)
+        buffer.seek(0)
+        return send_file(
+            buffer,
+            as_attachment=True,
+            download_name=f"screening_results_{session_id}.xlsx",
+            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        )
     
-    return send_file(filepath, as_attachment=True)
+    return send_export(session_id, 'xlsx')
 
 
 @app.route('/download/json/<session_id>')
 def download_json(session_id):
-    """Download JSON report"""
-    if session_id not in screening_results:
-        return "Results not found", 404
+    """
+    Download JSON report
     
-    results = screening_results[session_id]['results']
-    filepath = output_generator.generate_json(results, session_id)
+    ?compressed=1 downloads a .json.gz file; otherwise clients that accept
+    gzip get the compressed artifact with Content-Encoding: gzip.
+    """
+    if request.args.get('compressed', '').lower() in ('1', 'true'):
+        return send_export(session_id, 'json.gz', mimetype='application/gzip')
     
-    return send_file(filepath, as_attachment=True)
+    if 'gzip' not in request.accept_encodings:
+        return send_export(session_id, 'json')
+    
+    response = send_export(session_id, 'json.gz', export_service.download_name(session_id, 'json'),
+                           mimetype='application/json')
+    if isinstance(response, tuple):
+        return response
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
 
 
 @app.route('/gdpr-chatbot/ask', methods=['POST'])
@@ -154,17 +373,75 @@ def gdpr_chatbot_ask():
         if not question:
             return jsonify({'error': 'No question provided'}), 400
         
-        # Import GDPR service
-        from services.gdpr_service import GDPRChatbotService
-        gdpr_bot = GDPRChatbotService()
-        
-        result = gdpr_bot.ask_question(question)
+        result = get_gdpr_service().ask_question(question)
+        if result.get('not_ready'):
+            return jsonify(result), 503, {'Retry-After': '5'}
         return jsonify(result)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/gdpr-chatbot/ask/stream', methods=['POST'])
+def gdpr_chatbot_ask_stream():
+    """Stream the answer to a GDPR question token by token"""
+    data = request.get_json() or {}
+    question = data.get('question', '')
+    
+    if not question:
+        return jsonify({'error': 'No question provided'}), 400
+    
+    gdpr_bot = get_gdpr_service()
+    if not gdpr_bot.is_ready():
+        gdpr_bot.start()
+        return jsonify({'error': gdpr_bot.NOT_READY_MESSAGE, 'question': question, 'not_ready': True}), 503, {'Retry-After': '5'}
+    
+    return sse_response(gdpr_bot.ask_question_stream(question))
+
+
+@app.route('/gdpr-chatbot/ready')
+def gdpr_chatbot_ready():
+    """Report whether the GDPR index is loaded and ready for questions"""
+    status = get_gdpr_service().get_status()
+    return jsonify(status), 200 if status['ready'] else 503
+
+
+@app.route('/retention/status')
+def retention_status():
+    """Report what the retention janitor has removed and reclaimed (admin token required)"""
+    if not is_profiling_admin():
+        return jsonify({'error': 'Not found'}), 404
+    return jsonify(retention_janitor.get_stats())
+
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Expose stage latency, LLM usage, cache and error metrics for Prometheus"""
+    if not config.METRICS_ENABLED:
+        return jsonify({'error': 'Metrics are disabled'}), 404
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/profiles')
+def profiles_index():
+    """List recent request profiles with their slowest frames"""
+    if not (config.PROFILING_ENABLED or is_profiling_admin()):
+        return jsonify({'error': 'Profiling is disabled'}), 404
+    return render_template('profiles.html', profiles=profiling.list_profiles())
+
+
+@app.route('/profiles/<profile_id>.collapsed')
+def download_profile(profile_id):
+    """Download a profile's collapsed stacks for flamegraph.pl or speedscope"""
+    if not (config.PROFILING_ENABLED or is_profiling_admin()):
+        return jsonify({'error': 'Profiling is disabled'}), 404
+    filepath = os.path.abspath(os.path.join(config.PROFILES_FOLDER, os.path.basename(profile_id) + '.collapsed'))
+    if not os.path.exists(filepath):
+        return jsonify({'error': 'Profile not found'}), 404
+    return send_file(filepath, mimetype='text/plain', as_attachment=True,
+                     download_name=f'{os.path.basename(profile_id)}.collapsed')
+
+
 @app.route('/jd-creator/generate', methods=['POST'])
 def jd_creator_generate():
     """Generate job description"""
@@ -192,13 +469,28 @@ def jd_creator_generate():
         return jsonify({'error': str(e)}), 500
 
 
-if __name__ == '__main__':
-    # Create necessary folders
-    os.makedirs(config.UPLOAD_FOLDER, exist_ok=True)
-    os.makedirs(config.OUTPUT_FOLDER, exist_ok=True)
-    os.makedirs('gdpr_chroma', exist_ok=True)
+@app.route('/jd-creator/generate/stream', methods=['POST'])
+def jd_creator_generate_stream():
+    """Stream a job description section by section"""
+    data = request.get_json() or {}
     
-    app.run(
+    from services.jd_service import JDGeneratorService
+    jd_bot = JDGeneratorService()
+    
+    return sse_response(jd_bot.generate_jd_stream(
+        role_title=data.get('role_title', ''),
+        experience_range=data.get('experience_range', ''),
+        department=data.get('department', ''),
+        location=data.get('location', ''),
+        employment_type=data.get('employment_type', ''),
+        key_responsibilities=data.get('key_responsibilities', ''),
+        required_skills=data.get('required_skills', ''),
+        additional_info=data.get('additional_info', '')
+    ))
+
+
+if __name__ == '__main__':
+    create_app().run(
         host=config.HOST,
         port=config.PORT,
         debug=config.DEBUG
@@ -5,6 +5,7 @@ OPENAI_API_KEY="YOUR-OPENAI-API-KEY-HERE"
 SECRET_KEY = os.environ.get('SECRET_KEY', 'your-secret-key-here-change-in-production')
 UPLOAD_FOLDER = 'uploads'
 OUTPUT_FOLDER = 'outputs'
+CACHE_FOLDER = os.environ.get('CACHE_FOLDER', 'cache')
 MAX_FILE_SIZE = 16 * 1024 * 1024  # 16MB per file
 
 # Application Settings
@@ -16,6 +17,109 @@ PORT = int(os.environ.get('PORT', 5000))
 DEFAULT_MIN_EXPERIENCE = 0
 DEFAULT_MAX_EXPERIENCE = 20
 MAX_RESUMES_PER_UPLOAD = 50
+SCREENING_MAX_WORKERS = int(os.environ.get('SCREENING_MAX_WORKERS', 5))  # 1 = sequential
+SCREENING_JOB_WORKERS = int(os.environ.get('SCREENING_JOB_WORKERS', 2))  # Concurrent background screening jobs
+
+# Pre-ranking: shortlist resumes by embedding similarity before LLM scoring
+EMBEDDING_MODEL = os.environ.get('EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
+PRERANK_ENABLED = os.environ.get('PRERANK_ENABLED', 'False') == 'True'
+PRERANK_TOP_N = int(os.environ.get('PRERANK_TOP_N', 10))  # 0 = no cap
+PRERANK_MIN_SIMILARITY = float(os.environ['PRERANK_MIN_SIMILARITY']) if os.environ.get('PRERANK_MIN_SIMILARITY') else None
+
+# Hard filters: experience range (and optionally preferred organizations) checked
+# locally on the parsed resume. strict = failing resumes skip the LLM,
+# advisory = they are still scored but ranked below those that pass, off = no gate
+HARD_FILTER_MODE = os.environ.get('HARD_FILTER_MODE', 'off')
+HARD_FILTER_EXPERIENCE_TOLERANCE_YEARS = float(os.environ.get('HARD_FILTER_EXPERIENCE_TOLERANCE_YEARS', 1))
+HARD_FILTER_REQUIRE_ORGANIZATION = os.environ.get('HARD_FILTER_REQUIRE_ORGANIZATION', 'False') == 'True'  # Fail resumes naming no preferred organization
+
+# LLM Prompt Settings
+LLM_INPUT_TOKEN_BUDGET = int(os.environ.get('LLM_INPUT_TOKEN_BUDGET', 3000))  # Per analysis call
+LLM_JD_MAX_TOKENS = int(os.environ.get('LLM_JD_MAX_TOKENS', 1000))
+LLM_ANALYSIS_MAX_TOKENS = int(os.environ.get('LLM_ANALYSIS_MAX_TOKENS', 600))  # Completion limit
+
+# LLM Backend: openai, azure, or local (python -m tools.fake_llm_server)
+LLM_BACKEND = os.environ.get('LLM_BACKEND', 'openai')
+LLM_MODEL = os.environ.get('LLM_MODEL', 'gpt-3.5-turbo')  # Model name, or deployment name on Azure
+LLM_API_BASE = os.environ.get('LLM_API_BASE')  # Endpoint override (required for azure)
+LLM_API_VERSION = os.environ.get('LLM_API_VERSION', '2023-05-15')  # Azure only
+
+# LLM Client Settings (shared by screening, GDPR chatbot and JD creator)
+LLM_REQUESTS_PER_MINUTE = int(os.environ.get('LLM_REQUESTS_PER_MINUTE', 0))  # Request quota, 0 = unlimited
+LLM_TOKENS_PER_MINUTE = int(os.environ.get('LLM_TOKENS_PER_MINUTE', 0))  # Token quota, 0 = unlimited
+LLM_MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES', 5))  # Retries on 429s and transient errors
+LLM_BACKOFF_BASE_SECONDS = float(os.environ.get('LLM_BACKOFF_BASE_SECONDS', 1.0))
+LLM_BACKOFF_MAX_SECONDS = float(os.environ.get('LLM_BACKOFF_MAX_SECONDS', 60.0))
+LLM_REQUEST_TIMEOUT_SECONDS = float(os.environ.get('LLM_REQUEST_TIMEOUT_SECONDS', 60.0))
+LLM_POOL_SIZE = int(os.environ.get('LLM_POOL_SIZE', 32))  # Keep-alive connections to the API
+LLM_PROMPT_COST_PER_1K_TOKENS = float(os.environ.get('LLM_PROMPT_COST_PER_1K_TOKENS', 0.0015))  # USD, for metrics
+LLM_COMPLETION_COST_PER_1K_TOKENS = float(os.environ.get('LLM_COMPLETION_COST_PER_1K_TOKENS', 0.002))  # USD, for metrics
+
+# Batched scoring: several compact resumes per LLM call
+LLM_BATCH_MODE = os.environ.get('LLM_BATCH_MODE', 'False') == 'True'
+LLM_BATCH_INPUT_TOKEN_BUDGET = int(os.environ.get('LLM_BATCH_INPUT_TOKEN_BUDGET', 12000))
+LLM_BATCH_RESUME_TOKENS = int(os.environ.get('LLM_BATCH_RESUME_TOKENS', 1200))  # Per compact resume
+LLM_BATCH_MAX_SIZE = int(os.environ.get('LLM_BATCH_MAX_SIZE', 8))
+LLM_BATCH_OUTPUT_TOKENS_PER_RESUME = int(os.environ.get('LLM_BATCH_OUTPUT_TOKENS_PER_RESUME', 300))
+LLM_BATCH_MAX_OUTPUT_TOKENS = int(os.environ.get('LLM_BATCH_MAX_OUTPUT_TOKENS', 4000))
+
+# Parser Settings
+PARSER_PROCESS_POOL = os.environ.get('PARSER_PROCESS_POOL', 'False') == 'True'  # Parse batches in worker processes
+PARSER_PROCESSES = int(os.environ.get('PARSER_PROCESSES', 0))  # 0 = one per CPU
+PARSER_TIMEOUT_SECONDS = float(os.environ.get('PARSER_TIMEOUT_SECONDS', 30))  # Per file
+PARSER_TIMEOUT_GRACE_SECONDS = 5
+PARSER_MAX_PAGES = int(os.environ.get('PARSER_MAX_PAGES', 50))  # 0 = no limit
+RESUME_TEXT_BUDGET_CHARS = int(os.environ.get('RESUME_TEXT_BUDGET_CHARS', 24000))  # Extraction stops here, 0 = no limit
+PARSER_MAX_MEMORY_MB = int(os.environ.get('PARSER_MAX_MEMORY_MB', 1024))  # Per worker, 0 = no cap
 
 # File Settings
-ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx'}
\ No newline at end of file
+ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx'}
+
+# Cache Settings
+RESUME_TEXT_CACHE_ENABLED = os.environ.get('RESUME_TEXT_CACHE_ENABLED', 'True') == 'True'
+RESUME_TEXT_CACHE_MAX_BYTES = int(os.environ.get('RESUME_TEXT_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+LLM_CACHE_ENABLED = os.environ.get('LLM_CACHE_ENABLED', 'True') == 'True'
+LLM_CACHE_TTL_SECONDS = int(os.environ.get('LLM_CACHE_TTL_SECONDS', 7 * 24 * 3600))
+LLM_CACHE_MAX_BYTES = int(os.environ.get('LLM_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
+# Results Storage
+RESULTS_DB_PATH = os.environ.get('RESULTS_DB_PATH', os.path.join('data', 'results.db'))
+RESULTS_MAX_AGE_SECONDS = int(os.environ.get('RESULTS_MAX_AGE_SECONDS', 30 * 24 * 3600))  # 0 = keep forever; enforced by the janitor, or on save when it is off
+RESULTS_PAGE_SIZE = int(os.environ.get('RESULTS_PAGE_SIZE', 50))  # Candidates per results page
+
+# GDPR Chatbot Settings
+GDPR_CHROMA_PATH = os.environ.get('GDPR_CHROMA_PATH', 'gdpr_chroma')
+GDPR_WARMUP = os.environ.get('GDPR_WARMUP', 'True') == 'True'  # Load & index at startup in the background
+GDPR_CHUNK_SIZE = int(os.environ.get('GDPR_CHUNK_SIZE', 800))  # Words per indexed chunk
+GDPR_EMBED_BATCH_SIZE = int(os.environ.get('GDPR_EMBED_BATCH_SIZE', 64))  # Chunks embedded per call
+GDPR_QUERY_CACHE_SIZE = int(os.environ.get('GDPR_QUERY_CACHE_SIZE', 256))  # Query embeddings kept, 0 = off
+GDPR_ANSWER_CACHE_SIZE = int(os.environ.get('GDPR_ANSWER_CACHE_SIZE', 500))  # Answers kept, 0 = off
+GDPR_ANSWER_CACHE_THRESHOLD = float(os.environ.get('GDPR_ANSWER_CACHE_THRESHOLD', 0.92))  # Min cosine similarity
+GDPR_ANSWER_CACHE_TTL_SECONDS = int(os.environ.get('GDPR_ANSWER_CACHE_TTL_SECONDS', 24 * 3600))  # 0 = no expiry
+
+# Export Settings
+EXCEL_STREAMING = os.environ.get('EXCEL_STREAMING', 'True') == 'True'  # Write-only workbooks, constant memory
+EXCEL_DIRECT_DOWNLOAD = os.environ.get('EXCEL_DIRECT_DOWNLOAD', 'False') == 'True'  # Stream into the response, skip outputs/
+EXPORTS_PRECOMPUTE = os.environ.get('EXPORTS_PRECOMPUTE', 'True') == 'True'  # Build exports when screening finishes
+EXPORT_GZIP_LEVEL = int(os.environ.get('EXPORT_GZIP_LEVEL', 6))
+
+# Metrics
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True') == 'True'  # Serve Prometheus metrics on /metrics
+
+# Profiling (sampled stacks of a request and the jobs it starts, saved under PROFILES_FOLDER)
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'False') == 'True'  # Profile every request
+PROFILING_ADMIN_TOKEN = os.environ.get('PROFILING_ADMIN_TOKEN', '')  # Send as X-Profile-Token to profile one request
+PROFILES_FOLDER = os.environ.get('PROFILES_FOLDER', 'profiles')
+PROFILING_INTERVAL_MS = float(os.environ.get('PROFILING_INTERVAL_MS', 5))  # Time between stack samples
+PROFILING_MAX_SECONDS = int(os.environ.get('PROFILING_MAX_SECONDS', 900))  # Stop sampling after this long
+PROFILING_KEEP = int(os.environ.get('PROFILING_KEEP', 100))  # Most recent profiles kept on disk
+
+# Retention Settings (TTL in seconds, 0 = keep forever)
+RETENTION_ENABLED = os.environ.get('RETENTION_ENABLED', 'True') == 'True'  # Run the background janitor
+RETENTION_SWEEP_INTERVAL_SECONDS = int(os.environ.get('RETENTION_SWEEP_INTERVAL_SECONDS', 600))
+RETENTION_BATCH_SIZE = int(os.environ.get('RETENTION_BATCH_SIZE', 200))  # Max items removed per type per sweep
+UPLOAD_RETENTION_SECONDS = int(os.environ.get('UPLOAD_RETENTION_SECONDS', 7 * 24 * 3600))  # Session upload folders
+BLOB_RETENTION_SECONDS = int(os.environ.get('BLOB_RETENTION_SECONDS', 7 * 24 * 3600))  # Blobs no session links to
+EXPORT_RETENTION_SECONDS = int(os.environ.get('EXPORT_RETENTION_SECONDS', 7 * 24 * 3600))  # Stored export artifacts
+OUTPUT_RETENTION_SECONDS = int(os.environ.get('OUTPUT_RETENTION_SECONDS', 24 * 3600))  # Reports etc. in outputs/
+JOB_RETENTION_SECONDS = int(os.environ.get('JOB_RETENTION_SECONDS', 3600))  # Finished jobs kept in memory
@@ -0,0 +1,21 @@
+import threading
+import config
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder():
+    """
+    Return the shared SentenceTransformer model, loading it on first use
+
+    The model takes seconds to load and ~100MB of memory, so the GDPR
+    chatbot and the screening pre-ranker share a single instance.
+    """
+    global _embedder
+    if _embedder is None:
+        with _embedder_lock:
+            if _embedder is None:
+                from sentence_transformers import SentenceTransformer
+                _embedder = SentenceTransformer(config.EMBEDDING_MODEL)
+    return _embedder
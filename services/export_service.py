@@ -0,0 +1,122 @@
+import gzip
+import io
+import os
+import shutil
+import tempfile
+from typing import BinaryIO, Dict, Optional
+import config
+from utils.metrics import timed
+from utils.output_generator import OutputGenerator
+from utils.results_store import ResultsStore
+
+# Bump whenever the export layout changes so stored artifacts are rebuilt
+EXPORT_FORMAT_VERSION = '1'
+
+EXPORT_KINDS = {
+    'xlsx': 'screening_results_{session_id}.xlsx',
+    'json': 'screening_results_{session_id}.json',
+    'json.gz': 'screening_results_{session_id}.json.gz'
+}
+
+
+class ExportService:
+    """
+    Build screening exports once and serve the stored files afterwards
+
+    Artifacts live under <OUTPUT_FOLDER>/exports/<session_id>/ and are named
+    by the results version, which changes whenever a session's results are
+    saved again. A download of an existing version is plain file serving,
+    and older versions are removed when a new one is built.
+    """
+
+    def __init__(self, results_store: ResultsStore, output_generator: OutputGenerator,
+                 export_folder: str = None):
+        self.results_store = results_store
+        self.output_generator = output_generator
+        # Absolute, because send_file resolves relative paths against the app root
+        self.export_folder = os.path.abspath(export_folder or os.path.join(config.OUTPUT_FOLDER, 'exports'))
+
+    def get_export(self, session_id: str, kind: str) -> Optional[str]:
+        """
+        Return the path of an export, building it if this version has none yet
+
+        Args:
+            session_id: Session identifier
+            kind: One of 'xlsx', 'json' or 'json.gz'
+
+        Returns:
+            Path to the export file, or None if the session has no completed results
+        """
+        session = self.results_store.get_session(session_id)
+        if session is None or session['status'] != 'completed':
+            return None
+
+        version = self.results_version(session)
+        filepath = self._artifact_path(session_id, version, kind)
+        if not os.path.exists(filepath):
+            self._build(session_id, version, kind, filepath)
+        return filepath
+
+    def build_all(self, session_id: str):
+        """Precompute every export kind for a finished session"""
+        for kind in EXPORT_KINDS:
+            try:
+                self.get_export(session_id, kind)
+            except Exception as e:
+                print(f"Error building {kind} export for {session_id}: {str(e)}")
+
+    @staticmethod
+    def download_name(session_id: str, kind: str) -> str:
+        return EXPORT_KINDS[kind].format(session_id=session_id)
+
+    @staticmethod
+    def results_version(session: Dict) -> str:
+        """Version of a session's results: changes each time they are saved"""
+        return f"{EXPORT_FORMAT_VERSION}-{int(session['updated_at'] * 1000)}"
+
+    def _artifact_path(self, session_id: str, version: str, kind: str) -> str:
+        return os.path.join(self.export_folder, session_id, f"{version}.{kind}")
+
+    def _build(self, session_id: str, version: str, kind: str, filepath: str):
+        """Write an artifact to a temp file and move it into place atomically"""
+        directory = os.path.dirname(filepath)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                self._write(session_id, kind, f)
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._remove_old_versions(directory, version, kind)
+
+    def _write(self, session_id: str, kind: str, f: BinaryIO):
+        """Write one export kind to a binary file object"""
+        if kind == 'xlsx':
+            candidates = lambda: self.results_store.iter_candidates(session_id)
+            self.output_generator.write_excel_stream(candidates, f)
+            return
+
+        if kind == 'json.gz':
+            # Compress the stored JSON export so both downloads carry identical content
+            json_path = self.get_export(session_id, 'json')
+            with timed('export_json_gz'), open(json_path, 'rb') as source, \
+                    gzip.GzipFile(fileobj=f, mode='wb', compresslevel=config.EXPORT_GZIP_LEVEL, mtime=0) as gz:
+                shutil.copyfileobj(source, gz)
+            return
+
+        results = self.results_store.get_results(session_id)
+        with io.TextIOWrapper(f, encoding='utf-8') as text:
+            self.output_generator.write_json(results, session_id, text)
+
+    @staticmethod
+    def _remove_old_versions(directory: str, version: str, kind: str):
+        """Delete artifacts of this kind built for earlier result versions"""
+        current = f"{version}.{kind}"
+        for name in os.listdir(directory):
+            if name.endswith(f".{kind}") and name != current:
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
@@ -0,0 +1,217 @@
+import re
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+from .prompt_builder import collapse_whitespace, split_sections
+
+EMAIL_PATTERN = re.compile(r'[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}')
+
+# Digits with the usual separators; validated by digit count afterwards
+PHONE_PATTERN = re.compile(r'(?<![\w.])\+?\(?\d[\d\s().-]{6,}\d(?![\w@])')
+PHONE_LABEL = re.compile(r'\b(?:phone|mobile|mob|tel|telephone|cell|contact)\b', re.IGNORECASE)
+PHONE_MIN_DIGITS = 8
+PHONE_MAX_DIGITS = 15
+
+MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
+
+_DATE = r"""
+    (?:(?P<{p}month>jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?,?\s*
+     |(?P<{p}num>0?[1-9]|1[0-2])\s*[/.-]\s*)?
+    (?P<{p}year>(?:19|20)\d{{2}})
+"""
+DATE_RANGE_PATTERN = re.compile(
+    r'(?<!\d)' + _DATE.format(p='start_')
+    + r'\s*(?:-|–|—|to|until|till)\s*'
+    + r'(?:(?P<present>present|current|now|today|date|till\s+date|to\s+date|ongoing)|'
+    + _DATE.format(p='end_') + r')(?!\d)',
+    re.IGNORECASE | re.VERBOSE
+)
+
+STATED_EXPERIENCE_PATTERN = re.compile(
+    r'(\d{1,2}(?:\.\d)?)\s*\+?\s*(?:years?|yrs?)\b(?:\s+of)?(?:\s+[\w-]+){0,3}?\s+experience',
+    re.IGNORECASE
+)
+
+# Legal suffixes ignored when matching organization names
+ORGANIZATION_SUFFIXES = re.compile(
+    r'[\s,]+(?:inc|incorporated|llc|llp|ltd|limited|plc|corp|corporation|co|company|gmbh|ag|sa|pvt)\.?$',
+    re.IGNORECASE
+)
+
+# Sections whose dates are not employment (degrees, certificates...)
+NON_EMPLOYMENT_SECTIONS = {'education', 'certifications', 'references', 'interests', 'personal',
+                           'declaration'}
+
+
+class FieldExtractor:
+    """
+    Extract contact details and experience from resume text without the LLM
+
+    Email and phone are taken verbatim from the text, so they are exact.
+    Years of experience come from the employment date ranges (overlapping
+    jobs counted once), or from a stated "N years of experience" when the
+    resume has no ranges.
+    """
+
+    def extract(self, resume_text: str, today: date = None) -> Dict:
+        """
+        Extract local fields from a resume
+
+        Args:
+            resume_text: Parsed resume text
+            today: Date used for open-ended ranges ("2019 - Present")
+
+        Returns:
+            Dictionary with email, phone, experience_years,
+            experience_source ('date_ranges', 'stated' or None when unknown),
+            experience_section (the ranges came from an Experience heading)
+            and employment_periods
+        """
+        text = collapse_whitespace(resume_text or '')
+        employment_text, experience_section = self._employment_text(text)
+        periods = self.extract_date_ranges(employment_text, today)
+
+        experience_years = None
+        experience_source = None
+        if periods:
+            experience_years = round(self._covered_months(periods) / 12, 1)
+            experience_source = 'date_ranges'
+        else:
+            stated = self.extract_stated_experience(text)
+            if stated is not None:
+                experience_years = stated
+                experience_source = 'stated'
+
+        return {
+            'email': self.extract_email(text),
+            'phone': self.extract_phone(text),
+            'experience_years': experience_years,
+            'experience_source': experience_source,
+            'experience_section': experience_source == 'date_ranges' and experience_section,
+            'employment_periods': [
+                {'start': _format_month(start), 'end': 'present' if ongoing else _format_month(end),
+                 'months': end - start}
+                for start, end, ongoing in periods
+            ]
+        }
+
+    @staticmethod
+    def extract_email(text: str) -> Optional[str]:
+        match = EMAIL_PATTERN.search(text)
+        return match.group(0).rstrip('.') if match else None
+
+    @staticmethod
+    def extract_phone(text: str) -> Optional[str]:
+        """First phone number, preferring one on a labelled line (Phone:, Mobile:...)"""
+        found = []
+        for line in text.splitlines():
+            for match in PHONE_PATTERN.finditer(line):
+                number = match.group(0).strip()
+                if _looks_like_phone(number):
+                    found.append((not PHONE_LABEL.search(line), number))
+                    break
+        if not found:
+            return None
+        return min(found, key=lambda item: item[0])[1]
+
+    @staticmethod
+    def extract_date_ranges(text: str, today: date = None) -> List[Tuple[int, int, bool]]:
+        """
+        Date ranges in the text as (start month, end month, ongoing)
+
+        Months are counted as year * 12 + month - 1. A range given in years
+        only ("2016 - 2019") runs from January to January.
+        """
+        today = today or date.today()
+        current = today.year * 12 + today.month - 1
+        periods = []
+        for match in DATE_RANGE_PATTERN.finditer(text):
+            start = _month_index(match, 'start_')
+            ongoing = bool(match.group('present'))
+            end = current if ongoing else _month_index(match, 'end_')
+            if start is None or end is None or end < start or end > current + 12:
+                continue
+            periods.append((start, min(end, current), ongoing))
+        return periods
+
+    @staticmethod
+    def extract_stated_experience(text: str) -> Optional[float]:
+        """Largest "N years of experience" figure stated in the text"""
+        values = [float(value) for value in STATED_EXPERIENCE_PATTERN.findall(text)]
+        values = [value for value in values if value <= 60]
+        return max(values) if values else None
+
+    def find_organizations(self, resume_text: str, organizations: List[str]) -> List[str]:
+        """
+        Which of the given organizations the resume's work history mentions
+
+        Names match case-insensitively on word boundaries, ignoring legal
+        suffixes ("Acme Ltd" matches "ACME"). Education and certification
+        sections are not searched.
+        """
+        text, _ = self._employment_text(collapse_whitespace(resume_text or ''))
+        found = []
+        for organization in organizations or []:
+            name = ORGANIZATION_SUFFIXES.sub('', organization.strip())
+            if name and re.search(r'(?<!\w)' + re.escape(name).replace(r'\ ', r'\s+') + r'(?!\w)',
+                                  text, re.IGNORECASE):
+                found.append(organization.strip())
+        return found
+
+    @staticmethod
+    def _employment_text(text: str) -> Tuple[str, bool]:
+        """
+        Resume text without sections whose dates aren't jobs
+
+        Returns:
+            Tuple of (text, whether it is the Experience section). Without
+            that heading every non-education section is kept, so project and
+            volunteering dates count too.
+        """
+        sections = split_sections(text)
+        experience = [body for name, body in sections if name == 'experience']
+        if experience:
+            return "\n".join(experience), True
+        return "\n".join(body for name, body in sections if name not in NON_EMPLOYMENT_SECTIONS), False
+
+    @staticmethod
+    def _covered_months(periods: List[Tuple[int, int, bool]]) -> int:
+        """Months covered by at least one period"""
+        total = 0
+        covered_until = None
+        for start, end, _ in sorted(periods):
+            if covered_until is not None and start < covered_until:
+                start = covered_until
+            if end > start:
+                total += end - start
+                covered_until = end
+        return total
+
+
+def _month_index(match: re.Match, prefix: str) -> Optional[int]:
+    year = int(match.group(prefix + 'year'))
+    month_name = match.group(prefix + 'month')
+    number = match.group(prefix + 'num')
+    if month_name:
+        month = MONTHS[month_name[:3].lower()]
+    elif number:
+        month = int(number)
+    else:
+        month = 1
+    return year * 12 + month - 1
+
+
+def _format_month(index: int) -> str:
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def _looks_like_phone(number: str) -> bool:
+    groups = re.findall(r'\d+', number)
+    digits = sum(len(group) for group in groups)
+    if not PHONE_MIN_DIGITS <= digits <= PHONE_MAX_DIGITS:
+        return False
+    # Dates and year ranges ("2016 - 2019", "03/2017 - 06/2020") have the right digit count too
+    date_like = all(len(group) <= 2 or re.fullmatch(r'(?:19|20)\d{2}', group) for group in groups)
+    return not date_like
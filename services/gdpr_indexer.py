@@ -0,0 +1,202 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Dict, List
+import config
+from utils.disk_cache import file_sha256
+from utils.text_extractor import extract_pdf_text
+from .embeddings import get_embedder
+
+# Bump when chunking or stored metadata changes so every document is re-indexed
+MANIFEST_VERSION = 1
+
+
+def chunk_text(text, chunk_size=800):
+    """Split long text into smaller chunks for embedding"""
+    words = text.split()
+    chunks = [" ".join(words[i:i + chunk_size]) for i in range(0, len(words), chunk_size)]
+    return chunks
+
+
+def open_collection():
+    """Open (or create) the persistent Chroma collection"""
+    import chromadb
+    chroma_client = chromadb.PersistentClient(path=config.GDPR_CHROMA_PATH)
+    return chroma_client.get_or_create_collection("gdpr_hr")
+
+
+def manifest_path() -> str:
+    return os.path.join(config.GDPR_CHROMA_PATH, 'manifest.json')
+
+
+def load_manifest(path: str = None) -> Dict:
+    """Load the index manifest, or an empty one if missing or unreadable"""
+    try:
+        with open(path or manifest_path(), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'documents': {}}
+
+
+def manifest_version(manifest: Dict) -> str:
+    """Fingerprint of the indexed corpus, used to invalidate cached answers"""
+    signature = [
+        manifest.get('version'),
+        manifest.get('model'),
+        manifest.get('chunk_size'),
+        sorted((name, document['sha256']) for name, document in manifest.get('documents', {}).items())
+    ]
+    return hashlib.sha256(json.dumps(signature).encode('utf-8')).hexdigest()[:16]
+
+
+class GDPRIndexer:
+    """
+    Keep the GDPR Chroma collection in sync with the source PDFs
+
+    A manifest next to the collection records each document's content hash
+    and chunk count. Only new or changed documents are chunked and embedded;
+    their chunks are upserted and any chunk ids left over from a longer
+    previous version are deleted.
+    """
+
+    def __init__(self, collection=None, manifest_file: str = None, batch_size: int = None,
+                 chunk_size: int = None):
+        """
+        Args:
+            collection: Chroma collection (defaults to the configured one)
+            manifest_file: Path of the manifest (defaults to <GDPR_CHROMA_PATH>/manifest.json)
+            batch_size: Chunks embedded and upserted per call (defaults to GDPR_EMBED_BATCH_SIZE)
+            chunk_size: Words per chunk (defaults to GDPR_CHUNK_SIZE)
+        """
+        self.collection = collection if collection is not None else open_collection()
+        self.manifest_file = manifest_file or manifest_path()
+        self.batch_size = batch_size or config.GDPR_EMBED_BATCH_SIZE
+        self.chunk_size = chunk_size or config.GDPR_CHUNK_SIZE
+        self.manifest = load_manifest(self.manifest_file)
+
+        settings = {'version': MANIFEST_VERSION, 'model': config.EMBEDDING_MODEL, 'chunk_size': self.chunk_size}
+        if any(self.manifest.get(key) != value for key, value in settings.items()):
+            # Chunks built with other settings must all be rebuilt
+            self.manifest = {**settings, 'documents': self.manifest.get('documents', {}), 'stale': True}
+
+    def index_files(self, pdf_files: List[str], prune: bool = False) -> Dict:
+        """
+        Index new and changed documents
+
+        Args:
+            pdf_files: Paths of the PDFs to index; documents are identified by file name
+            prune: Remove documents in the manifest that are not in pdf_files
+
+        Returns:
+            Summary with added/updated/unchanged/removed document names,
+            the number of chunks embedded and the elapsed seconds
+        """
+        started = time.time()
+        summary = {'added': [], 'updated': [], 'unchanged': [], 'removed': [], 'chunks_embedded': 0}
+        documents = self.manifest['documents']
+        rebuild = self.manifest.pop('stale', False)
+
+        seen = set()
+        for pdf_file in pdf_files:
+            if not os.path.exists(pdf_file):
+                print(f"⚠️  Skipping {pdf_file} - file not found")
+                continue
+            name = os.path.basename(pdf_file)
+            seen.add(name)
+            digest = file_sha256(pdf_file)
+            previous = documents.get(name)
+            if previous and previous['sha256'] == digest and not rebuild:
+                summary['unchanged'].append(name)
+                continue
+
+            print(f"📘 Indexing {name}...")
+            chunk_count = self._index_document(name, pdf_file, digest, previous)
+            documents[name] = {'sha256': digest, 'chunks': chunk_count, 'indexed_at': time.time()}
+            summary['updated' if previous else 'added'].append(name)
+            summary['chunks_embedded'] += chunk_count
+            # Save after every document so an interrupted run keeps its progress
+            self._save_manifest()
+
+        if prune:
+            for name in [name for name in documents if name not in seen]:
+                self._delete_chunks(name, 0, documents[name]['chunks'])
+                del documents[name]
+                summary['removed'].append(name)
+
+        self._save_manifest()
+        summary['seconds'] = round(time.time() - started, 2)
+        summary['version'] = self.version()
+        return summary
+
+    def index_folder(self, folder: str, prune: bool = True) -> Dict:
+        """Index every PDF in a folder, removing documents no longer there"""
+        pdf_files = sorted(glob.glob(os.path.join(folder, '*.pdf')))
+        return self.index_files(pdf_files, prune=prune)
+
+    def version(self) -> str:
+        return manifest_version(self.manifest)
+
+    def _index_document(self, name: str, pdf_file: str, digest: str, previous: Dict = None) -> int:
+        """Chunk, embed and upsert one document in batches; returns its chunk count"""
+        chunks = chunk_text(extract_pdf_text(pdf_file), self.chunk_size)
+        embedder = get_embedder()
+        for start in range(0, len(chunks), self.batch_size):
+            batch = chunks[start:start + self.batch_size]
+            embeddings = embedder.encode(batch, batch_size=self.batch_size).tolist()
+            self.collection.upsert(
+                ids=[self._chunk_id(name, start + i) for i in range(len(batch))],
+                documents=batch,
+                embeddings=embeddings,
+                metadatas=[{'source': name, 'sha256': digest, 'chunk': start + i} for i in range(len(batch))]
+            )
+
+        if previous and previous['chunks'] > len(chunks):
+            self._delete_chunks(name, len(chunks), previous['chunks'])
+        return len(chunks)
+
+    def _delete_chunks(self, name: str, start: int, end: int):
+        """Delete chunk ids [start, end) of a document"""
+        ids = [self._chunk_id(name, i) for i in range(start, end)]
+        for offset in range(0, len(ids), self.batch_size):
+            self.collection.delete(ids=ids[offset:offset + self.batch_size])
+
+    @staticmethod
+    def _chunk_id(name: str, index: int) -> str:
+        return f"{name}_{index}"
+
+    def _save_manifest(self):
+        """Write the manifest atomically"""
+        directory = os.path.dirname(self.manifest_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.manifest_file}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_file)
+
+
+def main(argv: List[str] = None) -> int:
+    """Reindex a folder of GDPR PDFs: python -m services.gdpr_indexer [folder]"""
+    parser = argparse.ArgumentParser(description="Incrementally index GDPR documents into Chroma")
+    parser.add_argument('folder', nargs='?', default='gdpr_documents', help="Folder containing the PDFs")
+    parser.add_argument('--batch-size', type=int, default=None, help="Chunks embedded per call")
+    parser.add_argument('--keep-missing', action='store_true',
+                        help="Keep indexed documents that are no longer in the folder")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.folder):
+        print(f"Folder not found: {args.folder}")
+        return 1
+
+    indexer = GDPRIndexer(batch_size=args.batch_size)
+    summary = indexer.index_folder(args.folder, prune=not args.keep_missing)
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
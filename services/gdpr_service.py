@@ -1,93 +1,251 @@
 import os
-import openai
-import json
+import threading
+import time
 import config
-import chromadb
-from sentence_transformers import SentenceTransformer
-from PyPDF2 import PdfReader
+from utils.metrics import CACHE_REQUESTS, timed
+from utils.semantic_cache import LRUCache, SemanticCache, normalize_question
+from utils.text_extractor import extract_pdf_text
+from .embeddings import get_embedder
+from .gdpr_indexer import GDPRIndexer, load_manifest, manifest_path, manifest_version
+from .llm_client import get_llm_client
 
-# ----------------------------------------------------------
-# SETUP EMBEDDING MODEL + CHROMA CLIENT
-# ----------------------------------------------------------
-embedder = SentenceTransformer("all-MiniLM-L6-v2")
-chroma_client = chromadb.PersistentClient(path="./gdpr_chroma")
-collection = chroma_client.get_or_create_collection("gdpr_hr")
+# Candidate locations of the GDPR source documents
+GDPR_DOCUMENT_PATHS = [
+    "gdpr_documents/Art.pdf",
+    "gdpr_documents/CELEX_32016R0679_EN_TXT.pdf",
+    "Art.pdf",
+    "CELEX_32016R0679_EN_TXT.pdf"
+]
 
 # ----------------------------------------------------------
 # UTILITY FUNCTIONS
 # ----------------------------------------------------------
 def extract_text_from_pdf(file_path):
     """Extract text from a PDF file"""
-    reader = PdfReader(file_path)
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text() + "\n"
-    return text
-
-
-def chunk_text(text, chunk_size=800):
-    """Split long text into smaller chunks for embedding"""
-    words = text.split()
-    chunks = [" ".join(words[i:i + chunk_size]) for i in range(0, len(words), chunk_size)]
-    return chunks
-
-
-def embed_and_store_documents(pdf_files):
-    """Embed and store text chunks into Chroma DB"""
-    print("📘 Indexing GDPR documents...")
-    for pdf_file in pdf_files:
-        if not os.path.exists(pdf_file):
-            print(f"⚠️  Skipping {pdf_file} - file not found")
-            continue
-        text = extract_text_from_pdf(pdf_file)
-        chunks = chunk_text(text)
-        embeddings = embedder.encode(chunks).tolist()
-        ids = [f"{os.path.basename(pdf_file)}_{i}" for i in range(len(chunks))]
-        collection.add(documents=chunks, embeddings=embeddings, ids=ids)
-    print("✅ Documents indexed successfully!")
-
-
-# Run only once - index documents if collection is empty
-if len(collection.get()["ids"]) == 0:
-    # Try to find GDPR documents
-    gdpr_files = []
-    possible_paths = [
-        "gdpr_documents/Art.pdf",
-        "gdpr_documents/CELEX_32016R0679_EN_TXT.pdf",
-        "Art.pdf",
-        "CELEX_32016R0679_EN_TXT.pdf"
-    ]
-    for path in possible_paths:
-        if os.path.exists(path):
-            gdpr_files.append(path)
-    
-    if gdpr_files:
-        embed_and_store_documents(gdpr_files)
-    else:
-        print("⚠️  No GDPR documents found. Place PDF files in root or gdpr_documents/ folder")
+    return extract_pdf_text(file_path)
 
 
 # ----------------------------------------------------------
 # MAIN GDPR CHATBOT SERVICE
 # ----------------------------------------------------------
 class GDPRChatbotService:
-    """GDPR & AI in HR Chatbot using OpenAI and Chroma DB"""
+    """
+    GDPR & AI in HR Chatbot using OpenAI and Chroma DB
+
+    Loading the embedding model, opening Chroma and indexing the documents
+    happen once, on a background thread started by start(). Until that has
+    finished, questions get an immediate "not ready" answer instead of
+    waiting. Use get_gdpr_service() for the shared instance.
+
+    Answers are cached in two levels: query embeddings by normalized
+    question text, and answers by embedding similarity. Cached answers
+    carry the index version and are not served once the corpus changes.
+    """
+
+    NOT_READY_MESSAGE = "The GDPR knowledge base is still loading. Please try again in a moment."
 
     def __init__(self):
-        openai.api_key = config.OPENAI_API_KEY
-        self.model = "gpt-3.5-turbo"
+        self.llm = get_llm_client()
+        self.model = self.llm.model
+        self.collection = None
+        self.status = 'idle'
+        self.error = None
+        self.started_at = None
+        self.ready_at = None
+        self.index_version = None
+        self._manifest_mtime = None
+        self.query_embeddings = LRUCache(config.GDPR_QUERY_CACHE_SIZE)
+        self.answer_cache = SemanticCache(
+            max_entries=config.GDPR_ANSWER_CACHE_SIZE,
+            threshold=config.GDPR_ANSWER_CACHE_THRESHOLD,
+            ttl=config.GDPR_ANSWER_CACHE_TTL_SECONDS or None
+        )
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start loading and indexing in the background (no-op once started)"""
+        with self._lock:
+            if self.status != 'idle':
+                return
+            self.status = 'loading'
+            self.started_at = time.time()
+        threading.Thread(target=self._prepare, name='gdpr-index', daemon=True).start()
+
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
 
-    def _retrieve_context(self, query, top_k=3):
+    def wait_until_ready(self, timeout: float = None) -> bool:
+        """Block until the index is ready; returns False on timeout"""
+        return self._ready.wait(timeout)
+
+    def get_status(self) -> dict:
+        """Readiness report for the health endpoint"""
+        return {
+            'status': self.status,
+            'ready': self.is_ready(),
+            'error': self.error,
+            'started_at': self.started_at,
+            'ready_at': self.ready_at,
+            'index_version': self.index_version,
+            'query_cache': self.query_embeddings.stats(),
+            'answer_cache': self.answer_cache.stats()
+        }
+
+    def _prepare(self):
+        """Background thread: load the model, open Chroma and index changed documents"""
+        try:
+            get_embedder()
+            self.status = 'indexing'
+            indexer = GDPRIndexer()
+
+            # Only new or changed documents are embedded; unchanged ones cost a hash
+            gdpr_files = [path for path in GDPR_DOCUMENT_PATHS if os.path.exists(path)]
+            if gdpr_files:
+                summary = indexer.index_files(gdpr_files)
+                if summary['chunks_embedded']:
+                    print(f"✅ Indexed {summary['chunks_embedded']} chunks in {summary['seconds']}s")
+            elif indexer.collection.count() == 0:
+                print("⚠️  No GDPR documents found. Place PDF files in root or gdpr_documents/ folder")
+
+            self.collection = indexer.collection
+            self._current_index_version()
+            self.ready_at = time.time()
+            self.status = 'ready'
+            self._ready.set()
+        except Exception as e:
+            print(f"GDPR index failed to load: {str(e)}")
+            self.error = str(e)
+            with self._lock:
+                # Allow a later request to retry
+                self.status = 'idle'
+
+    def _current_index_version(self):
+        """Index version from the manifest, re-read when a reindex has rewritten it"""
+        try:
+            mtime = os.stat(manifest_path()).st_mtime_ns
+        except OSError:
+            mtime = None
+        if self.index_version is None or mtime != self._manifest_mtime:
+            self._manifest_mtime = mtime
+            self.index_version = manifest_version(load_manifest())
+        return self.index_version
+
+    def _embed_query(self, query):
+        """Embed a question, reusing the embedding of an identical earlier question"""
+        key = normalize_question(query)
+        query_embedding = self.query_embeddings.get(key)
+        CACHE_REQUESTS.inc(cache='gdpr_query_embedding', result='miss' if query_embedding is None else 'hit')
+        if query_embedding is None:
+            with timed('gdpr_embed'):
+                query_embedding = get_embedder().encode([query]).tolist()[0]
+            self.query_embeddings.set(key, query_embedding)
+        return query_embedding
+
+    @timed('gdpr_retrieval')
+    def _retrieve_context(self, query, top_k=3, query_embedding=None):
         """Retrieve relevant chunks from Chroma DB"""
-        query_embedding = embedder.encode([query]).tolist()[0]
-        results = collection.query(query_embeddings=[query_embedding], n_results=top_k)
+        if query_embedding is None:
+            query_embedding = self._embed_query(query)
+        results = self.collection.query(query_embeddings=[query_embedding], n_results=top_k)
         return "\n\n".join(results["documents"][0])
 
     def ask_question(self, question):
-        """Answer a GDPR/AI in HR related question"""
+        """
+        Answer a GDPR/AI in HR related question
+
+        Returns immediately with not_ready set when the index is still
+        loading, starting the load if nothing has yet.
+        """
+        if not self.is_ready():
+            self.start()
+            return {"error": self.NOT_READY_MESSAGE, "question": question, "not_ready": True}
+
+        try:
+            query_embedding = self._embed_query(question)
+            index_version = self._current_index_version()
+            cached = self.answer_cache.lookup(query_embedding, index_version)
+            CACHE_REQUESTS.inc(cache='gdpr_answer', result='miss' if cached is None else 'hit')
+            if cached is not None:
+                answer, similarity = cached
+                return {"question": question, "answer": answer, "cached": True,
+                        "similarity": round(similarity, 4)}
+
+            response = self.llm.chat(
+                model=self.model,
+                messages=self._build_messages(question, query_embedding),
+                temperature=0.4,
+                max_tokens=800
+            )
+
+            answer = response["choices"][0]["message"]["content"]
+            self.answer_cache.store(query_embedding, answer, index_version, question)
+            return {"question": question, "answer": answer}
+
+        except Exception as e:
+            return {"error": str(e), "question": question}
+
+    def ask_question_stream(self, question):
+        """
+        Answer a question, yielding the answer as it is generated
+
+        Yields (event, data) tuples:
+            ('token', {'text'}) for each piece of the answer
+            ('done', {'question', 'answer', 'cached', 'first_token_ms'}) at the end
+            ('error', {'error', 'question'}) if the index is not ready or the call fails
+        """
+        if not self.is_ready():
+            self.start()
+            yield 'error', {"error": self.NOT_READY_MESSAGE, "question": question, "not_ready": True}
+            return
+
+        started = time.monotonic()
         try:
-            context = self._retrieve_context(question)
-            prompt = f"""
+            query_embedding = self._embed_query(question)
+            index_version = self._current_index_version()
+            cached = self.answer_cache.lookup(query_embedding, index_version)
+            CACHE_REQUESTS.inc(cache='gdpr_answer', result='miss' if cached is None else 'hit')
+            if cached is not None:
+                answer, similarity = cached
+                yield 'token', {"text": answer}
+                yield 'done', {"question": question, "answer": answer, "cached": True,
+                               "similarity": round(similarity, 4),
+                               "first_token_ms": round((time.monotonic() - started) * 1000)}
+                return
+
+            response = self.llm.chat(
+                model=self.model,
+                messages=self._build_messages(question, query_embedding),
+                temperature=0.4,
+                max_tokens=800,
+                stream=True
+            )
+
+            parts = []
+            first_token_ms = None
+            for chunk in response:
+                text = chunk["choices"][0].get("delta", {}).get("content")
+                if not text:
+                    continue
+                if first_token_ms is None:
+                    first_token_ms = round((time.monotonic() - started) * 1000)
+                parts.append(text)
+                yield 'token', {"text": text}
+
+        except Exception as e:
+            yield 'error', {"error": str(e), "question": question}
+            return
+
+        answer = "".join(parts)
+        if answer:
+            # An empty stream would otherwise be served as the answer to similar questions
+            self.answer_cache.store(query_embedding, answer, index_version, question)
+        yield 'done', {"question": question, "answer": answer, "cached": False, "first_token_ms": first_token_ms}
+
+    def _build_messages(self, question, query_embedding):
+        """Retrieve context for the question and build the chat messages"""
+        context = self._retrieve_context(question, query_embedding=query_embedding)
+        prompt = f"""
 You are a GDPR compliance expert focused on HR applications and AI ethics.
 Base your answer ONLY on the official GDPR (EU 2016/679) and the 2025 HR-AI guide provided.
 
@@ -100,19 +258,21 @@ Question:
 Provide a clear, concise, and compliant answer.
 Always cite relevant GDPR Articles and explain in simple language.
 """
+        return [
+            {"role": "system", "content": "You are a GDPR compliance assistant for AI systems in HR."},
+            {"role": "user", "content": prompt}
+        ]
 
-            response = openai.ChatCompletion.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a GDPR compliance assistant for AI systems in HR."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.4,
-                max_tokens=800
-            )
 
-            answer = response["choices"][0]["message"]["content"]
-            return {"question": question, "answer": answer}
+_service = None
+_service_lock = threading.Lock()
 
-        except Exception as e:
-            return {"error": str(e), "question": question}
\ No newline at end of file
+
+def get_gdpr_service() -> GDPRChatbotService:
+    """Return the shared GDPR chatbot service, creating it on first use"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = GDPRChatbotService()
+    return _service
@@ -1,18 +1,93 @@
-import openai
+import time
 import config
 import json
+from utils.json_stream import JSONSectionParser
+from .llm_client import get_llm_client
 
 class JDGeneratorService:
     """NeuronIQ AI – Job Description Creator"""
 
     def __init__(self):
-        openai.api_key = config.OPENAI_API_KEY
-        self.model = "gpt-3.5-turbo"
+        self.llm = get_llm_client()
+        self.model = self.llm.model
 
     def generate_jd(self, role_title, experience_range, department, location, employment_type, key_responsibilities, required_skills, additional_info=""):
         """
         Generate a structured Job Description based on company tone and template.
         """
+        messages = self._build_messages(role_title, experience_range, department, location, employment_type,
+                                        key_responsibilities, required_skills, additional_info)
+
+        try:
+            response = self.llm.chat(
+                model=self.model,
+                messages=messages,
+                temperature=0.5,
+                max_tokens=1500
+            )
+
+            jd_text = response["choices"][0]["message"]["content"]
+
+            try:
+                jd_data = json.loads(jd_text)
+            except json.JSONDecodeError:
+                jd_data = {"full_text": jd_text}
+
+            return jd_data
+
+        except Exception as e:
+            return {"error": str(e)}
+
+    def generate_jd_stream(self, role_title, experience_range, department, location, employment_type, key_responsibilities, required_skills, additional_info=""):
+        """
+        Stream a Job Description, yielding each section as soon as it is complete.
+
+        Yields (event, data) tuples:
+            ('section', {'key', 'value'}) for each top-level JD field
+            ('done', {'jd', 'first_token_ms'}) with the full JD at the end
+            ('error', {'error'}) if the model call fails
+        """
+        messages = self._build_messages(role_title, experience_range, department, location, employment_type,
+                                        key_responsibilities, required_skills, additional_info)
+        started = time.monotonic()
+        first_token_ms = None
+        parser = JSONSectionParser()
+        sections = {}
+
+        try:
+            response = self.llm.chat(
+                model=self.model,
+                messages=messages,
+                temperature=0.5,
+                max_tokens=1500,
+                stream=True
+            )
+
+            for chunk in response:
+                text = chunk["choices"][0].get("delta", {}).get("content")
+                if not text:
+                    continue
+                if first_token_ms is None:
+                    first_token_ms = round((time.monotonic() - started) * 1000)
+                for key, value in parser.feed(text):
+                    sections[key] = value
+                    yield 'section', {'key': key, 'value': value}
+
+        except Exception as e:
+            yield 'error', {'error': str(e)}
+            return
+
+        jd_text = parser.buffer
+        if not parser.done:
+            # Not the JSON we asked for: fall back to the raw text, as generate_jd does
+            try:
+                sections = json.loads(jd_text)
+            except json.JSONDecodeError:
+                sections = {"full_text": jd_text}
+        yield 'done', {'jd': sections, 'first_token_ms': first_token_ms}
+
+    def _build_messages(self, role_title, experience_range, department, location, employment_type, key_responsibilities, required_skills, additional_info=""):
+        """Build the chat messages for a JD generation request"""
 
         company_template = """
 Company: NeuronIQ AI
@@ -66,25 +141,7 @@ Return the JD as valid JSON with this structure:
 }}
 """
 
-        try:
-            response = openai.ChatCompletion.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a professional HR assistant at NeuronIQ AI."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.5,
-                max_tokens=1500
-            )
-
-            jd_text = response["choices"][0]["message"]["content"]
-
-            try:
-                jd_data = json.loads(jd_text)
-            except json.JSONDecodeError:
-                jd_data = {"full_text": jd_text}
-
-            return jd_data
-
-        except Exception as e:
-            return {"error": str(e)}
\ No newline at end of file
+        return [
+            {"role": "system", "content": "You are a professional HR assistant at NeuronIQ AI."},
+            {"role": "user", "content": prompt}
+        ]
@@ -0,0 +1,287 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional
+import config
+from utils import metrics, profiling
+
+
+class ScreeningJobManager:
+    """Run screening requests on a background worker pool and track their progress"""
+
+    def __init__(self, screening_engine, max_workers: int = None, store=None):
+        """
+        Args:
+            screening_engine: Engine used to screen each job's resumes
+            max_workers: Number of jobs screened concurrently
+            store: Optional ResultsStore; job progress is persisted there so
+                other app processes can report status and stream events
+        """
+        self.screening_engine = screening_engine
+        self.store = store
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or config.SCREENING_JOB_WORKERS,
+            thread_name_prefix='screening-job'
+        )
+        self.jobs = {}
+        self.condition = threading.Condition()
+        metrics.gauge('hrms_screening_jobs', 'Screening jobs tracked by this process, by status', ['status'],
+                      function=self._count_by_status)
+
+    def submit(self, job_id: str, resume_files: List[str], job_description: str,
+               min_experience: int = 0, max_experience: int = 20,
+               preferred_organizations: List[str] = None,
+               on_complete: Callable[[str, Dict], None] = None,
+               use_cache: bool = True,
+               content_hashes: Dict[str, str] = None) -> Dict:
+        """
+        Queue a screening job and return immediately
+
+        Args:
+            job_id: Identifier for the job (the upload session id)
+            resume_files: List of paths to resume files
+            job_description: Job description text
+            min_experience: Minimum years of experience
+            max_experience: Maximum years of experience
+            preferred_organizations: List of preferred company names
+            on_complete: Called with (job_id, results) once screening finishes
+            use_cache: Set to False to bypass cached LLM analyses
+            content_hashes: SHA-256 of each resume file, used to screen
+                identical uploads only once
+
+        Returns:
+            Job status dictionary
+        """
+        now = time.time()
+        with self.condition:
+            self.jobs[job_id] = {
+                'job_id': job_id,
+                'status': 'queued',
+                'total': len(resume_files),
+                'completed': 0,
+                'candidates': [],
+                'error': None,
+                'created_at': now,
+                'updated_at': now
+            }
+        if self.store is not None:
+            self.store.create_session(
+                job_id, len(resume_files), job_description,
+                {
+                    'min_experience': min_experience,
+                    'max_experience': max_experience,
+                    'preferred_organizations': preferred_organizations or []
+                },
+                resume_files
+            )
+
+        # A profiled request keeps profiling through its screening job
+        self.executor.submit(
+            profiling.bind(self._run), job_id, resume_files, job_description,
+            min_experience, max_experience, preferred_organizations, on_complete,
+            use_cache, content_hashes
+        )
+        return self.get_status(job_id)
+
+    def get_status(self, job_id: str, include_candidates: bool = True) -> Optional[Dict]:
+        """
+        Return a snapshot of a job's progress, or None for unknown jobs
+
+        Jobs started by another process are looked up in the results store.
+        """
+        with self.condition:
+            job = self.jobs.get(job_id)
+            if job is not None:
+                status = dict(job)
+                status['candidates'] = list(job['candidates']) if include_candidates else []
+                return status
+        return self._stored_status(job_id, include_candidates)
+
+    def _stored_status(self, job_id: str, include_candidates: bool) -> Optional[Dict]:
+        """Job status as persisted in the results store"""
+        if self.store is None:
+            return None
+        session = self.store.get_session(job_id)
+        if session is None:
+            return None
+        running = session['status'] in ('queued', 'running')
+        return {
+            'job_id': job_id,
+            'status': session['status'],
+            'total': session['total'],
+            'completed': session['completed'],
+            'candidates': self.store.get_candidates(job_id) if include_candidates and running else [],
+            'error': session['error'],
+            'created_at': session['created_at'],
+            'updated_at': session['updated_at']
+        }
+
+    def iter_events(self, job_id: str, heartbeat: float = 15.0) -> Iterator[str]:
+        """
+        Yield server-sent events for a job until it finishes
+
+        Candidates already screened are replayed first, so clients may
+        connect at any point. Comment lines are sent as keep-alives while
+        waiting, which also stops idle proxies from closing the stream.
+        """
+        with self.condition:
+            local = job_id in self.jobs
+        if not local and self.store is not None:
+            yield from self._iter_stored_events(job_id, heartbeat)
+            return
+
+        sent = 0
+        while True:
+            with self.condition:
+                job = self.jobs.get(job_id)
+                if job is None:
+                    break
+                if sent >= len(job['candidates']) and job['status'] in ('queued', 'running'):
+                    self.condition.wait(timeout=heartbeat)
+                new_candidates = job['candidates'][sent:]
+                status = job['status']
+                completed = job['completed']
+                total = job['total']
+                error = job['error']
+
+            if not new_candidates and status in ('queued', 'running'):
+                yield ': keep-alive\n\n'
+                continue
+
+            for candidate in new_candidates:
+                sent += 1
+                yield self._format_event('candidate', {
+                    'candidate': candidate,
+                    'completed': sent,
+                    'total': total
+                })
+
+            if status == 'completed':
+                yield self._format_event('complete', {'job_id': job_id, 'completed': completed, 'total': total})
+                return
+            if status == 'failed':
+                yield self._format_event('failed', {'job_id': job_id, 'error': error})
+                return
+
+        yield self._format_event('failed', {'job_id': job_id, 'error': 'Job not found'})
+
+    def _iter_stored_events(self, job_id: str, heartbeat: float, poll_interval: float = 1.0) -> Iterator[str]:
+        """Stream events for a job running in another process by polling the store"""
+        sent = 0
+        last_sent_at = time.monotonic()
+        while True:
+            job = self._stored_status(job_id, include_candidates=False)
+            if job is None:
+                yield self._format_event('failed', {'job_id': job_id, 'error': 'Job not found'})
+                return
+
+            running = job['status'] in ('queued', 'running')
+            if running and job['completed'] > sent:
+                for candidate in self.store.get_candidates(job_id, offset=sent):
+                    sent += 1
+                    yield self._format_event('candidate', {
+                        'candidate': candidate,
+                        'completed': sent,
+                        'total': job['total']
+                    })
+                last_sent_at = time.monotonic()
+
+            if job['status'] == 'completed':
+                yield self._format_event('complete', {'job_id': job_id, 'completed': job['completed'], 'total': job['total']})
+                return
+            if job['status'] == 'failed':
+                yield self._format_event('failed', {'job_id': job_id, 'error': job['error']})
+                return
+
+            if time.monotonic() - last_sent_at >= heartbeat:
+                yield ': keep-alive\n\n'
+                last_sent_at = time.monotonic()
+            time.sleep(poll_interval)
+
+    def is_active(self, job_id: str) -> bool:
+        """Whether a job is queued or running in this process"""
+        with self.condition:
+            job = self.jobs.get(job_id)
+            return job is not None and job['status'] in ('queued', 'running')
+
+    def evict_finished(self, max_age_seconds: float, limit: int = None) -> int:
+        """
+        Forget finished jobs not updated within max_age_seconds
+
+        Their final state stays in the results store, so status and event
+        requests keep working through the store fallback.
+
+        Args:
+            max_age_seconds: Age after which a finished job is dropped
+            limit: Maximum number of jobs dropped (None = all)
+
+        Returns:
+            Number of jobs dropped
+        """
+        cutoff = time.time() - max_age_seconds
+        with self.condition:
+            expired = [job_id for job_id, job in self.jobs.items()
+                       if job['status'] in ('completed', 'failed') and job['updated_at'] < cutoff]
+            for job_id in expired[:limit]:
+                del self.jobs[job_id]
+        return len(expired[:limit])
+
+    def _run(self, job_id: str, resume_files: List[str], job_description: str,
+             min_experience: int, max_experience: int,
+             preferred_organizations: List[str],
+             on_complete: Callable[[str, Dict], None], use_cache: bool,
+             content_hashes: Dict[str, str] = None):
+        """Worker body: screen the resumes and publish progress as it happens"""
+        self._update(job_id, status='running')
+        if self.store is not None:
+            self.store.set_status(job_id, 'running')
+
+        def on_progress(candidate: Dict):
+            with self.condition:
+                job = self.jobs[job_id]
+                job['candidates'].append(candidate)
+                job['completed'] += 1
+                job['updated_at'] = time.time()
+                self.condition.notify_all()
+            if self.store is not None:
+                self.store.add_candidate(job_id, candidate)
+
+        try:
+            results = self.screening_engine.screen_resumes(
+                resume_files=resume_files,
+                job_description=job_description,
+                min_experience=min_experience,
+                max_experience=max_experience,
+                preferred_organizations=preferred_organizations,
+                progress_callback=on_progress,
+                use_cache=use_cache,
+                content_hashes=content_hashes
+            )
+            if on_complete:
+                on_complete(job_id, results)
+            # Final results now live with the caller; drop the partial copies
+            self._update(job_id, status='completed', candidates=[])
+        except Exception as e:
+            print(f"Screening job {job_id} failed: {str(e)}")
+            self._update(job_id, status='failed', error=str(e))
+            if self.store is not None:
+                self.store.set_status(job_id, 'failed', str(e))
+
+    def _count_by_status(self) -> Dict[tuple, int]:
+        with self.condition:
+            statuses = [job['status'] for job in self.jobs.values()]
+        return {(status,): statuses.count(status) for status in set(statuses)}
+
+    def _update(self, job_id: str, **fields):
+        """Update job fields and wake up anyone streaming its events"""
+        with self.condition:
+            job = self.jobs[job_id]
+            job.update(fields)
+            job['updated_at'] = time.time()
+            self.condition.notify_all()
+
+    @staticmethod
+    def _format_event(event: str, data: Dict) -> str:
+        """Encode a server-sent event"""
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
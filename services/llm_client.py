@@ -0,0 +1,282 @@
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+import openai
+import requests
+import config
+from utils import metrics
+from .prompt_builder import count_tokens
+
+# Errors worth retrying: throttling, overload, timeouts and dropped connections
+RETRYABLE_ERRORS = (
+    openai.error.RateLimitError,
+    openai.error.ServiceUnavailableError,
+    openai.error.Timeout,
+    openai.error.APIConnectionError,
+    openai.error.TryAgain
+)
+
+# Tokens each chat message adds on top of its content
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# How each LLM_BACKEND configures the openai library; LLM_API_BASE overrides api_base
+BACKENDS = {
+    'openai': {'api_type': 'open_ai', 'api_base': 'https://api.openai.com/v1', 'api_version': None},
+    'azure': {'api_type': 'azure', 'api_base': None, 'api_version': 'LLM_API_VERSION'},
+    # tools/fake_llm_server.py; needs no real key
+    'local': {'api_type': 'open_ai', 'api_base': 'http://127.0.0.1:8765/v1', 'api_version': None,
+              'api_key': 'local'}
+}
+
+LLM_IN_FLIGHT = metrics.gauge('hrms_llm_requests_in_flight', 'LLM requests currently waiting on the API')
+LLM_CLIENT_EVENTS = metrics.counter('hrms_llm_client_events_total',
+                                    'LLM client requests, retries, rate limits, failures and throttled seconds',
+                                    ['event'])
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at rate_per_minute
+
+    acquire() blocks until the requested amount is available, so callers
+    sharing a bucket are spread evenly over the minute instead of bursting
+    into the provider's limit.
+    """
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = float(rate_per_minute)
+        self.rate = rate_per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self, amount: float = 1) -> float:
+        """
+        Take amount tokens, waiting as long as needed
+
+        Returns:
+            Seconds spent waiting
+        """
+        # A single request larger than the bucket could never be served
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.blocked_until and self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = max(self.blocked_until - now, (amount - self.tokens) / self.rate)
+            time.sleep(delay)
+            waited += delay
+
+    def refund(self, amount: float):
+        """Return tokens reserved but not used"""
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+    def pause(self, seconds: float):
+        """Block every caller for the given time (e.g. after a 429)"""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class LLMClient:
+    """
+    Shared chat completion client for every service that calls the model
+
+    Requests go through one pooled keep-alive HTTP session, are paced by
+    request-per-minute and token-per-minute buckets, carry a per-call
+    timeout, and are retried with exponential backoff and full jitter on
+    throttling and transient errors. A Retry-After from the provider
+    pauses all callers, not just the one that was throttled.
+    """
+
+    def __init__(self, requests_per_minute: int = None, tokens_per_minute: int = None,
+                 max_retries: int = None, timeout: float = None, backend: str = None):
+        """
+        Args:
+            requests_per_minute: Request quota (defaults to LLM_REQUESTS_PER_MINUTE, 0 = unlimited)
+            tokens_per_minute: Token quota (defaults to LLM_TOKENS_PER_MINUTE, 0 = unlimited)
+            max_retries: Retries after the first attempt (defaults to LLM_MAX_RETRIES)
+            timeout: Seconds per request (defaults to LLM_REQUEST_TIMEOUT_SECONDS)
+            backend: One of BACKENDS (defaults to LLM_BACKEND)
+        """
+        self.backend = backend or config.LLM_BACKEND
+        self.model = config.LLM_MODEL
+        self._configure_backend(self.backend)
+        openai.requestssession = self._make_session(config.LLM_POOL_SIZE)
+
+        rpm = config.LLM_REQUESTS_PER_MINUTE if requests_per_minute is None else requests_per_minute
+        tpm = config.LLM_TOKENS_PER_MINUTE if tokens_per_minute is None else tokens_per_minute
+        self.request_bucket = TokenBucket(rpm) if rpm else None
+        self.token_bucket = TokenBucket(tpm) if tpm else None
+        self.max_retries = config.LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.timeout = timeout or config.LLM_REQUEST_TIMEOUT_SECONDS
+
+        self.stats_lock = threading.Lock()
+        self.stats = {'requests': 0, 'retries': 0, 'rate_limited': 0, 'failures': 0, 'throttled_seconds': 0.0}
+
+    def chat(self, messages: List[Dict], model: str = None, max_tokens: int = 800,
+             stream: bool = False, timeout: float = None, **kwargs):
+        """
+        Create a chat completion, retrying transient failures
+
+        Args:
+            messages: Chat messages
+            model: Model name (defaults to LLM_MODEL)
+            max_tokens: Completion limit, also reserved against the token quota
+            stream: Return an iterator of chunks instead of a response;
+                only opening the stream is retried
+            timeout: Seconds for this request (defaults to the client timeout)
+            **kwargs: Passed through to openai.ChatCompletion.create
+
+        Returns:
+            The completion response (or chunk iterator when streaming)
+        """
+        model = model or self.model
+        if self.backend == 'azure':
+            # Azure addresses models by deployment
+            kwargs.setdefault('engine', model)
+        estimate = self.estimate_tokens(messages, model) + max_tokens
+        attempt = 0
+        while True:
+            self._throttle(estimate)
+            LLM_IN_FLIGHT.inc()
+            try:
+                with metrics.timed('llm_request'):
+                    response = openai.ChatCompletion.create(
+                        model=model,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        stream=stream,
+                        request_timeout=timeout or self.timeout,
+                        **kwargs
+                    )
+            except RETRYABLE_ERRORS + (openai.error.APIError,) as e:
+                if not self._retryable(e) or attempt >= self.max_retries:
+                    self._count('failures')
+                    raise
+                attempt += 1
+                self._count('retries')
+                self._back_off(e, attempt)
+                continue
+            finally:
+                LLM_IN_FLIGHT.dec()
+
+            # Streamed responses carry no usage, so only whole responses are metered
+            if not stream:
+                usage = response.get("usage") or {}
+                metrics.record_llm_usage(model, usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0))
+                used = usage.get("total_tokens")
+                if self.token_bucket is not None and used is not None and used < estimate:
+                    self.token_bucket.refund(estimate - used)
+            return response
+
+    @staticmethod
+    def estimate_tokens(messages: List[Dict], model: str = "gpt-3.5-turbo") -> int:
+        """Prompt tokens of a message list, counted locally"""
+        return sum(count_tokens(message.get("content") or "", model) + MESSAGE_OVERHEAD_TOKENS
+                   for message in messages)
+
+    def get_stats(self) -> Dict:
+        with self.stats_lock:
+            return dict(self.stats)
+
+    def _throttle(self, tokens: int):
+        """Wait for request and token quota"""
+        waited = 0.0
+        if self.request_bucket is not None:
+            waited += self.request_bucket.acquire(1)
+        if self.token_bucket is not None:
+            waited += self.token_bucket.acquire(tokens)
+        self._count('requests')
+        if waited:
+            self._count('throttled_seconds', waited)
+
+    @staticmethod
+    def _retryable(error: Exception) -> bool:
+        if isinstance(error, RETRYABLE_ERRORS):
+            return True
+        # Other API errors are retried only when the server failed
+        status = getattr(error, 'http_status', None)
+        return status is None or status >= 500
+
+    def _back_off(self, error: Exception, attempt: int):
+        """Sleep before the next attempt, honouring Retry-After"""
+        delay = random.uniform(0, min(config.LLM_BACKOFF_MAX_SECONDS,
+                                      config.LLM_BACKOFF_BASE_SECONDS * 2 ** (attempt - 1)))
+        retry_after = self._retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        if isinstance(error, openai.error.RateLimitError):
+            self._count('rate_limited')
+            # Everyone sharing the quota should wait, not just this caller
+            for bucket in (self.request_bucket, self.token_bucket):
+                if bucket is not None:
+                    bucket.pause(delay)
+        print(f"LLM request failed ({type(error).__name__}), retry {attempt}/{self.max_retries} in {delay:.1f}s")
+        time.sleep(delay)
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        headers = getattr(error, 'headers', None) or {}
+        for header in ('retry-after-ms', 'Retry-After-Ms', 'retry-after', 'Retry-After'):
+            value = headers.get(header)
+            if value is None:
+                continue
+            try:
+                seconds = float(value)
+            except (TypeError, ValueError):
+                continue
+            return seconds / 1000 if header.lower().endswith('-ms') else seconds
+        return None
+
+    @staticmethod
+    def _configure_backend(backend: str):
+        """Point the openai library at the chosen backend"""
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown LLM backend '{backend}', expected one of {sorted(BACKENDS)}")
+        settings = BACKENDS[backend]
+        api_base = config.LLM_API_BASE or settings['api_base']
+        if not api_base:
+            raise ValueError(f"LLM_API_BASE is required for the {backend} backend")
+        openai.api_type = settings['api_type']
+        openai.api_base = api_base
+        openai.api_version = getattr(config, settings['api_version']) if settings['api_version'] else None
+        openai.api_key = settings.get('api_key') or config.OPENAI_API_KEY
+
+    @staticmethod
+    def _make_session(pool_size: int) -> requests.Session:
+        """HTTP session whose keep-alive pool fits every concurrent caller"""
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def _count(self, name: str, amount: float = 1):
+        LLM_CLIENT_EVENTS.inc(amount, event=name)
+        with self.stats_lock:
+            self.stats[name] += amount
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client() -> LLMClient:
+    """Return the process-wide LLM client, creating it on first use"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = LLMClient()
+        return _client
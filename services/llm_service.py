@@ -1,112 +1,162 @@
+import hashlib
 import json
-from typing import List, Dict
+import os
+from typing import List, Dict, Tuple
 import openai
 import config
+from utils.disk_cache import DiskCache
+from utils.metrics import count_error, timed
+from .field_extractor import FieldExtractor
+from .llm_client import get_llm_client
+from .prompt_builder import PromptBuilder
+
+# Bump whenever the analysis prompt or output handling changes so cached
+# analyses produced by the old prompt are not reused
+PROMPT_VERSION = '3'
+
+# Fields taken from the resume text by FieldExtractor rather than the model
+LOCAL_FIELDS = ('email', 'phone', 'experience_years', 'experience_source', 'employment_periods')
+
+# Defaults for fields the model leaves out of an analysis
+REQUIRED_FIELDS = {
+    'name': 'Unknown',
+    'email': None,
+    'phone': None,
+    'experience_years': 0,
+    'current_role': 'Not specified',
+    'current_company': 'Not specified',
+    'skills': [],
+    'education': 'Not specified',
+    'match_score': 50,
+    'strengths': [],
+    'concerns': [],
+    'recommendation': 'MODERATE_FIT',
+    'summary': 'Analysis completed'
+}
+
 
 class LLMService:
     """Service for interacting with OpenAI for resume analysis"""
     
-    def __init__(self):
-        openai.api_key = config.OPENAI_API_KEY
-        self.model = "gpt-3.5-turbo"
+    def __init__(self, cache: DiskCache = None):
+        self.llm = get_llm_client()
+        self.model = self.llm.model
+        self.prompt_builder = PromptBuilder(self.model)
+        self.field_extractor = FieldExtractor()
+        
+        if cache is None and config.LLM_CACHE_ENABLED:
+            cache = DiskCache(
+                os.path.join(config.CACHE_FOLDER, 'llm_analysis'),
+                version=PROMPT_VERSION,
+                max_bytes=config.LLM_CACHE_MAX_BYTES,
+                ttl=config.LLM_CACHE_TTL_SECONDS
+            )
+        self.cache = cache
     
+    @timed('llm_analysis')
     def analyze_resume(self, resume_text: str, job_description: str,
                       min_experience: int = 0, max_experience: int = 20,
-                      preferred_organizations: List[str] = None) -> Dict:
+                      preferred_organizations: List[str] = None,
+                      use_cache: bool = True) -> Dict:
         """
         Analyze a resume against job requirements using LLM
+        
+        Identical analyses are served from the response cache unless
+        use_cache is False, in which case the model is called and the
+        cached entry refreshed.
         """
         
-        org_list = ", ".join(preferred_organizations) if preferred_organizations else "any organization"
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._analysis_cache_key(
+                resume_text, job_description, min_experience,
+                max_experience, preferred_organizations
+            )
+            if use_cache:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return json.loads(cached)
+        
+        result = self._analyze_resume(
+            resume_text, job_description, min_experience,
+            max_experience, preferred_organizations
+        )
         
-        prompt = f"""
-You are an expert HR recruiter. Analyze this resume against the job description and provide a detailed evaluation.
-
-JOB DESCRIPTION:
-{job_description}
-
-RESUME:
-{resume_text}
-
-SCREENING CRITERIA:
-- Experience Range: {min_experience}-{max_experience} years
-- Preferred Organizations: {org_list}
-
-Provide your analysis in the following JSON format:
-{{
-    "name": "Candidate full name",
-    "email": "candidate email if found, else null",
-    "phone": "candidate phone if found, else null",
-    "experience_years": <number of years of experience>,
-    "current_role": "current or most recent job title",
-    "current_company": "current or most recent company",
-    "skills": ["skill1", "skill2", "skill3"],
-    "education": "highest degree and institution",
-    "match_score": <0-100 integer score>,
-    "strengths": ["strength1", "strength2", "strength3"],
-    "concerns": ["concern1", "concern2"],
-    "recommendation": "STRONG_FIT / GOOD_FIT / MODERATE_FIT / WEAK_FIT",
-    "summary": "2-3 sentence overall assessment"
-}}
-
-Be objective and thorough. Match score should reflect:
-- Skills alignment with job requirements (40%)
-- Experience level match (30%)
-- Company/industry relevance (20%)
-- Education and qualifications (10%)
-"""
+        # Only successful analyses are cached; failures should be retried
+        failed = result.pop('_failed', False)
+        if cache_key is not None and not failed:
+            try:
+                self.cache.set(cache_key, json.dumps(result).encode('utf-8'))
+            except OSError as e:
+                print(f"Error caching analysis: {str(e)}")
+        return result
+    
+    def _analysis_cache_key(self, resume_text: str, job_description: str,
+                            min_experience: int, max_experience: int,
+                            preferred_organizations: List[str], variant: str = 'single') -> str:
+        """Build the response cache key for an analysis request"""
+        normalized_jd = " ".join(job_description.split())
+        organizations = sorted(org.strip().lower() for org in preferred_organizations or [])
+        key_parts = [
+            hashlib.sha256(resume_text.encode('utf-8')).hexdigest(),
+            hashlib.sha256(normalized_jd.encode('utf-8')).hexdigest(),
+            min_experience,
+            max_experience,
+            organizations,
+            self.llm.backend,
+            self.model,
+            PROMPT_VERSION,
+            self.prompt_builder.input_token_budget,
+            self.prompt_builder.jd_max_tokens
+        ]
+        if variant == 'batch':
+            key_parts += [variant, config.LLM_BATCH_RESUME_TOKENS]
+        return hashlib.sha256(json.dumps(key_parts).encode('utf-8')).hexdigest()
+    
+    def _analyze_resume(self, resume_text: str, job_description: str,
+                        min_experience: int, max_experience: int,
+                        preferred_organizations: List[str]) -> Dict:
+        """Call the model and parse its analysis"""
+        
+        messages, prompt_tokens = self.prompt_builder.build_analysis_messages(
+            resume_text=resume_text,
+            job_description=job_description,
+            min_experience=min_experience,
+            max_experience=max_experience,
+            preferred_organizations=preferred_organizations
+        )
 
         try:
-            response = openai.ChatCompletion.create(
+            response = self.llm.chat(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert HR recruiter analyzing resumes."},
-                    {"role": "user", "content": prompt}
-                ],
+                messages=messages,
                 temperature=0.3,
-                max_tokens=1500
+                max_tokens=config.LLM_ANALYSIS_MAX_TOKENS
             )
             
             result_text = response["choices"][0]["message"]["content"]
+            usage = response.get("usage") or {}
+            token_counts = {
+                'prompt_tokens': usage.get("prompt_tokens", prompt_tokens),
+                'completion_tokens': usage.get("completion_tokens", 0)
+            }
             
             # Try to parse JSON from response
             try:
-                # Extract JSON from markdown code blocks if present
-                if "```json" in result_text:
-                    result_text = result_text.split("```json")[1].split("```")[0].strip()
-                elif "```" in result_text:
-                    result_text = result_text.split("```")[1].split("```")[0].strip()
-                
+                result_text = self._extract_json_text(result_text)
                 result = json.loads(result_text)
-                
-                # Ensure all required fields exist
-                required_fields = {
-                    'name': 'Unknown',
-                    'email': None,
-                    'phone': None,
-                    'experience_years': 0,
-                    'current_role': 'Not specified',
-                    'current_company': 'Not specified',
-                    'skills': [],
-                    'education': 'Not specified',
-                    'match_score': 50,
-                    'strengths': [],
-                    'concerns': [],
-                    'recommendation': 'MODERATE_FIT',
-                    'summary': 'Analysis completed'
-                }
-                
-                for field, default in required_fields.items():
-                    result.setdefault(field, default)
-                
+                self._complete_fields(result, resume_text)
+                result.update(token_counts)
                 return result
                 
             except json.JSONDecodeError as e:
+                count_error('llm_json', e)
                 print(f"JSON parsing error: {str(e)}")
                 print(f"Response text: {result_text}")
                 
                 # Return default structure if parsing fails
                 return {
+                    '_failed': True,
                     'name': 'Parse Error',
                     'email': None,
                     'phone': None,
@@ -119,26 +169,190 @@ Be objective and thorough. Match score should reflect:
                     'strengths': [],
                     'concerns': ['Unable to parse resume properly'],
                     'recommendation': 'WEAK_FIT',
-                    'summary': 'Resume analysis failed'
+                    'summary': 'Resume analysis failed',
+                    **token_counts
                 }
                 
         except Exception as e:
             print(f"LLM service error: {str(e)}")
-            return {
-                'name': 'Error',
-                'email': None,
-                'phone': None,
-                'experience_years': 0,
-                'current_role': 'Error',
-                'current_company': 'Error',
-                'skills': [],
-                'education': 'Error',
-                'match_score': 0,
-                'strengths': [],
-                'concerns': [f'Error: {str(e)}'],
-                'recommendation': 'WEAK_FIT',
-                'summary': f'Analysis failed: {str(e)}'
+            return self._error_result(e)
+    
+    @timed('llm_batch')
+    def analyze_resumes_batch(self, resumes: List[Tuple[str, str]], job_description: str,
+                              min_experience: int = 0, max_experience: int = 20,
+                              preferred_organizations: List[str] = None,
+                              use_cache: bool = True) -> Dict[str, Dict]:
+        """
+        Score several resumes against the job description in one call
+        
+        Resumes are compressed to LLM_BATCH_RESUME_TOKENS and the model
+        returns a JSON array matched back by candidate id. If the output is
+        malformed or truncated, the batch is split and retried; a single
+        resume falls back to the regular analysis call.
+        
+        Args:
+            resumes: List of (candidate_id, resume_text)
+            job_description: Job description text
+            min_experience: Minimum years of experience
+            max_experience: Maximum years of experience
+            preferred_organizations: List of preferred company names
+            use_cache: Set to False to bypass cached analyses
+            
+        Returns:
+            Dictionary of candidate_id -> analysis, shaped like analyze_resume
+        """
+        results = {}
+        cache_keys = {}
+        pending = []
+        for candidate_id, resume_text in resumes:
+            if self.cache is not None:
+                cache_keys[candidate_id] = self._analysis_cache_key(
+                    resume_text, job_description, min_experience,
+                    max_experience, preferred_organizations, variant='batch'
+                )
+                if use_cache:
+                    cached = self.cache.get(cache_keys[candidate_id])
+                    if cached is not None:
+                        results[candidate_id] = json.loads(cached)
+                        continue
+            pending.append((candidate_id, resume_text))
+        
+        if pending:
+            scored = self._analyze_batch(
+                pending, job_description, min_experience,
+                max_experience, preferred_organizations
+            )
+            texts = dict(pending)
+            for candidate_id, result in scored.items():
+                failed = result.pop('_failed', False)
+                single = result.pop('_single', False)
+                if candidate_id in cache_keys and not failed:
+                    # A resume scored on its own was analyzed with the single-resume prompt
+                    cache_key = self._analysis_cache_key(
+                        texts[candidate_id], job_description, min_experience,
+                        max_experience, preferred_organizations
+                    ) if single else cache_keys[candidate_id]
+                    try:
+                        self.cache.set(cache_key, json.dumps(result).encode('utf-8'))
+                    except OSError as e:
+                        print(f"Error caching analysis: {str(e)}")
+                results[candidate_id] = result
+        
+        return results
+    
+    def _analyze_batch(self, resumes: List[Tuple[str, str]], job_description: str,
+                       min_experience: int, max_experience: int,
+                       preferred_organizations: List[str]) -> Dict[str, Dict]:
+        """Score a batch, splitting it whenever the model's answer is unusable"""
+        if len(resumes) == 1:
+            candidate_id, resume_text = resumes[0]
+            result = self._analyze_resume(
+                resume_text, job_description, min_experience,
+                max_experience, preferred_organizations
+            )
+            result['_single'] = True
+            return {candidate_id: result}
+        
+        compact = [
+            (candidate_id, self.prompt_builder.compress_resume(resume_text, config.LLM_BATCH_RESUME_TOKENS))
+            for candidate_id, resume_text in resumes
+        ]
+        messages, prompt_tokens = self.prompt_builder.build_batch_messages(
+            compact, job_description, min_experience, max_experience, preferred_organizations
+        )
+        max_tokens = min(config.LLM_BATCH_MAX_OUTPUT_TOKENS,
+                         config.LLM_BATCH_OUTPUT_TOKENS_PER_RESUME * len(resumes))
+        
+        parsed = {}
+        try:
+            response = self.llm.chat(
+                model=self.model,
+                messages=messages,
+                temperature=0.3,
+                max_tokens=max_tokens
+            )
+            result_text = response["choices"][0]["message"]["content"]
+            usage = response.get("usage") or {}
+            token_counts = {
+                'prompt_tokens': round(usage.get("prompt_tokens", prompt_tokens) / len(resumes)),
+                'completion_tokens': round(usage.get("completion_tokens", 0) / len(resumes)),
+                'batch_size': len(resumes)
             }
+            
+            try:
+                items = json.loads(self._extract_json_text(result_text))
+            except json.JSONDecodeError as e:
+                count_error('llm_json', e)
+                finish_reason = response["choices"][0].get("finish_reason")
+                print(f"Batch JSON parsing error ({finish_reason}): {str(e)}")
+                items = []
+            
+            texts = dict(resumes)
+            for item in items if isinstance(items, list) else []:
+                if isinstance(item, dict) and str(item.get('candidate_id')) in texts:
+                    candidate_id = str(item.pop('candidate_id'))
+                    self._complete_fields(item, texts[candidate_id])
+                    item.update(token_counts)
+                    parsed[candidate_id] = item
+                    
+        except openai.error.InvalidRequestError as e:
+            # Usually the batch overflowed the context window; retry smaller
+            count_error('llm', e)
+            print(f"Batch request rejected: {str(e)}")
+        except Exception as e:
+            print(f"LLM service error: {str(e)}")
+            return {candidate_id: self._error_result(e) for candidate_id, _ in resumes}
+        
+        missing = [resume for resume in resumes if resume[0] not in parsed]
+        if len(missing) == len(resumes):
+            middle = len(resumes) // 2
+            halves = (resumes[:middle], resumes[middle:])
+        else:
+            halves = (missing,) if missing else ()
+        for half in halves:
+            parsed.update(self._analyze_batch(
+                half, job_description, min_experience,
+                max_experience, preferred_organizations
+            ))
+        return parsed
+    
+    def _complete_fields(self, result: Dict, resume_text: str):
+        """Merge in the locally extracted fields and default any the model left out"""
+        extracted = self.field_extractor.extract(resume_text)
+        # experience_years stays None when it can't be extracted, so unknown isn't shown as zero
+        result.update({field: extracted[field] for field in LOCAL_FIELDS})
+        for field, default in REQUIRED_FIELDS.items():
+            result.setdefault(field, default)
+    
+    @staticmethod
+    def _extract_json_text(result_text: str) -> str:
+        """Extract JSON from markdown code blocks if present"""
+        if "```json" in result_text:
+            return result_text.split("```json")[1].split("```")[0].strip()
+        if "```" in result_text:
+            return result_text.split("```")[1].split("```")[0].strip()
+        return result_text
+    
+    @staticmethod
+    def _error_result(error: Exception) -> Dict:
+        """Analysis returned when the model could not be called"""
+        count_error('llm', error)
+        return {
+            '_failed': True,
+            'name': 'Error',
+            'email': None,
+            'phone': None,
+            'experience_years': 0,
+            'current_role': 'Error',
+            'current_company': 'Error',
+            'skills': [],
+            'education': 'Error',
+            'match_score': 0,
+            'strengths': [],
+            'concerns': [f'Error: {str(error)}'],
+            'recommendation': 'WEAK_FIT',
+            'summary': f'Analysis failed: {str(error)}'
+        }
     
     def chat_with_results(self, query: str, candidates: List[Dict], 
                          job_description: str) -> Dict:
@@ -155,7 +369,8 @@ Be objective and thorough. Match score should reflect:
         for i, candidate in enumerate(top_5, 1):
             context += f"{i}. {candidate.get('name')} - {candidate.get('match_score')}% match\n"
             context += f"   Role: {candidate.get('current_role')} at {candidate.get('current_company')}\n"
-            context += f"   Experience: {candidate.get('experience_years')} years\n\n"
+            years = candidate.get('experience_years')
+            context += f"   Experience: {'Unknown' if years is None else f'{years} years'}\n\n"
         
         prompt = f"""
 You are an HR assistant helping to analyze candidate screening results.
@@ -171,7 +386,7 @@ provide their details. If it asks for recommendations, suggest the best matches.
 """
 
         try:
-            response = openai.ChatCompletion.create(
+            response = self.llm.chat(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "You are a helpful HR assistant."},
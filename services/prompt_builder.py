@@ -0,0 +1,322 @@
+import math
+import re
+from typing import Dict, List, Tuple
+import config
+
+try:
+    import tiktoken
+except ImportError:  # Optional: fall back to a character-based estimate
+    tiktoken = None
+
+# Rough characters-per-token ratio for English text when tiktoken is unavailable
+CHARS_PER_TOKEN = 4
+
+# Tokens added by the chat format around each message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+ANALYSIS_SYSTEM_PROMPT = "You are an expert HR recruiter analyzing resumes."
+
+ANALYSIS_PROMPT_TEMPLATE = """
+You are an expert HR recruiter. Analyze this resume against the job description and provide a detailed evaluation.
+
+JOB DESCRIPTION:
+{job_description}
+
+RESUME:
+{resume_text}
+
+SCREENING CRITERIA:
+- Experience Range: {min_experience}-{max_experience} years
+- Preferred Organizations: {org_list}
+
+Provide your analysis in the following JSON format. Contact details and years of
+experience are extracted separately, so do not include them. Keep every value short.
+{{
+    "name": "Candidate full name",
+    "current_role": "current or most recent job title",
+    "current_company": "current or most recent company",
+    "skills": ["up to 8 key skills"],
+    "education": "highest degree and institution",
+    "match_score": <0-100 integer score>,
+    "strengths": ["up to 3 strengths"],
+    "concerns": ["up to 3 concerns"],
+    "recommendation": "STRONG_FIT / GOOD_FIT / MODERATE_FIT / WEAK_FIT",
+    "summary": "2-3 sentence overall assessment"
+}}
+
+Be objective and thorough. Match score should reflect:
+- Skills alignment with job requirements (40%)
+- Experience level match (30%)
+- Company/industry relevance (20%)
+- Education and qualifications (10%)
+"""
+
+BATCH_ANALYSIS_PROMPT_TEMPLATE = """
+You are an expert HR recruiter. Analyze each of the following resumes against the job description and evaluate every candidate independently.
+
+JOB DESCRIPTION:
+{job_description}
+
+SCREENING CRITERIA:
+- Experience Range: {min_experience}-{max_experience} years
+- Preferred Organizations: {org_list}
+
+RESUMES:
+{resumes}
+
+Return ONLY a JSON array with exactly one object per resume, each in this format
+(contact details and years of experience are extracted separately; omit them):
+{{
+    "candidate_id": "the id shown in the resume header",
+    "name": "Candidate full name",
+    "current_role": "current or most recent job title",
+    "current_company": "current or most recent company",
+    "skills": ["up to 6 key skills"],
+    "education": "highest degree and institution",
+    "match_score": <0-100 integer score>,
+    "strengths": ["up to 2 strengths"],
+    "concerns": ["up to 2 concerns"],
+    "recommendation": "STRONG_FIT / GOOD_FIT / MODERATE_FIT / WEAK_FIT",
+    "summary": "1-2 sentence overall assessment"
+}}
+
+Match score should reflect:
+- Skills alignment with job requirements (40%)
+- Experience level match (30%)
+- Company/industry relevance (20%)
+- Education and qualifications (10%)
+"""
+
+BATCH_RESUME_HEADER = "=== CANDIDATE {candidate_id} ==="
+
+# Resume sections in the order they are kept when the budget is tight.
+# The untitled block at the top (name, contact details) always comes first.
+SECTION_PRIORITY = ['header', 'experience', 'skills', 'education', 'summary',
+                    'projects', 'certifications']
+
+# While filling the budget, each of these still to come keeps up to
+# SECTION_RESERVE_TOKENS so a long experience section cannot crowd out
+# skills and education entirely
+RESERVED_SECTIONS = {'header', 'experience', 'skills', 'education'}
+SECTION_RESERVE_TOKENS = 150
+
+# Sections that never help the screening decision and are always dropped
+DROPPED_SECTIONS = {'references', 'interests', 'personal', 'declaration'}
+
+SECTION_HEADINGS = {
+    'experience': ['experience', 'work experience', 'professional experience', 'employment',
+                   'employment history', 'work history', 'career history'],
+    'skills': ['skills', 'technical skills', 'key skills', 'core competencies', 'competencies',
+               'technologies', 'tools'],
+    'education': ['education', 'academic background', 'qualifications', 'academics'],
+    'summary': ['summary', 'profile', 'professional summary', 'objective', 'career objective',
+                'about me'],
+    'projects': ['projects', 'key projects', 'personal projects'],
+    'certifications': ['certifications', 'certificates', 'licenses', 'awards', 'achievements'],
+    'references': ['references', 'referees'],
+    'interests': ['interests', 'hobbies', 'hobbies and interests', 'extracurricular activities'],
+    'personal': ['personal details', 'personal information', 'personal data'],
+    'declaration': ['declaration']
+}
+
+_HEADING_LOOKUP = {heading: section for section, headings in SECTION_HEADINGS.items()
+                   for heading in headings}
+
+_encodings = {}
+_fallback_logged = False
+
+
+def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
+    """Count tokens locally with tiktoken, or estimate them from the length"""
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = "gpt-3.5-turbo") -> str:
+    """Cut text down to at most max_tokens tokens"""
+    if max_tokens <= 0:
+        return ""
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
+
+
+def _get_encoding(model: str):
+    """tiktoken encoding for the model, or None to use the length estimate"""
+    if tiktoken is None:
+        _log_fallback("tiktoken is not installed")
+        return None
+    if model not in _encodings:
+        try:
+            try:
+                encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            # The BPE file is downloaded on first use, which fails offline
+            _log_fallback(f"tiktoken encoding unavailable ({str(e)})")
+            encoding = None
+        _encodings[model] = encoding
+    return _encodings[model]
+
+
+def _log_fallback(reason: str):
+    global _fallback_logged
+    if not _fallback_logged:
+        _fallback_logged = True
+        print(f"{reason}; estimating tokens as {CHARS_PER_TOKEN} characters each")
+
+
+class PromptBuilder:
+    """Build LLM prompts that fit a per-call input token budget"""
+
+    def __init__(self, model: str = "gpt-3.5-turbo", input_token_budget: int = None,
+                 jd_max_tokens: int = None):
+        self.model = model
+        self.input_token_budget = input_token_budget or config.LLM_INPUT_TOKEN_BUDGET
+        self.jd_max_tokens = jd_max_tokens or config.LLM_JD_MAX_TOKENS
+
+    def build_analysis_messages(self, resume_text: str, job_description: str,
+                                min_experience: int, max_experience: int,
+                                preferred_organizations: List[str] = None) -> Tuple[List[Dict], int]:
+        """
+        Build the chat messages for a resume analysis within the input budget
+
+        The job description is whitespace-collapsed and capped at
+        LLM_JD_MAX_TOKENS; the resume gets whatever budget remains and is
+        compressed by section priority to fit it.
+
+        Returns:
+            Tuple of (messages, prompt token count)
+        """
+        org_list = ", ".join(preferred_organizations) if preferred_organizations else "any organization"
+        job_description = self._prepare_job_description(job_description)
+
+        fields = {
+            'job_description': job_description,
+            'min_experience': min_experience,
+            'max_experience': max_experience,
+            'org_list': org_list
+        }
+        fixed_tokens = (count_tokens(ANALYSIS_PROMPT_TEMPLATE.format(resume_text="", **fields), self.model)
+                        + count_tokens(ANALYSIS_SYSTEM_PROMPT, self.model)
+                        + 2 * MESSAGE_OVERHEAD_TOKENS)
+        resume_budget = max(0, self.input_token_budget - fixed_tokens)
+        resume_text = self.compress_resume(resume_text, resume_budget)
+
+        prompt = ANALYSIS_PROMPT_TEMPLATE.format(resume_text=resume_text, **fields)
+        messages = [
+            {"role": "system", "content": ANALYSIS_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+        prompt_tokens = fixed_tokens + count_tokens(resume_text, self.model)
+        return messages, prompt_tokens
+
+    def build_batch_messages(self, resumes: List[Tuple[str, str]], job_description: str,
+                             min_experience: int, max_experience: int,
+                             preferred_organizations: List[str] = None) -> Tuple[List[Dict], int]:
+        """
+        Build the chat messages for scoring several resumes in one call
+
+        Args:
+            resumes: List of (candidate_id, compact resume text); compress
+                them with compress_resume to LLM_BATCH_RESUME_TOKENS first
+
+        Returns:
+            Tuple of (messages, prompt token count)
+        """
+        blocks = [f"{BATCH_RESUME_HEADER.format(candidate_id=candidate_id)}\n{text}"
+                  for candidate_id, text in resumes]
+        prompt = BATCH_ANALYSIS_PROMPT_TEMPLATE.format(
+            job_description=self._prepare_job_description(job_description),
+            min_experience=min_experience,
+            max_experience=max_experience,
+            org_list=", ".join(preferred_organizations) if preferred_organizations else "any organization",
+            resumes="\n\n".join(blocks)
+        )
+        messages = [
+            {"role": "system", "content": ANALYSIS_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+        prompt_tokens = (count_tokens(prompt, self.model) + count_tokens(ANALYSIS_SYSTEM_PROMPT, self.model)
+                         + 2 * MESSAGE_OVERHEAD_TOKENS)
+        return messages, prompt_tokens
+
+    def batch_overhead_tokens(self, job_description: str, min_experience: int, max_experience: int,
+                              preferred_organizations: List[str] = None) -> int:
+        """Tokens a batch prompt costs before any resume is added"""
+        _, tokens = self.build_batch_messages([], job_description, min_experience,
+                                              max_experience, preferred_organizations)
+        return tokens
+
+    def batch_resume_tokens(self, candidate_id: str, resume_text: str) -> int:
+        """Tokens one compact resume adds to a batch prompt"""
+        header = BATCH_RESUME_HEADER.format(candidate_id=candidate_id)
+        return count_tokens(header, self.model) + count_tokens(resume_text, self.model) + 2
+
+    def compress_resume(self, resume_text: str, max_tokens: int) -> str:
+        """
+        Shrink a resume to max_tokens, keeping the most useful sections
+
+        Whitespace is collapsed and boilerplate sections (references,
+        hobbies, declarations) are dropped. If it still does not fit,
+        sections are filled in priority order (experience, skills, education
+        first), truncating any that exceed their share. Kept sections stay
+        in their original order.
+        """
+        sections = [(name, body) for name, body in split_sections(collapse_whitespace(resume_text))
+                    if name not in DROPPED_SECTIONS]
+        text = "\n".join(body for _, body in sections)
+        if count_tokens(text, self.model) <= max_tokens:
+            return text
+        order = sorted(range(len(sections)), key=lambda i: SECTION_PRIORITY.index(sections[i][0]))
+
+        needs = [count_tokens(body, self.model) + 1 for _, body in sections]
+        kept = {}
+        remaining = max_tokens
+        for position, i in enumerate(order):
+            reserve = sum(min(needs[j], SECTION_RESERVE_TOKENS) for j in order[position + 1:]
+                          if sections[j][0] in RESERVED_SECTIONS)
+            allowance = max(0, remaining - reserve)
+            if needs[i] <= allowance:
+                kept[i] = sections[i][1]
+                remaining -= needs[i]
+            elif allowance > 1:
+                kept[i] = truncate_to_tokens(sections[i][1], allowance - 1, self.model)
+                remaining -= allowance
+
+        return "\n".join(kept[i] for i in sorted(kept) if kept[i])
+
+    def _prepare_job_description(self, job_description: str) -> str:
+        """Collapse whitespace and cap the JD at LLM_JD_MAX_TOKENS"""
+        return truncate_to_tokens(collapse_whitespace(job_description), self.jd_max_tokens, self.model)
+
+
+def collapse_whitespace(text: str) -> str:
+    """Collapse runs of spaces and blank lines without losing line structure"""
+    lines = (re.sub(r'[ \t ]+', ' ', line).strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """Split resume text into (section name, text) pairs on recognised headings"""
+    sections = []
+    name = 'header'
+    lines = []
+    for line in text.splitlines():
+        heading = _HEADING_LOOKUP.get(line.strip().rstrip(':').lower())
+        if heading:
+            if lines:
+                sections.append((name, "\n".join(lines)))
+            name, lines = heading, [line]
+        else:
+            lines.append(line)
+    if lines:
+        sections.append((name, "\n".join(lines)))
+    return sections
@@ -1,47 +1,322 @@
+import atexit
+import math
+import multiprocessing
 import os
+import signal
+import threading
+import time
+from typing import Dict, List
 from PyPDF2 import PdfReader
-import docx
+import config
+from utils.disk_cache import DiskCache, file_sha256
+from utils.metrics import timed
+from utils.text_extractor import iter_pdf_pages, iter_docx_paragraphs, join_within_budget
+
+# Bump whenever extraction output changes so cached text is re-extracted
+PARSER_VERSION = '2'
+
+
+class ParseLimitError(Exception):
+    """Raised when a document exceeds the configured page limit"""
+
+
+class ParseTimeoutError(Exception):
+    """Raised when parsing a document takes longer than the per-file timeout"""
+
 
 class ResumeParser:
     """Extract text from resume files (PDF, DOC, DOCX)"""
-    
+
+    def __init__(self, cache: DiskCache = None, use_cache: bool = True):
+        """
+        Args:
+            cache: Cache of extracted text keyed by file content hash
+                (defaults to the configured resume text cache, if enabled)
+            use_cache: Set to False to always extract from the file
+        """
+        self.max_pages = config.PARSER_MAX_PAGES
+        self.text_budget = config.RESUME_TEXT_BUDGET_CHARS
+
+        if cache is None and use_cache and config.RESUME_TEXT_CACHE_ENABLED:
+            # The budget changes what is stored, so it is part of the cache version
+            cache = DiskCache(
+                os.path.join(config.CACHE_FOLDER, 'resume_text'),
+                version=f"{PARSER_VERSION}-{self.text_budget}",
+                max_bytes=config.RESUME_TEXT_CACHE_MAX_BYTES
+            )
+        self.cache = cache if use_cache else None
+
+    @timed('parse')
     def parse_resume(self, file_path: str) -> str:
         """
         Extract text from a resume file
-        
+
+        Previously seen content is served from the text cache, so a
+        re-uploaded resume costs a hash and a small read. Extraction stops
+        once RESUME_TEXT_BUDGET_CHARS characters have been read.
+
         Args:
             file_path: Path to the resume file
-            
+
         Returns:
             Extracted text as string
         """
+        if self.cache is None:
+            return self.extract_text(file_path)
+
+        cache_key = self._cache_key(file_path)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached.decode('utf-8')
+
+        text = self.extract_text(file_path)
+        self._store(cache_key, file_path, text)
+        return text
+
+    @timed('parse_batch')
+    def parse_resumes(self, file_paths: List[str], processes: int = None,
+                      timeout: float = None) -> List[Dict]:
+        """
+        Parse many resumes in parallel worker processes
+
+        Each file is parsed under a wall-clock timeout and the page and
+        memory limits, so one malformed or huge document produces an
+        error entry instead of stalling or crashing the batch.
+
+        Args:
+            file_paths: Paths to the resume files
+            processes: Number of worker processes (defaults to PARSER_PROCESSES)
+            timeout: Per-file timeout in seconds (defaults to PARSER_TIMEOUT_SECONDS)
+
+        Returns:
+            One dict per file, in order: {'file_path', 'text', 'error'} where
+            error is None or {'type': 'timeout'|'limit'|'memory'|'parse', 'message'}
+        """
+        processes = processes or config.PARSER_PROCESSES or os.cpu_count() or 1
+        timeout = timeout if timeout is not None else config.PARSER_TIMEOUT_SECONDS
+
+        outcomes = [None] * len(file_paths)
+        cache_keys = {}
+        pending = []
+        for i, file_path in enumerate(file_paths):
+            if self.cache is not None:
+                try:
+                    cache_keys[i] = self._cache_key(file_path)
+                except Exception as e:
+                    outcomes[i] = _outcome(file_path, error=e)
+                    continue
+                cached = self.cache.get(cache_keys[i])
+                if cached is not None:
+                    outcomes[i] = _outcome(file_path, text=cached.decode('utf-8'))
+                    continue
+            pending.append(i)
+
+        if not pending:
+            return outcomes
+
+        pool, queued = _get_pool(processes, len(pending))
+        stuck = False
+        try:
+            jobs = [
+                (i, pool.apply_async(_parse_in_worker, (file_paths[i], timeout)))
+                for i in pending
+            ]
+            # Workers enforce the timeout themselves; this deadline only
+            # catches workers that cannot be interrupted. Files queued by
+            # other screening jobs sharing the pool are waited for too.
+            rounds = math.ceil(queued / processes)
+            deadline = time.monotonic() + rounds * timeout + config.PARSER_TIMEOUT_GRACE_SECONDS
+            for i, job in jobs:
+                try:
+                    outcomes[i] = job.get(timeout=max(0.0, deadline - time.monotonic()))
+                except multiprocessing.TimeoutError:
+                    stuck = True
+                    outcomes[i] = _outcome(
+                        file_paths[i],
+                        error=ParseTimeoutError(f"Parsing exceeded {timeout:g}s")
+                    )
+                except Exception as e:
+                    outcomes[i] = _outcome(file_paths[i], error=e)
+        finally:
+            if stuck:
+                # Terminating the pool is the only way to kill a worker stuck
+                # on a file; other jobs still using it are allowed to finish
+                _retire_pool(pool)
+            _release_pool(pool, len(pending))
+
+        for i in pending:
+            if i in cache_keys and outcomes[i]['error'] is None:
+                self._store(cache_keys[i], file_paths[i], outcomes[i]['text'])
+        return outcomes
+
+    def extract_text(self, file_path: str) -> str:
+        """Extract text from a resume file without consulting the cache"""
         file_extension = os.path.splitext(file_path)[1].lower()
-        
+
         if file_extension == '.pdf':
-            return self._extract_from_pdf(file_path)
+            text = self._extract_from_pdf(file_path)
         elif file_extension in ['.doc', '.docx']:
-            return self._extract_from_docx(file_path)
+            text = self._extract_from_docx(file_path)
         else:
             raise ValueError(f"Unsupported file format: {file_extension}")
-    
+        return text
+
+    def _cache_key(self, file_path: str) -> str:
+        file_extension = os.path.splitext(file_path)[1].lower()
+        return f"{file_sha256(file_path)}{file_extension}"
+
+    def _store(self, cache_key: str, file_path: str, text: str):
+        try:
+            self.cache.set(cache_key, text.encode('utf-8'))
+        except OSError as e:
+            print(f"Error caching text for {file_path}: {str(e)}")
+
     def _extract_from_pdf(self, file_path: str) -> str:
-        """Extract text from PDF file"""
+        """Extract text from PDF file, reading pages only until the budget is met"""
         try:
             reader = PdfReader(file_path)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-            return text.strip()
+            if self.max_pages and len(reader.pages) > self.max_pages:
+                raise ParseLimitError(f"PDF has {len(reader.pages)} pages (limit {self.max_pages})")
+            text, _ = join_within_budget(iter_pdf_pages(reader), self.text_budget)
+            return text
+        except (ParseLimitError, ParseTimeoutError, MemoryError):
+            raise
         except Exception as e:
             raise Exception(f"Error reading PDF: {str(e)}")
-    
+
     def _extract_from_docx(self, file_path: str) -> str:
         """Extract text from DOCX file"""
         try:
-            doc = docx.Document(file_path)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text.strip()
+            text, _ = join_within_budget(iter_docx_paragraphs(file_path), self.text_budget)
+            return text
+        except (ParseTimeoutError, MemoryError):
+            raise
         except Exception as e:
-            raise Exception(f"Error reading DOCX: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error reading DOCX: {str(e)}")
+
+
+# ----------------------------------------------------------
+# PROCESS POOL WORKERS
+# ----------------------------------------------------------
+# forkserver avoids forking a multi-threaded Flask process; spawn elsewhere
+_POOL_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+_ERROR_TYPES = {
+    ParseTimeoutError: 'timeout',
+    ParseLimitError: 'limit',
+    MemoryError: 'memory'
+}
+
+_worker_parser = None
+
+# One long-lived pool per process, created on first use and shut down at exit.
+# Files queued are counted per pool, so a retired pool is terminated once
+# the last job using it is done.
+_pool = None
+_pool_size = 0
+_pool_queued = {}
+_pool_lock = threading.Lock()
+
+
+def _get_pool(processes: int, files: int):
+    """
+    Return the shared parser pool and the number of files now queued on it,
+    including these; the pool is (re)created when idle at a different size
+    """
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is not None and _pool_size != processes and not _pool_queued[_pool]:
+            _pool_queued.pop(_pool).terminate()
+            _pool = None
+        if _pool is None:
+            context = multiprocessing.get_context(_POOL_START_METHOD)
+            _pool = context.Pool(processes, initializer=_init_worker,
+                                 initargs=(config.PARSER_MAX_MEMORY_MB,))
+            _pool_size = processes
+            _pool_queued[_pool] = 0
+        _pool_queued[_pool] += files
+        return _pool, _pool_queued[_pool]
+
+
+def _release_pool(pool, files: int):
+    """Stop counting a job's files, terminating the pool if it was retired and is now unused"""
+    with _pool_lock:
+        _pool_queued[pool] -= files
+        if pool is _pool or _pool_queued[pool]:
+            return
+        del _pool_queued[pool]
+    pool.terminate()
+    pool.join()
+
+
+def _retire_pool(pool):
+    """Give new callers a fresh pool; the old one is terminated by the last _release_pool"""
+    global _pool
+    with _pool_lock:
+        if pool is _pool:
+            _pool = None
+
+
+def shutdown_pool():
+    """Terminate every parser pool; the next parse_resumes call starts a new one"""
+    global _pool
+    with _pool_lock:
+        pools = list(_pool_queued)
+        _pool_queued.clear()
+        _pool = None
+    for pool in pools:
+        pool.terminate()
+        pool.join()
+
+
+atexit.register(shutdown_pool)
+
+
+def parse_error_type(error: Exception) -> str:
+    """Classify a parsing exception as 'timeout', 'limit', 'memory' or 'parse'"""
+    return _ERROR_TYPES.get(type(error), 'parse')
+
+
+def _outcome(file_path: str, text: str = None, error: Exception = None) -> Dict:
+    """Build the structured result of parsing one file"""
+    if error is None:
+        return {'file_path': file_path, 'text': text, 'error': None}
+    error_type = parse_error_type(error)
+    message = str(error) or error_type
+    return {'file_path': file_path, 'text': None, 'error': {'type': error_type, 'message': message}}
+
+
+def _init_worker(max_memory_mb: int):
+    """Pool initializer: cap the worker's address space where supported"""
+    global _worker_parser
+    # Caching happens in the parent, which already hashed the file
+    _worker_parser = ResumeParser(use_cache=False)
+    if not max_memory_mb:
+        return
+    try:
+        import resource
+        limit = max_memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError) as e:
+        print(f"Could not cap parser memory: {str(e)}")
+
+
+def _raise_timeout(signum, frame):
+    raise ParseTimeoutError("Parsing timed out")
+
+
+def _parse_in_worker(file_path: str, timeout: float) -> Dict:
+    """Parse a single file inside a pool worker under a wall-clock timeout"""
+    use_alarm = timeout and hasattr(signal, 'SIGALRM')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return _outcome(file_path, text=_worker_parser.extract_text(file_path))
+    except ParseTimeoutError:
+        return _outcome(file_path, error=ParseTimeoutError(f"Parsing exceeded {timeout:g}s"))
+    except Exception as e:
+        return _outcome(file_path, error=e)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
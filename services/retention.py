@@ -0,0 +1,246 @@
+import os
+import shutil
+import threading
+import time
+from typing import Dict, Iterator, List, Tuple
+import config
+from utils import metrics
+from utils.file_handler import FileHandler
+from utils.results_store import ResultsStore
+
+# Artifact types swept by the janitor, in sweep order. Results go before
+# exports so artifacts of sessions evicted in the same sweep are removed too.
+ARTIFACT_TYPES = ('jobs', 'results', 'uploads', 'blobs', 'exports', 'outputs')
+
+RETENTION_REMOVED = metrics.counter('hrms_retention_removed_total', 'Items removed by the retention janitor',
+                                    ['artifact'])
+RETENTION_BYTES = metrics.counter('hrms_retention_bytes_reclaimed_total',
+                                  'Bytes reclaimed by the retention janitor', ['artifact'])
+
+
+class RetentionJanitor:
+    """
+    Remove expired uploads, exports, outputs and session results in the background
+
+    Each artifact type has its own TTL (0 keeps it forever). A sweep removes
+    at most RETENTION_BATCH_SIZE items per type, oldest first, so one pass
+    never stalls the process; whatever is left is picked up by the next
+    sweep. Uploads of jobs still running in this process are never removed.
+    Every app process may run a janitor: removals are idempotent.
+    """
+
+    def __init__(self, file_handler: FileHandler, results_store: ResultsStore, job_manager=None,
+                 export_folder: str = None, output_folder: str = None,
+                 ttls: Dict[str, int] = None, batch_size: int = None):
+        """
+        Args:
+            file_handler: Handler owning the upload and blob folders
+            results_store: Store holding screening sessions
+            job_manager: Optional ScreeningJobManager whose finished jobs are dropped
+            export_folder: Folder of stored export artifacts (defaults to <OUTPUT_FOLDER>/exports)
+            output_folder: Folder of generated reports (defaults to OUTPUT_FOLDER)
+            ttls: TTL in seconds per artifact type, overriding the configured ones
+            batch_size: Maximum items removed per type per sweep
+        """
+        self.file_handler = file_handler
+        self.results_store = results_store
+        self.job_manager = job_manager
+        self.output_folder = output_folder or config.OUTPUT_FOLDER
+        self.export_folder = export_folder or os.path.join(self.output_folder, 'exports')
+        self.batch_size = batch_size or config.RETENTION_BATCH_SIZE
+        self.ttls = {
+            'jobs': config.JOB_RETENTION_SECONDS,
+            'results': config.RESULTS_MAX_AGE_SECONDS,
+            'uploads': config.UPLOAD_RETENTION_SECONDS,
+            'blobs': config.BLOB_RETENTION_SECONDS,
+            'exports': config.EXPORT_RETENTION_SECONDS,
+            'outputs': config.OUTPUT_RETENTION_SECONDS,
+            **(ttls or {})
+        }
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {
+            'sweeps': 0,
+            'last_sweep_at': None,
+            'last_sweep_seconds': None,
+            'removed': {artifact: 0 for artifact in ARTIFACT_TYPES},
+            'bytes_reclaimed': {artifact: 0 for artifact in ARTIFACT_TYPES},
+            'errors': 0
+        }
+
+    def start(self, interval: float = None):
+        """Sweep now and then every interval seconds on a daemon thread"""
+        if self._thread is not None:
+            return
+        interval = interval or config.RETENTION_SWEEP_INTERVAL_SECONDS
+        self._thread = threading.Thread(target=self._loop, args=(interval,),
+                                        name='retention-janitor', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def sweep(self) -> Dict:
+        """
+        Run one bounded sweep over every artifact type
+
+        Returns:
+            Items removed and bytes reclaimed per artifact type in this sweep
+        """
+        started = time.time()
+        summary = {'removed': {}, 'bytes_reclaimed': {}}
+        with self._lock:
+            for artifact in ARTIFACT_TYPES:
+                ttl = self.ttls.get(artifact)
+                if not ttl:
+                    continue
+                try:
+                    removed, reclaimed = getattr(self, f'_sweep_{artifact}')(started - ttl)
+                except Exception as e:
+                    print(f"Error sweeping {artifact}: {str(e)}")
+                    self.stats['errors'] += 1
+                    continue
+                summary['removed'][artifact] = removed
+                summary['bytes_reclaimed'][artifact] = reclaimed
+                self.stats['removed'][artifact] += removed
+                self.stats['bytes_reclaimed'][artifact] += reclaimed
+                RETENTION_REMOVED.inc(removed, artifact=artifact)
+                RETENTION_BYTES.inc(reclaimed, artifact=artifact)
+
+            self.stats['sweeps'] += 1
+            self.stats['last_sweep_at'] = started
+            self.stats['last_sweep_seconds'] = round(time.time() - started, 3)
+        return summary
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                **self.stats,
+                'removed': dict(self.stats['removed']),
+                'bytes_reclaimed': dict(self.stats['bytes_reclaimed']),
+                'ttls': dict(self.ttls),
+                'batch_size': self.batch_size
+            }
+
+    def _loop(self, interval: float):
+        while not self._stop.is_set():
+            summary = self.sweep()
+            reclaimed = sum(summary['bytes_reclaimed'].values())
+            if any(summary['removed'].values()):
+                print(f"🧹 Retention sweep removed {summary['removed']} ({reclaimed} bytes)")
+            self._stop.wait(interval)
+
+    def _sweep_jobs(self, cutoff: float) -> Tuple[int, int]:
+        if self.job_manager is None:
+            return 0, 0
+        return self.job_manager.evict_finished(self.ttls['jobs'], limit=self.batch_size), 0
+
+    def _sweep_results(self, cutoff: float) -> Tuple[int, int]:
+        return self.results_store.evict_older_than(self.ttls['results'], limit=self.batch_size), 0
+
+    def _sweep_uploads(self, cutoff: float) -> Tuple[int, int]:
+        """Remove expired session upload folders (blobs are collected separately)"""
+        blob_folder = os.path.abspath(self.file_handler.blob_folder)
+        candidates = [
+            (path, mtime) for path, mtime in _entries(self.file_handler.upload_folder)
+            if os.path.isdir(path) and os.path.abspath(path) != blob_folder
+        ]
+        removed = reclaimed = 0
+        for path, mtime in self._oldest_expired(candidates, cutoff):
+            session_id = os.path.basename(path)
+            if self.job_manager is not None and self.job_manager.is_active(session_id):
+                continue
+            # Linked uploads free no space until their blob goes too
+            reclaimed += _remove_tree(path, count_linked=False)
+            removed += 1
+        return removed, reclaimed
+
+    def _sweep_blobs(self, cutoff: float) -> Tuple[int, int]:
+        """Remove blobs that no session folder links to any more, and stale temp files"""
+        candidates = []
+        for shard, mtime in _entries(self.file_handler.blob_folder):
+            if os.path.isdir(shard):
+                candidates.extend(_entries(shard))
+            elif shard.endswith('.tmp'):
+                candidates.append((shard, mtime))
+
+        removed = reclaimed = 0
+        for path, _ in self._oldest_expired(candidates, cutoff):
+            try:
+                info = os.stat(path)
+                # A link count above one means a session folder still uses it;
+                # a fresh mtime means an upload reused it since it was listed
+                if info.st_nlink > 1 or info.st_mtime >= cutoff:
+                    continue
+                os.remove(path)
+            except OSError:
+                continue
+            reclaimed += info.st_size
+            removed += 1
+            try:
+                os.rmdir(os.path.dirname(path))
+            except OSError:
+                pass  # Shard still holds other blobs
+        return removed, reclaimed
+
+    def _sweep_exports(self, cutoff: float) -> Tuple[int, int]:
+        """Remove export folders that expired or whose session is gone"""
+        removed = reclaimed = 0
+        entries = [(path, mtime) for path, mtime in _entries(self.export_folder) if os.path.isdir(path)]
+        for path, mtime in sorted(entries, key=lambda entry: entry[1]):
+            if removed >= self.batch_size:
+                break
+            if mtime >= cutoff and self.results_store.has_session(os.path.basename(path)):
+                continue
+            reclaimed += _remove_tree(path)
+            removed += 1
+        return removed, reclaimed
+
+    def _sweep_outputs(self, cutoff: float) -> Tuple[int, int]:
+        """Remove expired files generated directly into the output folder"""
+        candidates = [(path, mtime) for path, mtime in _entries(self.output_folder) if os.path.isfile(path)]
+        removed = reclaimed = 0
+        for path, _ in self._oldest_expired(candidates, cutoff):
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                continue
+            reclaimed += size
+            removed += 1
+        return removed, reclaimed
+
+    def _oldest_expired(self, entries: List[Tuple[str, float]], cutoff: float) -> List[Tuple[str, float]]:
+        """The oldest batch_size entries last modified before cutoff"""
+        expired = sorted((entry for entry in entries if entry[1] < cutoff), key=lambda entry: entry[1])
+        return expired[:self.batch_size]
+
+
+def _entries(folder: str) -> Iterator[Tuple[str, float]]:
+    """Yield (path, mtime) for the entries of a folder, ignoring races with deletion"""
+    try:
+        with os.scandir(folder) as iterator:
+            for entry in iterator:
+                try:
+                    yield entry.path, entry.stat().st_mtime
+                except OSError:
+                    continue
+    except OSError:
+        return
+
+
+def _remove_tree(path: str, count_linked: bool = True) -> int:
+    """Delete a folder and return the bytes it held"""
+    size = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                info = os.stat(os.path.join(root, name))
+            except OSError:
+                continue
+            if count_linked or info.st_nlink == 1:
+                size += info.st_size
+    shutil.rmtree(path, ignore_errors=True)
+    return size
@@ -1,70 +1,130 @@
 import os
-from typing import List, Dict
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Dict, Optional, Tuple
+import config
+from utils import metrics, profiling
+from utils.disk_cache import file_sha256
+from .field_extractor import FieldExtractor
 from .llm_service import LLMService
-from .resume_parser import ResumeParser
+from .resume_parser import ResumeParser, parse_error_type
+
+# Only the start of each resume is embedded; the model truncates long
+# inputs anyway, so this just saves tokenization time
+PRERANK_MAX_CHARS = 4000
+
+# A screening task returns (upload index, candidate) pairs: one pair for a
+# single resume, several for a batched LLM call
+Task = Callable[[], List[Tuple[int, Dict]]]
+
+SESSION_SECONDS = metrics.histogram('hrms_screening_session_seconds', 'Duration of screening sessions',
+                                    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600))
+SESSION_COST = metrics.histogram('hrms_screening_session_cost_usd', 'Estimated LLM cost of screening sessions',
+                                 buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10))
+
 
 class ScreeningEngine:
     """Main engine for resume screening and candidate evaluation"""
-    
-    def __init__(self):
+
+    def __init__(self, max_workers: int = None):
         self.llm_service = LLMService()
         self.resume_parser = ResumeParser()
-    
-    def screen_resumes(self, resume_files: List[str], job_description: str, 
+        self.field_extractor = FieldExtractor()
+        self.max_workers = max_workers if max_workers is not None else config.SCREENING_MAX_WORKERS
+
+    def screen_resumes(self, resume_files: List[str], job_description: str,
                       min_experience: int = 0, max_experience: int = 20,
-                      preferred_organizations: List[str] = None) -> Dict:
+                      preferred_organizations: List[str] = None,
+                      max_workers: int = None,
+                      progress_callback: Callable[[Dict], None] = None,
+                      use_cache: bool = True,
+                      prerank: bool = None,
+                      batch: bool = None,
+                      content_hashes: Dict[str, str] = None,
+                      hard_filters: str = None) -> Dict:
         """
         Screen multiple resumes against a job description
-        
+
         Args:
             resume_files: List of paths to resume files
             job_description: Job description text
             min_experience: Minimum years of experience
             max_experience: Maximum years of experience
             preferred_organizations: List of preferred company names
-            
+            max_workers: Number of resumes (or batches) screened concurrently
+                (defaults to the engine setting, 1 = sequential)
+            progress_callback: Called with each candidate as soon as it is
+                screened, in completion order
+            use_cache: Set to False to bypass cached LLM analyses
+            prerank: Shortlist resumes by embedding similarity before LLM
+                scoring (defaults to PRERANK_ENABLED)
+            batch: Score several resumes per LLM call (defaults to LLM_BATCH_MODE)
+            content_hashes: SHA-256 of each resume file, if already known;
+                files with identical content are screened once and the
+                result is reported for each of them
+            hard_filters: 'strict', 'advisory' or 'off' (defaults to
+                HARD_FILTER_MODE); see _check_filters
+
         Returns:
-            Dictionary containing screening results
+            Dictionary containing screening results, with per-stage timings
+            and LLM usage under 'metrics'
         """
-        candidates = []
-        
-        for resume_file in resume_files:
-            try:
-                # Extract text from resume
-                resume_text = self.resume_parser.parse_resume(resume_file)
-                
-                # Analyze resume with LLM
-                analysis = self.llm_service.analyze_resume(
-                    resume_text=resume_text,
-                    job_description=job_description,
-                    min_experience=min_experience,
-                    max_experience=max_experience,
-                    preferred_organizations=preferred_organizations
-                )
-                
-                # Add file info
-                analysis['filename'] = os.path.basename(resume_file)
-                analysis['filepath'] = resume_file
-                
-                candidates.append(analysis)
-                
-            except Exception as e:
-                print(f"Error processing {resume_file}: {str(e)}")
-                candidates.append({
-                    'filename': os.path.basename(resume_file),
-                    'filepath': resume_file,
-                    'error': str(e),
-                    'name': 'Error',
-                    'match_score': 0
-                })
-        
-        # Sort candidates by match score
-        candidates.sort(key=lambda x: x.get('match_score', 0), reverse=True)
-        
+        # Stage timings and token usage of this session, from every thread
+        session = metrics.SessionMetrics()
+        started = time.perf_counter()
+
+        # Identical files are screened once and fanned out afterwards
+        upload_count = len(resume_files)
+        resume_files, duplicates = self._group_duplicates(resume_files, content_hashes)
+        if duplicates and progress_callback:
+            progress_callback = self._fan_out_progress(progress_callback, duplicates)
+
+        workers = max_workers if max_workers is not None else self.max_workers
+        workers = max(1, min(workers, len(resume_files)))
+        if prerank is None:
+            prerank = config.PRERANK_ENABLED
+        if batch is None:
+            batch = config.LLM_BATCH_MODE
+        if hard_filters is None:
+            hard_filters = config.HARD_FILTER_MODE
+        if hard_filters not in ('strict', 'advisory', 'off'):
+            raise ValueError(f"Unknown hard filter mode '{hard_filters}', expected strict, advisory or off")
+
+        criteria = {
+            'job_description': job_description,
+            'min_experience': min_experience,
+            'max_experience': max_experience,
+            'preferred_organizations': preferred_organizations,
+            'use_cache': use_cache
+        }
+
+        prerank = prerank and self._prerank_applies(len(resume_files))
+        prerank_info = None
+        if prerank or batch or config.PARSER_PROCESS_POOL:
+            # Parse the whole batch up front, then screen from the extracted text
+            with metrics.recording(session):
+                parsed = self._parse_all(resume_files, workers)
+                self._gate_parsed(parsed, criteria, hard_filters)
+                shortlist, similarity_by_index, prerank_info = self._shortlist(parsed, job_description, prerank)
+            tasks = self._parsed_tasks(parsed, shortlist, similarity_by_index, criteria, batch)
+        else:
+            tasks = [self._single_task(i, resume_file, None, criteria, filter_mode=hard_filters)
+                     for i, resume_file in enumerate(resume_files)]
+
+        candidates = self._run_tasks(tasks, len(resume_files), workers, progress_callback, session)
+        if duplicates:
+            candidates = self._fan_out(candidates, duplicates)
+
+        # Sort candidates by match score, keeping LLM-scored candidates
+        # ahead of those only ranked by similarity, and those failing hard
+        # filters last within each group
+        with metrics.recording(session), metrics.timed('sort'):
+            candidates.sort(key=self._rank_key, reverse=True)
+
         # Identify top candidate
         top_candidate = candidates[0] if candidates else None
-        
-        return {
+
+        results = {
             'candidates': candidates,
             'top_candidate': top_candidate,
             'total_candidates': len(candidates),
@@ -72,6 +132,447 @@ class ScreeningEngine:
             'criteria': {
                 'min_experience': min_experience,
                 'max_experience': max_experience,
-                'preferred_organizations': preferred_organizations or []
+                'preferred_organizations': preferred_organizations or [],
+                'hard_filters': hard_filters
+            }
+        }
+        if prerank_info:
+            results['prerank'] = prerank_info
+        if duplicates:
+            results['duplicates'] = upload_count - len(resume_files)
+        if hard_filters != 'off':
+            results['hard_filters'] = {
+                'mode': hard_filters,
+                'failed': sum(1 for candidate in candidates if candidate.get('filter_reasons')),
+                'skipped': sum(1 for candidate in candidates if candidate.get('filtered'))
             }
-        }
\ No newline at end of file
+
+        results['metrics'] = {'wall_seconds': round(time.perf_counter() - started, 4), **session.summary()}
+        SESSION_SECONDS.observe(results['metrics']['wall_seconds'])
+        SESSION_COST.observe(results['metrics']['cost_usd'])
+        return results
+
+    @staticmethod
+    def _group_duplicates(resume_files: List[str], content_hashes: Dict[str, str] = None) -> tuple:
+        """
+        Collapse files with identical content
+
+        Returns:
+            Tuple of (unique files in upload order, {unique file: [duplicate files]})
+        """
+        unique_files = []
+        duplicates = {}
+        first_by_hash = {}
+        for resume_file in resume_files:
+            digest = (content_hashes or {}).get(resume_file)
+            if digest is None:
+                try:
+                    digest = file_sha256(resume_file)
+                except OSError:
+                    # Let the parser report the problem for this file
+                    digest = resume_file
+            first = first_by_hash.setdefault(digest, resume_file)
+            if first == resume_file:
+                unique_files.append(resume_file)
+            else:
+                duplicates.setdefault(first, []).append(resume_file)
+        return unique_files, duplicates
+
+    def _fan_out(self, candidates: List[Dict], duplicates: Dict[str, List[str]]) -> List[Dict]:
+        """Add a copy of each candidate for every duplicate of its file"""
+        expanded = []
+        for candidate in candidates:
+            expanded.append(candidate)
+            for duplicate_file in duplicates.get(candidate['filepath'], []):
+                expanded.append(self._duplicate_candidate(candidate, duplicate_file))
+        return expanded
+
+    def _fan_out_progress(self, progress_callback: Callable[[Dict], None],
+                          duplicates: Dict[str, List[str]]) -> Callable[[Dict], None]:
+        """Wrap a progress callback so duplicates are reported with their original"""
+        def report(candidate):
+            for copy in self._fan_out([candidate], duplicates):
+                progress_callback(copy)
+        return report
+
+    @staticmethod
+    def _duplicate_candidate(candidate: Dict, resume_file: str) -> Dict:
+        """Copy of a candidate's result for another file with the same content"""
+        duplicate = dict(candidate)
+        duplicate['filename'] = os.path.basename(resume_file)
+        duplicate['filepath'] = resume_file
+        duplicate['duplicate_of'] = candidate['filename']
+        return duplicate
+
+    @staticmethod
+    def _rank_key(candidate: Dict) -> tuple:
+        """Sort key: LLM-scored candidates first (those passing hard filters ahead), then by match score"""
+        scored = (not candidate.get('prerank_only', False) and not candidate.get('filtered', False)
+                  and 'error' not in candidate)
+        return scored, scored and not candidate.get('filter_reasons'), candidate.get('match_score', 0)
+
+    def _run_tasks(self, tasks: List[Task], count: int, workers: int,
+                   progress_callback: Optional[Callable[[Dict], None]],
+                   session: metrics.SessionMetrics = None) -> List[Dict]:
+        """Run screening tasks, returning candidates in upload order"""
+        candidates = [None] * count
+        # Stages timed inside a task count towards the session (and a running
+        # profile samples the task), whichever thread runs it
+        tasks = [profiling.bind(metrics.bind(task, session)) for task in tasks]
+
+        def collect(pairs):
+            for index, candidate in pairs:
+                candidates[index] = candidate
+                if progress_callback:
+                    progress_callback(candidate)
+
+        if workers > 1:
+            # Parsing and LLM calls are I/O bound, so threads overlap the waits;
+            # candidates are placed by upload index so ties sort the same as
+            # the sequential loop
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(task) for task in tasks]
+                for future in as_completed(futures):
+                    collect(future.result())
+        else:
+            for task in tasks:
+                collect(task())
+        return candidates
+
+    def _prerank_applies(self, resume_count: int) -> bool:
+        """Pre-ranking only pays off when it can keep resumes away from the LLM"""
+        if config.PRERANK_MIN_SIMILARITY is not None:
+            return True
+        return bool(config.PRERANK_TOP_N) and resume_count > config.PRERANK_TOP_N
+
+    def _parse_all(self, resume_files: List[str], workers: int) -> List[Dict]:
+        """
+        Parse every resume, returning structured outcomes in upload order
+
+        Uses the parser's process pool when PARSER_PROCESS_POOL is set,
+        otherwise parses on threads.
+        """
+        if config.PARSER_PROCESS_POOL:
+            return self.resume_parser.parse_resumes(resume_files)
+
+        def parse(resume_file):
+            try:
+                return {'file_path': resume_file, 'text': self.resume_parser.parse_resume(resume_file), 'error': None}
+            except Exception as e:
+                return {'file_path': resume_file, 'text': None, 'error': {'type': parse_error_type(e), 'message': str(e)}}
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(profiling.bind(metrics.bind(parse, metrics.current_session())), resume_files))
+
+    def _shortlist(self, parsed: List[Dict], job_description: str, prerank: bool) -> tuple:
+        """
+        Pick the parsed resumes that go to the LLM, optionally ranking them by
+        embedding similarity to the job description
+
+        Returns:
+            Tuple of (shortlisted indices, similarity by index, prerank summary or None)
+        """
+        # Resumes rejected by strict hard filters never reach the LLM
+        readable = [i for i, outcome in enumerate(parsed)
+                    if outcome['error'] is None and not outcome.get('gate', {}).get('skip')]
+        if not prerank:
+            return set(readable), {}, None
+
+        similarities = self._similarity_scores(job_description, [parsed[i]['text'] for i in readable])
+        similarity_by_index = dict(zip(readable, similarities))
+
+        ranked = sorted(readable, key=lambda i: similarity_by_index[i], reverse=True)
+        if config.PRERANK_MIN_SIMILARITY is not None:
+            ranked = [i for i in ranked if similarity_by_index[i] >= config.PRERANK_MIN_SIMILARITY]
+        if config.PRERANK_TOP_N:
+            ranked = ranked[:config.PRERANK_TOP_N]
+
+        summary = {
+            'shortlisted': len(ranked),
+            'skipped': len(readable) - len(ranked),
+            'top_n': config.PRERANK_TOP_N,
+            'min_similarity': config.PRERANK_MIN_SIMILARITY,
+            'model': config.EMBEDDING_MODEL
+        }
+        return set(ranked), similarity_by_index, summary
+
+    def _parsed_tasks(self, parsed: List[Dict], shortlist: set, similarity_by_index: Dict[int, float],
+                      criteria: Dict, batch: bool) -> List[Task]:
+        """Build screening tasks for resumes that were parsed up front"""
+        tasks = []
+        llm_indices = []
+        for i, outcome in enumerate(parsed):
+            resume_file = outcome['file_path']
+            error = outcome['error']
+            gate = outcome.get('gate')
+            if error is not None:
+                tasks.append(lambda i=i, f=resume_file, e=error: [(i, self._error_candidate(f, e['message'], e['type']))])
+            elif gate and gate['skip']:
+                tasks.append(lambda i=i, f=resume_file, g=gate: [(i, self._filtered_candidate(f, g))])
+            elif i not in shortlist:
+                tasks.append(lambda i=i, f=resume_file, s=similarity_by_index[i]: [(i, self._prerank_candidate(f, s))])
+            elif batch:
+                llm_indices.append(i)
+            else:
+                tasks.append(self._single_task(i, resume_file, outcome['text'], criteria,
+                                               similarity_by_index.get(i), gate=gate))
+
+        if llm_indices:
+            items = [(str(i), parsed[i]['text']) for i in llm_indices]
+            for group in self._plan_batches(items, criteria):
+                tasks.append(lambda group=group: self._screen_batch(group, parsed, similarity_by_index, criteria))
+        return tasks
+
+    def _plan_batches(self, items: List[Tuple[str, str]], criteria: Dict) -> List[List[Tuple[str, str]]]:
+        """
+        Group resumes into LLM batches that fit the batch token budget
+
+        A batch holds at most LLM_BATCH_MAX_SIZE resumes, no more than the
+        expected output fits in LLM_BATCH_MAX_OUTPUT_TOKENS, and no more
+        compact resume text than LLM_BATCH_INPUT_TOKEN_BUDGET leaves after
+        the job description and instructions.
+        """
+        builder = self.llm_service.prompt_builder
+        overhead = builder.batch_overhead_tokens(
+            criteria['job_description'], criteria['min_experience'],
+            criteria['max_experience'], criteria['preferred_organizations']
+        )
+        input_room = config.LLM_BATCH_INPUT_TOKEN_BUDGET - overhead
+        max_size = max(1, min(config.LLM_BATCH_MAX_SIZE,
+                              config.LLM_BATCH_MAX_OUTPUT_TOKENS // config.LLM_BATCH_OUTPUT_TOKENS_PER_RESUME))
+
+        batches = []
+        current = []
+        used = 0
+        for candidate_id, resume_text in items:
+            compact = builder.compress_resume(resume_text, config.LLM_BATCH_RESUME_TOKENS)
+            tokens = builder.batch_resume_tokens(candidate_id, compact)
+            if current and (len(current) >= max_size or used + tokens > input_room):
+                batches.append(current)
+                current = []
+                used = 0
+            current.append((candidate_id, resume_text))
+            used += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def _screen_batch(self, group: List[Tuple[str, str]], parsed: List[Dict],
+                      similarity_by_index: Dict[int, float], criteria: Dict) -> List[Tuple[int, Dict]]:
+        """Score a group of resumes with one batched LLM call"""
+        try:
+            analyses = self.llm_service.analyze_resumes_batch(resumes=group, **criteria)
+        except Exception as e:
+            return [(int(candidate_id), self._error_candidate(parsed[int(candidate_id)]['file_path'], e))
+                    for candidate_id, _ in group]
+
+        pairs = []
+        for candidate_id, _ in group:
+            index = int(candidate_id)
+            resume_file = parsed[index]['file_path']
+            analysis = analyses.get(candidate_id)
+            if analysis is None:
+                pairs.append((index, self._error_candidate(resume_file, 'No analysis returned')))
+                continue
+            self._add_file_info(analysis, resume_file, similarity_by_index.get(index))
+            self._add_filter_info(analysis, parsed[index].get('gate'))
+            pairs.append((index, analysis))
+        return pairs
+
+    def _single_task(self, index: int, resume_file: str, resume_text: Optional[str],
+                     criteria: Dict, similarity: float = None, gate: Dict = None,
+                     filter_mode: str = 'off') -> Task:
+        """
+        Task that screens one resume with its own LLM call
+
+        Resumes parsed up front come with their gate result; otherwise the
+        gate runs in the task after parsing, according to filter_mode.
+        """
+        def run():
+            candidate = self._screen_resume(resume_file=resume_file, resume_text=resume_text,
+                                            gate=gate, filter_mode=filter_mode, **criteria)
+            if similarity is not None:
+                candidate['similarity_score'] = round(similarity, 4)
+            return [(index, candidate)]
+        return run
+
+    @metrics.timed('prerank')
+    def _similarity_scores(self, job_description: str, resume_texts: List[str]) -> List[float]:
+        """Cosine similarity of each resume to the job description, embedded in one batch"""
+        if not resume_texts:
+            return []
+
+        from .embeddings import get_embedder
+        texts = [job_description[:PRERANK_MAX_CHARS]] + [text[:PRERANK_MAX_CHARS] for text in resume_texts]
+        embeddings = get_embedder().encode(texts, normalize_embeddings=True)
+        jd_embedding = embeddings[0]
+        return [float(embedding @ jd_embedding) for embedding in embeddings[1:]]
+
+    def _prerank_candidate(self, resume_file: str, similarity: float) -> Dict:
+        """Candidate entry for a resume ranked below the LLM shortlist"""
+        filename = os.path.basename(resume_file)
+        return {
+            'filename': filename,
+            'filepath': resume_file,
+            'name': os.path.splitext(filename)[0],
+            'email': None,
+            'phone': None,
+            'experience_years': 0,
+            'current_role': 'Not assessed',
+            'current_company': 'Not assessed',
+            'skills': [],
+            'education': 'Not assessed',
+            'match_score': max(0, round(similarity * 100)),
+            'similarity_score': round(similarity, 4),
+            'prerank_only': True,
+            'strengths': [],
+            'concerns': [],
+            'recommendation': 'NOT_SCORED',
+            'summary': f'Not sent for detailed analysis: similarity {similarity:.2f} ranked below the shortlist'
+        }
+
+    def _screen_resume(self, resume_file: str, job_description: str,
+                       min_experience: int, max_experience: int,
+                       preferred_organizations: List[str],
+                       use_cache: bool = True,
+                       resume_text: str = None,
+                       gate: Dict = None,
+                       filter_mode: str = 'off') -> Dict:
+        """Parse and analyze a single resume, returning an error entry on failure"""
+        try:
+            # Extract text from resume
+            if resume_text is None:
+                resume_text = self.resume_parser.parse_resume(resume_file)
+
+            if gate is None and filter_mode != 'off':
+                gate = self._check_filters(resume_text, min_experience, max_experience,
+                                           preferred_organizations, filter_mode)
+            if gate and gate['skip']:
+                return self._filtered_candidate(resume_file, gate)
+
+            # Analyze resume with LLM
+            analysis = self.llm_service.analyze_resume(
+                resume_text=resume_text,
+                job_description=job_description,
+                min_experience=min_experience,
+                max_experience=max_experience,
+                preferred_organizations=preferred_organizations,
+                use_cache=use_cache
+            )
+
+            self._add_file_info(analysis, resume_file)
+            self._add_filter_info(analysis, gate)
+            return analysis
+
+        except Exception as e:
+            return self._error_candidate(resume_file, e)
+
+    @staticmethod
+    def _add_file_info(analysis: Dict, resume_file: str, similarity: float = None):
+        """Attach file details (and the pre-rank similarity, if any) to an analysis"""
+        analysis['filename'] = os.path.basename(resume_file)
+        analysis['filepath'] = resume_file
+        if similarity is not None:
+            analysis['similarity_score'] = round(similarity, 4)
+
+    def _gate_parsed(self, parsed: List[Dict], criteria: Dict, filter_mode: str):
+        """Run the hard filter gate on every parsed resume, storing the result as outcome['gate']"""
+        if filter_mode == 'off':
+            return
+        for outcome in parsed:
+            if outcome['error'] is None:
+                outcome['gate'] = self._check_filters(
+                    outcome['text'], criteria['min_experience'], criteria['max_experience'],
+                    criteria['preferred_organizations'], filter_mode
+                )
+
+    @metrics.timed('hard_filters')
+    def _check_filters(self, resume_text: str, min_experience: float, max_experience: float,
+                       preferred_organizations: List[str], filter_mode: str) -> Dict:
+        """
+        Check a resume against the hard filters without calling the LLM
+
+        Experience is estimated by FieldExtractor and must fall within the
+        range, give or take HARD_FILTER_EXPERIENCE_TOLERANCE_YEARS. Only
+        estimates from the date ranges under an Experience heading are
+        trusted; resumes with any other estimate (or none) pass. Preferred organizations
+        are always looked for, but only fail a resume that names none of
+        them when HARD_FILTER_REQUIRE_ORGANIZATION is set.
+
+        Returns:
+            Dictionary with reasons (empty when the resume passes), skip
+            (failed in strict mode), the extracted fields and the
+            organizations found
+        """
+        fields = self.field_extractor.extract(resume_text)
+        organizations = self.field_extractor.find_organizations(resume_text, preferred_organizations)
+        tolerance = config.HARD_FILTER_EXPERIENCE_TOLERANCE_YEARS
+        years = fields['experience_years']
+
+        reasons = []
+        if fields['experience_section']:
+            if min_experience and years < min_experience - tolerance:
+                reasons.append(f"Estimated {years:g} years of experience, below the minimum of {min_experience}")
+            elif max_experience and years > max_experience + tolerance:
+                reasons.append(f"Estimated {years:g} years of experience, above the maximum of {max_experience}")
+        if preferred_organizations and config.HARD_FILTER_REQUIRE_ORGANIZATION and not organizations:
+            reasons.append("No preferred organization found in the work history")
+
+        return {
+            'reasons': reasons,
+            'skip': bool(reasons) and filter_mode == 'strict',
+            'fields': fields,
+            'matched_organizations': organizations
+        }
+
+    @staticmethod
+    def _add_filter_info(candidate: Dict, gate: Optional[Dict]):
+        """Record the hard filter outcome on a scored candidate"""
+        if not gate:
+            return
+        candidate['matched_organizations'] = gate['matched_organizations']
+        if gate['reasons']:
+            candidate['filter_reasons'] = gate['reasons']
+
+    @staticmethod
+    def _filtered_candidate(resume_file: str, gate: Dict) -> Dict:
+        """Candidate entry for a resume rejected by strict hard filters"""
+        filename = os.path.basename(resume_file)
+        fields = gate['fields']
+        return {
+            'filename': filename,
+            'filepath': resume_file,
+            'name': os.path.splitext(filename)[0],
+            'email': fields['email'],
+            'phone': fields['phone'],
+            'experience_years': fields['experience_years'],
+            'experience_source': fields['experience_source'],
+            'employment_periods': fields['employment_periods'],
+            'current_role': 'Not assessed',
+            'current_company': 'Not assessed',
+            'skills': [],
+            'education': 'Not assessed',
+            'match_score': 0,
+            'filtered': True,
+            'filter_reasons': gate['reasons'],
+            'matched_organizations': gate['matched_organizations'],
+            'strengths': [],
+            'concerns': gate['reasons'],
+            'recommendation': 'FILTERED',
+            'summary': 'Not sent for detailed analysis: ' + '; '.join(gate['reasons'])
+        }
+
+    @staticmethod
+    def _error_candidate(resume_file: str, error, error_type: str = None) -> Dict:
+        """Candidate entry for a resume that could not be processed"""
+        print(f"Error processing {resume_file}: {str(error)}")
+        candidate = {
+            'filename': os.path.basename(resume_file),
+            'filepath': resume_file,
+            'error': str(error),
+            'name': 'Error',
+            'match_score': 0
+        }
+        if error_type:
+            candidate['error_type'] = error_type
+        return candidate
@@ -0,0 +1,532 @@
+"""
+End-to-end screening benchmark against a local fake LLM
+
+Generates a synthetic corpus of PDF and DOCX resumes (1-30 pages), then
+screens batches of increasing size either directly through
+ScreeningEngine.screen_resumes or through the /screen route, with the LLM
+replaced by tools/fake_llm_server.py at a configurable latency. Each
+scenario runs in a fresh process so peak RSS is its own.
+
+Reported per scenario: wall time, resumes/second, peak RSS and
+p50/p95/p99 timings for the save, parse, prompt, llm, json, sort and
+export stages. Results are written as JSON tagged with the git commit:
+
+    python -m tools.benchmark_screening --sizes 1,10,50,60 --latency lognormal:300:0.4
+    python -m tools.benchmark_screening --compare before.json after.json
+"""
+import argparse
+import io
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STAGES = ['save', 'parse', 'prompt', 'llm', 'json', 'sort', 'export']
+LINES_PER_PAGE = 48
+
+FIRST_NAMES = ['Asha', 'Ben', 'Chloe', 'Dev', 'Elena', 'Farid', 'Grace', 'Hiro', 'Ines', 'Jonas']
+LAST_NAMES = ['Khan', 'Lopez', 'Miller', 'Nair', 'Okafor', 'Petrov', 'Quinn', 'Rossi', 'Sato', 'Turner']
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella', 'Hooli', 'Stark Industries', 'Wayne Enterprises']
+ROLES = ['Software Engineer', 'Senior Software Engineer', 'Data Engineer', 'Tech Lead', 'DevOps Engineer']
+SKILLS = ['Python', 'SQL', 'AWS', 'Docker', 'React', 'Kubernetes', 'Java', 'Go', 'Terraform', 'Spark']
+BULLETS = [
+    'Designed and shipped {skill} services handling millions of requests per day',
+    'Led a team of {n} engineers delivering a {skill} migration ahead of schedule',
+    'Reduced infrastructure cost by {n}% through {skill} automation',
+    'Mentored junior developers and ran weekly {skill} knowledge sharing sessions',
+    'Built data pipelines in {skill} feeding the analytics and reporting platform'
+]
+
+JOB_DESCRIPTION = """Senior Backend Engineer
+We are looking for an engineer with 5+ years of experience building Python services on AWS.
+Requirements: Python, SQL, Docker, Kubernetes, experience leading small teams.
+Nice to have: Terraform, Spark, experience in a SaaS company."""
+
+
+# ---------------------------------------------------------------------------
+# Synthetic corpus
+# ---------------------------------------------------------------------------
+
+def resume_lines(rng: random.Random, pages: int) -> List[str]:
+    """Text of a synthetic resume long enough to fill the given number of pages"""
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    lines = [
+        name,
+        f"{name.lower().replace(' ', '.')}@example.com | +1-555-{rng.randint(1000, 9999)}",
+        '',
+        'SUMMARY',
+        f"{rng.choice(ROLES)} with {rng.randint(1, 20)} years of experience.",
+        '',
+        'SKILLS',
+        ', '.join(rng.sample(SKILLS, 5)),
+        '',
+        'EDUCATION',
+        'BSc Computer Science, State University',
+        '',
+        'EXPERIENCE'
+    ]
+    year = 2024
+    while len(lines) < pages * LINES_PER_PAGE:
+        start = year - rng.randint(1, 4)
+        lines += ['', f"{rng.choice(ROLES)} - {rng.choice(COMPANIES)} ({start} - {year})"]
+        for _ in range(rng.randint(3, 6)):
+            bullet = rng.choice(BULLETS).format(skill=rng.choice(SKILLS), n=rng.randint(2, 40))
+            lines.append(f"- {bullet}")
+        year = start
+    return lines[:max(pages * LINES_PER_PAGE, 13)]
+
+
+def write_pdf(path: str, lines: List[str]):
+    """Write a minimal text PDF, LINES_PER_PAGE lines per page"""
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+    objects = [None, None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page in pages:
+        text = "".join(f"({_pdf_escape(line)}) '\n" for line in page)
+        stream = f"BT /F1 10 Tf 14 TL 50 790 Td\n{text}ET".encode('latin-1', 'replace')
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>".encode())
+        page_ids.append(len(objects))
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = (f"<< /Type /Pages /Count {len(page_ids)} /Kids ["
+                  + " ".join(f"{page_id} 0 R" for page_id in page_ids) + "] >>").encode()
+
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(output.tell())
+        output.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = output.tell()
+    output.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        output.write(b"%010d 00000 n \n" % offset)
+    output.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    with open(path, 'wb') as f:
+        f.write(output.getvalue())
+
+
+def write_docx(path: str, lines: List[str]):
+    """Write a DOCX with a page break every LINES_PER_PAGE lines"""
+    from docx import Document
+    from docx.enum.text import WD_BREAK
+
+    document = Document()
+    for index, line in enumerate(lines):
+        paragraph = document.add_paragraph(line)
+        if index and index % LINES_PER_PAGE == LINES_PER_PAGE - 1:
+            paragraph.add_run().add_break(WD_BREAK.PAGE)
+    document.save(path)
+
+
+def generate_corpus(folder: str, count: int, formats: List[str], max_pages: int = 30, seed: int = 0) -> List[Dict]:
+    """
+    Write count resumes to folder, alternating formats, with page counts
+    spread from 1 to max_pages (most resumes short, a long tail)
+
+    Returns:
+        List of {'path', 'format', 'pages', 'bytes'}
+    """
+    os.makedirs(folder, exist_ok=True)
+    rng = random.Random(seed)
+    corpus = []
+    for index in range(count):
+        pages = min(max_pages, max(1, int(rng.paretovariate(1.2))))
+        fmt = formats[index % len(formats)]
+        path = os.path.join(folder, f"resume_{index:04d}.{fmt}")
+        lines = resume_lines(random.Random(f"{seed}:{index}"), pages)
+        (write_pdf if fmt == 'pdf' else write_docx)(path, lines)
+        corpus.append({'path': path, 'format': fmt, 'pages': pages, 'bytes': os.path.getsize(path)})
+    return corpus
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+# ---------------------------------------------------------------------------
+# Stage timing
+# ---------------------------------------------------------------------------
+
+class StageTimer:
+    """Collect durations (seconds) per stage from any thread"""
+
+    def __init__(self):
+        self.samples = {stage: [] for stage in STAGES}
+        self.lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float):
+        with self.lock:
+            self.samples[stage].append(seconds)
+
+    def wrap(self, owner, attribute: str, stage: str):
+        """Replace owner.attribute with a version that records its duration"""
+        original = getattr(owner, attribute)
+
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.record(stage, time.perf_counter() - started)
+
+        setattr(owner, attribute, timed)
+
+    def measure(self, stage: str, func: Callable, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.record(stage, time.perf_counter() - started)
+
+    def summary(self) -> Dict:
+        return {stage: summarize(values) for stage, values in self.samples.items()}
+
+
+class _TimedJSON:
+    """Stand-in for the json module that times loads() as the 'json' stage"""
+
+    def __init__(self, timer: StageTimer):
+        self._timer = timer
+
+    def loads(self, *args, **kwargs):
+        return self._timer.measure('json', json.loads, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(json, name)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Linear-interpolated percentile (q in 0-100) of a non-empty list"""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(values: List[float]) -> Dict:
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'p50_ms': round(percentile(values, 50) * 1000, 3),
+        'p95_ms': round(percentile(values, 95) * 1000, 3),
+        'p99_ms': round(percentile(values, 99) * 1000, 3),
+        'mean_ms': round(sum(values) / len(values) * 1000, 3),
+        'total_ms': round(sum(values) * 1000, 3)
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+# ---------------------------------------------------------------------------
+# Scenarios (each runs in its own process)
+# ---------------------------------------------------------------------------
+
+def run_scenario(scenario: Dict) -> Dict:
+    """
+    Screen one batch and time its stages
+
+    Must run in a fresh process: it points the app at a private fake LLM
+    server and working directory before importing it.
+    """
+    from tools.fake_llm_server import make_server
+
+    workdir = tempfile.mkdtemp(prefix='hrms-bench-')
+    server = make_server(port=0, latency=scenario['latency'], seed=scenario['seed'])
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    os.environ.update({
+        'LLM_BACKEND': 'local',
+        'LLM_API_BASE': f"http://127.0.0.1:{server.server_address[1]}/v1",
+        'LLM_CACHE_ENABLED': 'False',
+        'RESUME_TEXT_CACHE_ENABLED': 'False',
+        'GDPR_WARMUP': 'False',
+        'RETENTION_ENABLED': 'False',
+        'EXPORTS_PRECOMPUTE': 'False',
+        'LLM_BATCH_MODE': str(scenario['batch_mode']),
+        **scenario.get('env', {})
+    })
+    os.chdir(workdir)
+    sys.path.insert(0, ROOT)
+
+    timer = StageTimer()
+    files = scenario['files']
+    try:
+        started = time.perf_counter()
+        if scenario['mode'] == 'route':
+            results = _run_route(files, timer)
+        else:
+            results = _run_engine(files, timer)
+        wall = time.perf_counter() - started
+        server_stats = dict(server.llm.stats)
+    finally:
+        server.shutdown()
+        os.chdir(ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    errors = sum(1 for candidate in results['candidates'] if 'error' in candidate)
+    return {
+        'mode': scenario['mode'],
+        'batch_size': len(files),
+        'batch_mode': scenario['batch_mode'],
+        'pages': sum(scenario['pages']),
+        'wall_seconds': round(wall, 3),
+        'resumes_per_second': round(len(files) / wall, 3) if wall else None,
+        'candidate_errors': errors,
+        'llm_requests': server_stats['requests'],
+        'peak_rss_mb': peak_rss_mb(),
+        'stages': timer.summary()
+    }
+
+
+def _instrument(engine, timer: StageTimer):
+    """Wrap the engine's collaborators so every stage is timed"""
+    import services.llm_service as llm_module
+
+    llm_service = engine.llm_service
+    timer.wrap(engine.resume_parser, 'parse_resume', 'parse')
+    timer.wrap(llm_service.prompt_builder, 'build_analysis_messages', 'prompt')
+    timer.wrap(llm_service.prompt_builder, 'build_batch_messages', 'prompt')
+    timer.wrap(llm_service.llm, 'chat', 'llm')
+    llm_module.json = _TimedJSON(timer)
+
+
+def _sort(engine, results: Dict, timer: StageTimer):
+    # The engine sorts in place inside screen_resumes; repeat it on a copy to time it
+    timer.measure('sort', sorted, list(results['candidates']), key=engine._rank_key, reverse=True)
+
+
+def _run_engine(files: List[str], timer: StageTimer) -> Dict:
+    from services.screening_engine import ScreeningEngine
+    from utils.file_handler import FileHandler
+    from utils.output_generator import OutputGenerator
+
+    engine = ScreeningEngine()
+    _instrument(engine, timer)
+    file_handler = FileHandler()
+    output_generator = OutputGenerator()
+
+    uploads = [_FileUpload(path) for path in files]
+    try:
+        saved, session_id = timer.measure('save', file_handler.save_uploads, uploads)
+    finally:
+        for upload in uploads:
+            upload.stream.close()
+    results = engine.screen_resumes(
+        resume_files=[upload['path'] for upload in saved],
+        job_description=JOB_DESCRIPTION,
+        min_experience=3,
+        max_experience=15,
+        content_hashes={upload['path']: upload['sha256'] for upload in saved}
+    )
+    _sort(engine, results, timer)
+    timer.measure('export', output_generator.generate_excel, results, session_id)
+    timer.measure('export', output_generator.generate_json, results, session_id)
+    return results
+
+
+def _run_route(files: List[str], timer: StageTimer) -> Dict:
+    import app as app_module
+
+    app_module.create_app()
+    _instrument(app_module.screening_engine, timer)
+    timer.wrap(app_module.file_handler, 'save_uploads', 'save')
+    client = app_module.app.test_client()
+
+    handles = [open(path, 'rb') for path in files]
+    try:
+        response = client.post('/screen', content_type='multipart/form-data', data={
+            'job_description': JOB_DESCRIPTION,
+            'min_experience': '3',
+            'max_experience': '15',
+            'resumes': [(handle, os.path.basename(path)) for handle, path in zip(handles, files)]
+        })
+    finally:
+        for handle in handles:
+            handle.close()
+    if response.status_code != 202:
+        raise RuntimeError(f"/screen returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+    session_id = response.get_json()['session_id']
+
+    # Consume the event stream: it ends once the job completes
+    client.get(f'/screen/events/{session_id}').get_data()
+    results = app_module.results_store.get_results(session_id)
+    if results is None:
+        raise RuntimeError(f"Screening session {session_id} did not complete")
+
+    _sort(app_module.screening_engine, results, timer)
+    for url in (f'/download/excel/{session_id}', f'/download/json/{session_id}'):
+        download = timer.measure('export', client.get, url)
+        download.get_data()
+        download.close()
+    return results
+
+
+class _FileUpload:
+    """Minimal FileStorage look-alike for FileHandler.save_uploads"""
+
+    def __init__(self, path: str):
+        self.filename = os.path.basename(path)
+        self.stream = open(path, 'rb')
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_isolated(scenario: Dict) -> Dict:
+    """Run a scenario in a child process and return its result"""
+    process = subprocess.run(
+        [sys.executable, '-m', 'tools.benchmark_screening', '--run-scenario', '-'],
+        input=json.dumps(scenario), capture_output=True, text=True, cwd=ROOT
+    )
+    lines = process.stdout.strip().splitlines()
+    if process.returncode != 0 or not lines:
+        return {'mode': scenario['mode'], 'batch_size': len(scenario['files']),
+                'error': (process.stderr or process.stdout).strip()[-2000:]}
+    return json.loads(lines[-1])
+
+
+def compare(before_path: str, after_path: str):
+    """Print throughput and per-stage p50/p95 changes between two result files"""
+    with open(before_path, 'r', encoding='utf-8') as f:
+        before = json.load(f)
+    with open(after_path, 'r', encoding='utf-8') as f:
+        after = json.load(f)
+    print(f"{before.get('commit')} -> {after.get('commit')}")
+
+    def key(result):
+        return result['mode'], result['batch_size'], result.get('batch_mode')
+
+    previous = {key(result): result for result in before['results'] if 'error' not in result}
+    for result in after['results']:
+        old = previous.get(key(result))
+        if old is None or 'error' in result:
+            continue
+        print(f"\n{result['mode']} x{result['batch_size']}: "
+              f"{old['resumes_per_second']} -> {result['resumes_per_second']} resumes/s, "
+              f"RSS {old['peak_rss_mb']} -> {result['peak_rss_mb']} MB")
+        for stage in STAGES:
+            old_stage, new_stage = old['stages'].get(stage, {}), result['stages'].get(stage, {})
+            if old_stage.get('count') and new_stage.get('count'):
+                print(f"  {stage:<7} p50 {old_stage['p50_ms']:>10.1f} -> {new_stage['p50_ms']:>10.1f} ms"
+                      f"   p95 {old_stage['p95_ms']:>10.1f} -> {new_stage['p95_ms']:>10.1f} ms")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark resume screening end to end")
+    parser.add_argument('--sizes', default=None,
+                        help="Comma-separated batch sizes (default: 1,10,25,MAX_RESUMES_PER_UPLOAD and 20%% past it)")
+    parser.add_argument('--modes', default='engine,route', help="engine, route or both")
+    parser.add_argument('--formats', default='pdf,docx', help="Resume formats to generate")
+    parser.add_argument('--max-pages', type=int, default=30)
+    parser.add_argument('--latency', default='lognormal:300:0.4', help="Fake LLM latency (see tools.fake_llm_server)")
+    parser.add_argument('--batch-mode', action='store_true', help="Score several resumes per LLM call")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--corpus-dir', help="Reuse or keep the generated corpus here")
+    parser.add_argument('--output', help="Results file (default: benchmarks/screening-<commit>.json)")
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help="Compare two results files")
+    parser.add_argument('--run-scenario', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_scenario:
+        if args.run_scenario == '-':
+            scenario = json.load(sys.stdin)
+        else:
+            with open(args.run_scenario, 'r', encoding='utf-8') as f:
+                scenario = json.load(f)
+        result = run_scenario(scenario)
+        sys.stdout.write("\n" + json.dumps(result) + "\n")
+        return 0
+
+    if args.compare:
+        compare(*args.compare)
+        return 0
+
+    sys.path.insert(0, ROOT)
+    import config
+    limit = config.MAX_RESUMES_PER_UPLOAD
+    sizes = ([int(size) for size in args.sizes.split(',')] if args.sizes
+             else sorted({1, 10, 25, limit, int(limit * 1.2)}))
+
+    corpus_dir = args.corpus_dir or tempfile.mkdtemp(prefix='hrms-corpus-')
+    print(f"Generating {max(sizes)} resumes in {corpus_dir}...")
+    corpus = generate_corpus(corpus_dir, max(sizes), args.formats.split(','), args.max_pages, args.seed)
+
+    report = {
+        'commit': git_commit(),
+        'created_at': time.time(),
+        'python': sys.version.split()[0],
+        'settings': {
+            'latency': args.latency,
+            'batch_mode': args.batch_mode,
+            'formats': args.formats,
+            'max_pages': args.max_pages,
+            'seed': args.seed,
+            'screening_max_workers': config.SCREENING_MAX_WORKERS
+        },
+        'corpus': {'resumes': len(corpus), 'pages': sum(item['pages'] for item in corpus),
+                   'bytes': sum(item['bytes'] for item in corpus)},
+        'results': []
+    }
+    for mode in args.modes.split(','):
+        for size in sizes:
+            scenario = {
+                'mode': mode,
+                'files': [item['path'] for item in corpus[:size]],
+                'pages': [item['pages'] for item in corpus[:size]],
+                'latency': args.latency,
+                'batch_mode': args.batch_mode,
+                'seed': args.seed
+            }
+            result = run_isolated(scenario)
+            report['results'].append(result)
+            if 'error' in result:
+                print(f"{mode:>6} x{size:<4} failed: {result['error'].splitlines()[-1]}")
+            else:
+                print(f"{mode:>6} x{size:<4} {result['wall_seconds']:>8.2f}s  "
+                      f"{result['resumes_per_second']:>7.2f} resumes/s  RSS {result['peak_rss_mb']} MB  "
+                      f"llm p95 {result['stages']['llm'].get('p95_ms')} ms")
+
+    if not args.corpus_dir:
+        shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    output = args.output or os.path.join(ROOT, 'benchmarks', f"screening-{report['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,353 @@
+"""
+Local stand-in for the chat completions API
+
+Speaks enough of the OpenAI chat completions protocol (including streaming
+and the Azure deployment URL layout) for the app to run against it with
+LLM_BACKEND=local. Answers are deterministic per prompt: resume analyses,
+batch analyses and job descriptions come back as valid JSON derived from a
+hash of the prompt, anything else as plain text. Latency, errors and 429s
+are injected from a seeded random source so load tests are reproducible.
+
+    python -m tools.fake_llm_server --port 8765 --latency lognormal:400:0.5 --error-rate 0.01
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_PORT = 8765
+
+CANDIDATE_HEADER = re.compile(r"=== CANDIDATE (\S+) ===")
+FIELD_LINE = re.compile(r"^(Role Title|Experience Range|Department|Location|Employment Type):\s*(.*)$", re.M)
+
+FIRST_NAMES = ['Asha', 'Ben', 'Chloe', 'Dev', 'Elena', 'Farid', 'Grace', 'Hiro', 'Ines', 'Jonas']
+LAST_NAMES = ['Khan', 'Lopez', 'Miller', 'Nair', 'Okafor', 'Petrov', 'Quinn', 'Rossi', 'Sato', 'Turner']
+SKILLS = ['Python', 'SQL', 'AWS', 'Docker', 'React', 'Kubernetes', 'Java', 'Go', 'Terraform', 'Spark']
+RECOMMENDATIONS = [(80, 'STRONG_FIT'), (65, 'GOOD_FIT'), (45, 'MODERATE_FIT'), (0, 'WEAK_FIT')]
+
+
+def parse_latency(spec: str):
+    """
+    Parse a latency distribution into a sampler of milliseconds
+
+    Supported specs: fixed:MS, uniform:LOW:HIGH, normal:MEAN:STDDEV,
+    lognormal:MEDIAN:SIGMA
+    """
+    kind, _, params = spec.partition(':')
+    values = [float(value) for value in params.split(':') if value]
+    if kind == 'fixed' and len(values) == 1:
+        return lambda rng: values[0]
+    if kind == 'uniform' and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == 'normal' and len(values) == 2:
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == 'lognormal' and len(values) == 2:
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Invalid latency spec: {spec}")
+
+
+class FakeLLM:
+    """Decide the outcome of each request and generate its answer"""
+
+    def __init__(self, latency: str = 'fixed:0', token_delay_ms: float = 0, error_rate: float = 0,
+                 rate_limit_rate: float = 0, requests_per_minute: int = 0, retry_after: float = 1,
+                 seed: int = 0, fixtures: List[Dict] = None):
+        """
+        Args:
+            latency: Distribution of the delay before the response (or first chunk)
+            token_delay_ms: Delay between streamed chunks
+            error_rate: Fraction of requests answered with a 500
+            rate_limit_rate: Fraction of requests answered with a 429
+            requests_per_minute: Simulated quota; requests over it get a 429 (0 = none)
+            retry_after: Retry-After seconds sent with 429s
+            seed: Seed for latency and error injection
+            fixtures: List of {'match': substring, 'content': text} checked before
+                the generated answers
+        """
+        self.sample_latency = parse_latency(latency)
+        self.token_delay_ms = token_delay_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.requests_per_minute = requests_per_minute
+        self.retry_after = retry_after
+        self.seed = seed
+        self.fixtures = fixtures or []
+        self.lock = threading.Lock()
+        self.recent = deque()
+        self.attempts = {}
+        self.stats = {'requests': 0, 'errors': 0, 'rate_limited': 0, 'streamed': 0}
+
+    def outcome(self, prompt: str) -> Tuple[Optional[int], float]:
+        """
+        Pick the status to fail with (None = success) and the latency in seconds
+
+        Randomness is seeded by the prompt and how often it was seen, so a
+        run replays identically however requests interleave.
+        """
+        digest = _digest(prompt)
+        with self.lock:
+            self.stats['requests'] += 1
+            attempt = self.attempts.get(digest, 0)
+            self.attempts[digest] = attempt + 1
+            over_quota = self._over_quota()
+        rng = random.Random(f"{self.seed}:{digest}:{attempt}")
+        latency = self.sample_latency(rng) / 1000
+
+        status = None
+        roll = rng.random()
+        if over_quota or roll < self.rate_limit_rate:
+            status = 429
+        elif roll < self.rate_limit_rate + self.error_rate:
+            status = 500
+        if status is not None:
+            with self.lock:
+                self.stats['rate_limited' if status == 429 else 'errors'] += 1
+        return status, latency
+
+    def answer(self, messages: List[Dict]) -> str:
+        """Deterministic answer for a conversation"""
+        prompt = "\n".join(message.get('content') or '' for message in messages)
+        for fixture in self.fixtures:
+            if fixture.get('match', '') in prompt:
+                return fixture['content']
+
+        rng = random.Random(_digest(prompt))
+        candidate_ids = CANDIDATE_HEADER.findall(prompt)
+        if candidate_ids:
+            return json.dumps([{'candidate_id': candidate_id,
+                                **_requested(_analysis(random.Random(f"{prompt}:{candidate_id}")), prompt)}
+                               for candidate_id in candidate_ids])
+        if '"match_score"' in prompt:
+            return json.dumps(_requested(_analysis(rng), prompt))
+        if '"job_title"' in prompt:
+            return json.dumps(_job_description(prompt))
+        return ("Under the GDPR, personal data in HR processes must have a lawful basis, be limited to "
+                "what is necessary and be kept no longer than needed. Candidates can request access to, "
+                f"correction of or deletion of their data. (reference {rng.randint(1000, 9999)})")
+
+    def _over_quota(self) -> bool:
+        """Sliding one-minute window over accepted requests (caller holds the lock)"""
+        if not self.requests_per_minute:
+            return False
+        now = time.monotonic()
+        while self.recent and now - self.recent[0] > 60:
+            self.recent.popleft()
+        if len(self.recent) >= self.requests_per_minute:
+            return True
+        self.recent.append(now)
+        return False
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'FakeLLM/1.0'
+
+    def do_GET(self):
+        if self.path.rstrip('/') in ('/health', '/stats'):
+            with self.server.llm.lock:
+                self._send_json(200, dict(self.server.llm.stats))
+        else:
+            self._send_json(404, {'error': {'message': 'Not found'}})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self._send_json(400, {'error': {'message': 'Invalid JSON', 'type': 'invalid_request_error'}})
+            return
+        if not self.path.split('?')[0].endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': 'Not found', 'type': 'invalid_request_error'}})
+            return
+
+        llm = self.server.llm
+        messages = body.get('messages') or []
+        status, latency = llm.outcome(json.dumps(messages))
+        time.sleep(latency)
+        if status == 429:
+            self._send_json(429, {'error': {'message': 'Rate limit reached', 'type': 'rate_limit_error'}},
+                            {'Retry-After': str(llm.retry_after)})
+            return
+        if status == 500:
+            self._send_json(500, {'error': {'message': 'Injected server error', 'type': 'server_error'}})
+            return
+
+        content = llm.answer(messages)
+        model = body.get('model') or 'fake-llm'
+        prompt_tokens = sum(_count_tokens(message.get('content') or '') for message in messages)
+        if body.get('stream'):
+            with llm.lock:
+                llm.stats['streamed'] += 1
+            self._stream(model, content, llm.token_delay_ms / 1000)
+            return
+        self._send_json(200, {
+            'id': f"chatcmpl-{_digest(content)[:24]}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': model,
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content},
+                         'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': _count_tokens(content),
+                      'total_tokens': prompt_tokens + _count_tokens(content)}
+        })
+
+    def _stream(self, model: str, content: str, token_delay: float):
+        """Send the answer as server-sent chunk events, a few words at a time"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        pieces = re.findall(r"\S+\s*", content) or ['']
+        for index in range(0, len(pieces), 3):
+            self._send_chunk(model, {'content': ''.join(pieces[index:index + 3])}, None)
+            if token_delay:
+                time.sleep(token_delay)
+        self._send_chunk(model, {}, 'stop')
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def _send_chunk(self, model: str, delta: Dict, finish_reason: Optional[str]):
+        chunk = {
+            'id': 'chatcmpl-stream',
+            'object': 'chat.completion.chunk',
+            'created': int(time.time()),
+            'model': model,
+            'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}]
+        }
+        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+        self.wfile.flush()
+
+    def _send_json(self, status: int, payload: Dict, headers: Dict = None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(host: str = '127.0.0.1', port: int = DEFAULT_PORT, verbose: bool = False,
+                **settings) -> ThreadingHTTPServer:
+    """
+    Create (but don't start) a fake server; port 0 picks a free port
+
+    Keyword settings are passed to FakeLLM. Run it with serve_forever(),
+    e.g. on a daemon thread from a benchmark.
+    """
+    server = ThreadingHTTPServer((host, port), FakeLLMHandler)
+    server.daemon_threads = True
+    server.llm = FakeLLM(**settings)
+    server.verbose = verbose
+    return server
+
+
+def _analysis(rng: random.Random) -> Dict:
+    """A plausible resume analysis drawn from rng"""
+    score = rng.randint(20, 95)
+    experience = rng.randint(0, 15)
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    return {
+        'name': name,
+        'email': f"{name.lower().replace(' ', '.')}@example.com",
+        'phone': f"+1-555-{rng.randint(1000, 9999)}",
+        'experience_years': experience,
+        'current_role': rng.choice(['Software Engineer', 'Data Analyst', 'Product Manager', 'DevOps Engineer']),
+        'current_company': rng.choice(['Acme Corp', 'Globex', 'Initech', 'Umbrella']),
+        'skills': rng.sample(SKILLS, 4),
+        'education': rng.choice(['BSc Computer Science', 'MSc Data Science', 'BEng Software Engineering']),
+        'match_score': score,
+        'strengths': [f"{experience} years of relevant experience", "Solid technical background"],
+        'concerns': ["Limited leadership experience"] if score < 70 else [],
+        'recommendation': next(label for threshold, label in RECOMMENDATIONS if score >= threshold),
+        'summary': f"Synthetic analysis with a match score of {score}."
+    }
+
+
+def _requested(analysis: Dict, prompt: str) -> Dict:
+    """Only the fields the prompt's JSON format asks for, as a real model would answer"""
+    return {field: value for field, value in analysis.items() if f'"{field}"' in prompt}
+
+
+def _job_description(prompt: str) -> Dict:
+    """A job description echoing the fields given in the prompt"""
+    fields = dict(FIELD_LINE.findall(prompt))
+    title = fields.get('Role Title') or 'Software Engineer'
+    return {
+        'job_title': title,
+        'about_company': "NeuronIQ AI builds AI products for modern HR teams.",
+        'role_overview': f"As a {title} you will help shape our products.",
+        'key_responsibilities': ["Deliver features end to end", "Collaborate across teams", "Improve quality"],
+        'required_skills': ["Communication", "Problem solving", "Ownership"],
+        'preferred_qualifications': ["Experience in a SaaS company"],
+        'experience_range': fields.get('Experience Range', ''),
+        'department': fields.get('Department', ''),
+        'employment_type': fields.get('Employment Type', ''),
+        'location': fields.get('Location', ''),
+        'why_join_us': "Work on meaningful problems with a supportive team."
+    }
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _count_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible chat completions stand-in")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--latency', default='fixed:0',
+                        help="fixed:MS, uniform:LOW:HIGH, normal:MEAN:STDDEV or lognormal:MEDIAN:SIGMA")
+    parser.add_argument('--token-delay-ms', type=float, default=0, help="Delay between streamed chunks")
+    parser.add_argument('--error-rate', type=float, default=0, help="Fraction of requests failing with 500")
+    parser.add_argument('--rate-limit-rate', type=float, default=0, help="Fraction of requests failing with 429")
+    parser.add_argument('--rpm', type=int, default=0, help="Simulated requests-per-minute quota")
+    parser.add_argument('--retry-after', type=float, default=1, help="Retry-After seconds sent with 429s")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--fixtures', help="JSON file with a list of {\"match\", \"content\"} answers")
+    parser.add_argument('--verbose', action='store_true', help="Log every request")
+    args = parser.parse_args(argv)
+
+    fixtures = None
+    if args.fixtures:
+        with open(args.fixtures, 'r', encoding='utf-8') as f:
+            fixtures = json.load(f)
+
+    server = make_server(
+        args.host, args.port, verbose=args.verbose, latency=args.latency,
+        token_delay_ms=args.token_delay_ms, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, requests_per_minute=args.rpm,
+        retry_after=args.retry_after, seed=args.seed, fixtures=fixtures
+    )
+    print(f"Fake LLM server listening on http://{args.host}:{server.server_address[1]}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,171 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+from utils.metrics import CACHE_REQUESTS
+
+
+def file_sha256(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Return the hex SHA-256 of a file's content, read in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """
+    Size-bounded LRU cache of blobs stored as files on disk
+
+    Each entry's mtime records when it was written (for TTL expiry) and
+    its atime when it was last read (for LRU eviction); both are set
+    explicitly so mount options like noatime do not matter.
+    """
+
+    def __init__(self, cache_dir: str, version: str = '1', max_bytes: int = 256 * 1024 * 1024,
+                 ttl: Optional[float] = None):
+        """
+        Args:
+            cache_dir: Folder holding this cache (one per cache type)
+            version: Entries written under another version are discarded
+            max_bytes: Total size above which least recently used entries are evicted
+            ttl: Seconds an entry stays valid after being written (None = forever)
+        """
+        self.root = os.path.join(cache_dir, f"v{version}")
+        self.name = os.path.basename(os.path.normpath(cache_dir))
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(self.root, exist_ok=True)
+        self._remove_stale_versions(cache_dir)
+        self.size = sum(size for _, _, size, _ in self._entries())
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached value for key, or None on a miss or expired entry"""
+        path = self._path(key)
+        try:
+            stat = os.stat(path)
+            if self.ttl is not None and time.time() - stat.st_mtime > self.ttl:
+                self._discard(path, stat.st_size)
+                self._record(hit=False)
+                return None
+            with open(path, 'rb') as f:
+                value = f.read()
+        except FileNotFoundError:
+            self._record(hit=False)
+            return None
+
+        # Mark as recently used while keeping the write time intact
+        try:
+            os.utime(path, (time.time(), stat.st_mtime))
+        except OSError:
+            pass
+        self._record(hit=True)
+        return value
+
+    def set(self, key: str, value: bytes):
+        """Store value under key, evicting old entries if the cache is full"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temp file and rename so readers never see partial entries
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(value)
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self.lock:
+            self.size += len(value) - previous
+            if self.size > self.max_bytes:
+                self._evict()
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and current size"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size_bytes': self.size,
+                'max_bytes': self.max_bytes
+            }
+
+    def _record(self, hit: bool):
+        CACHE_REQUESTS.inc(cache=self.name, result='hit' if hit else 'miss')
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _discard(self, path: str, size: int):
+        """Remove a single expired entry"""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        with self.lock:
+            self.size -= size
+
+    def _path(self, key: str) -> str:
+        """Shard entries by key prefix to keep directories small"""
+        return os.path.join(self.root, key[:2], key)
+
+    def _entries(self):
+        """Yield (last access time, path, size, write time) for every cached entry"""
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.endswith('.tmp'):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield stat.st_atime, path, stat.st_size, stat.st_mtime
+
+    def _evict(self):
+        """Delete least recently used entries until the cache fits again"""
+        # Evict down to 90% so a full cache does not rescan on every write;
+        # expired entries found along the way are removed as well
+        target = int(self.max_bytes * 0.9)
+        entries = sorted(self._entries())
+        size = sum(entry_size for _, _, entry_size, _ in entries)
+        expired_before = time.time() - self.ttl if self.ttl is not None else None
+        for _, path, entry_size, written_at in entries:
+            if size <= target:
+                if expired_before is None:
+                    break
+                if written_at >= expired_before:
+                    continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"Error evicting cache entry {path}: {str(e)}")
+                continue
+            size -= entry_size
+        self.size = size
+
+    def _remove_stale_versions(self, cache_dir: str):
+        """Drop entries written by other versions of the cache"""
+        current = os.path.basename(self.root)
+        for name in os.listdir(cache_dir):
+            path = os.path.join(cache_dir, name)
+            if name != current and name.startswith('v') and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
@@ -1,7 +1,17 @@
+import hashlib
+import json
 import os
+import shutil
+import tempfile
 import uuid
 from werkzeug.utils import secure_filename
-from typing import List
+from typing import Dict, List
+from utils.metrics import timed
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Session folder file listing each upload, its content hash and duplicate status
+MANIFEST_NAME = 'manifest.json'
 
 class FileHandler:
     """Handle file uploads and storage"""
@@ -10,6 +20,9 @@ class FileHandler:
         self.upload_folder = upload_folder
         self.allowed_extensions = {'pdf', 'doc', 'docx'}
         
+        # Uploads are stored once, by content hash; session folders link to them
+        self.blob_folder = os.path.join(upload_folder, 'blobs')
+        
         # Create upload folder if it doesn't exist
         if not os.path.exists(upload_folder):
             os.makedirs(upload_folder)
@@ -29,22 +42,145 @@ class FileHandler:
         Returns:
             Tuple of (saved_paths, session_id)
         """
+        uploads, session_id = self.save_uploads(files)
+        return [upload['path'] for upload in uploads], session_id
+    
+    @timed('save')
+    def save_uploads(self, files) -> tuple:
+        """
+        Save uploaded files content-addressed and link them into a session folder
+        
+        Each file is hashed while it streams to disk. Content already in the
+        blob store (from this batch or an earlier session) is not stored
+        again; the session folder gets a hard link to the existing blob
+        under the usual unique filename.
+        
+        Args:
+            files: FileStorage objects from Flask request
+            
+        Returns:
+            Tuple of (uploads, session_id) where each upload is a dict with
+            'path', 'filename', 'sha256', 'size' and 'duplicate' (None,
+            'batch' or 'previous')
+        """
         session_id = str(uuid.uuid4())
         session_folder = os.path.join(self.upload_folder, session_id)
         os.makedirs(session_folder, exist_ok=True)
         
-        saved_paths = []
+        uploads = []
+        seen = set()
         
         for file in files:
             if file and self.allowed_file(file.filename):
                 filename = secure_filename(file.filename)
-                # Add timestamp to avoid conflicts
+                extension = os.path.splitext(filename)[1].lower()
+                digest, size, is_new, tmp_path = self._store_blob(file.stream, extension)
+                
+                # Add a unique prefix to avoid conflicts
                 unique_filename = f"{uuid.uuid4().hex[:8]}_{filename}"
                 filepath = os.path.join(session_folder, unique_filename)
-                file.save(filepath)
-                saved_paths.append(filepath)
+                try:
+                    self._link(self.blob_path(digest, extension), filepath, tmp_path)
+                finally:
+                    if tmp_path is not None and os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                
+                if digest in seen:
+                    duplicate = 'batch'
+                elif not is_new:
+                    duplicate = 'previous'
+                else:
+                    duplicate = None
+                seen.add(digest)
+                uploads.append({
+                    'path': filepath,
+                    'filename': filename,
+                    'sha256': digest,
+                    'size': size,
+                    'duplicate': duplicate
+                })
+        
+        with open(os.path.join(session_folder, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+            json.dump(uploads, f, indent=2)
         
-        return saved_paths, session_id
+        return uploads, session_id
+    
+    def load_manifest(self, session_id: str) -> List[Dict]:
+        """Return the uploads recorded for a session (empty if unknown)"""
+        try:
+            with open(os.path.join(self.upload_folder, session_id, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+    
+    def blob_path(self, digest: str, extension: str) -> str:
+        return os.path.join(self.blob_folder, digest[:2], f"{digest}{extension}")
+    
+    def _store_blob(self, stream, extension: str) -> tuple:
+        """
+        Stream an upload to a temp file while hashing it, then move it into
+        the blob store unless that content is already there
+        
+        Returns:
+            Tuple of (sha256 hex digest, size in bytes, whether the blob is
+            new, temp file path or None). When the blob already existed the
+            temp copy is kept so the blob can be restored if the retention
+            janitor removes it before it is linked; the caller deletes it.
+        """
+        os.makedirs(self.blob_folder, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.blob_folder, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in iter(lambda: stream.read(UPLOAD_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+            
+            blob_path = self.blob_path(digest.hexdigest(), extension)
+            if os.path.exists(blob_path):
+                try:
+                    # Reuse counts as use, so the janitor doesn't expire it now
+                    os.utime(blob_path)
+                    return digest.hexdigest(), size, False, tmp_path
+                except FileNotFoundError:
+                    pass  # Swept in the meantime; store it again
+            
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            os.replace(tmp_path, blob_path)
+            return digest.hexdigest(), size, True, None
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
+    @staticmethod
+    def _link(blob_path: str, filepath: str, source: str = None):
+        """
+        Hard-link a blob into a session folder, copying where links are unsupported
+        
+        Args:
+            blob_path: Blob to link
+            filepath: Link to create
+            source: Temp copy of the content, used to restore the blob if it
+                was removed since it was found
+        """
+        try:
+            os.link(blob_path, filepath)
+            return
+        except FileNotFoundError:
+            if source is None:
+                raise
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            os.replace(source, blob_path)
+        except OSError:
+            shutil.copyfile(blob_path, filepath)
+            return
+        try:
+            os.link(blob_path, filepath)
+        except OSError:
+            shutil.copyfile(blob_path, filepath)
     
     def cleanup_session(self, session_id: str):
         """Delete all files for a session"""
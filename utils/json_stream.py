@@ -0,0 +1,63 @@
+import json
+from typing import Any, List, Tuple
+
+
+class JSONSectionParser:
+    """
+    Parse a JSON object incrementally, one top-level member at a time
+
+    Feed it text as it streams in; every call returns the (key, value)
+    pairs of the top-level members that have been completed since the last
+    call. Text before the opening brace (e.g. a markdown code fence) is
+    ignored, as is anything after the closing brace.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.position = 0
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.member_start = None
+        self.done = False
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """Add streamed text and return the newly completed members"""
+        self.buffer += text
+        members = []
+        while self.position < len(self.buffer) and not self.done:
+            char = self.buffer[self.position]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                if self.depth > 0:
+                    self.in_string = True
+            elif char in '{[':
+                self.depth += 1
+                if self.depth == 1:
+                    self.member_start = self.position + 1
+            elif char in '}]' and self.depth > 0:
+                if self.depth == 1:
+                    members.extend(self._complete_member())
+                    self.done = True
+                self.depth -= 1
+            elif char == ',' and self.depth == 1:
+                members.extend(self._complete_member())
+                self.member_start = self.position + 1
+            self.position += 1
+        return members
+
+    def _complete_member(self) -> List[Tuple[str, Any]]:
+        """Decode the member between member_start and the current position"""
+        member = self.buffer[self.member_start:self.position].strip()
+        if not member:
+            return []
+        try:
+            return list(json.loads("{" + member + "}").items())
+        except json.JSONDecodeError:
+            return []
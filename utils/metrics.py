@@ -0,0 +1,322 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import config
+
+# Latency buckets (seconds) covering fast local stages up to slow LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Metric:
+    """Base class for a named metric family with optional labels"""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+
+    def _key(self, labels: Dict) -> Tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _format_labels(self, key: Tuple, extra: Dict = None) -> str:
+        pairs = list(zip(self.labelnames, key)) + list((extra or {}).items())
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monotonically increasing value per label set"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self.lock:
+            return [f"{self.name}{self._format_labels(key)} {_number(value)}"
+                    for key, value in sorted(self.values.items())]
+
+
+class Gauge(Metric):
+    """Value that can go up and down, or be read from a callback at scrape time"""
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 function: Callable[[], Dict[Tuple, float]] = None):
+        """
+        Args:
+            function: Optional callback returning {label values tuple: value};
+                used instead of set()/inc() for values owned by another object
+        """
+        super().__init__(name, documentation, labelnames)
+        self.values = {}
+        self.function = function
+
+    def set(self, value: float, **labels):
+        with self.lock:
+            self.values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def samples(self) -> List[str]:
+        if self.function is not None:
+            try:
+                values = self.function()
+            except Exception as e:
+                print(f"Error collecting metric {self.name}: {str(e)}")
+                return []
+        else:
+            with self.lock:
+                values = dict(self.values)
+        return [f"{self.name}{self._format_labels(key)} {_number(value)}"
+                for key, value in sorted(values.items())]
+
+
+class Histogram(Metric):
+    """Distribution of observations in cumulative buckets, with sum and count"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self.values = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self.lock:
+            counts, total = self.values.get(key, ([0] * len(self.buckets), 0.0))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            self.values[key] = (counts, total + value)
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self.lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self.values.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = '+Inf' if bound == math.inf else _number(bound)
+                lines.append(f"{self.name}_bucket{self._format_labels(key, {'le': le})} {cumulative}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {_number(total)}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together in the Prometheus text format"""
+
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        """Add a metric, returning the one already registered under its name if any"""
+        with self.lock:
+            existing = self.metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self.metrics[metric.name] = metric
+            return metric
+
+    def render(self) -> str:
+        with self.lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+# Metrics are kept per process; with several app workers, scrape each one
+REGISTRY = Registry()
+
+
+def counter(name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames: Iterable[str] = (),
+          function: Callable[[], Dict[Tuple, float]] = None) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames, function))
+
+
+def histogram(name: str, documentation: str, labelnames: Iterable[str] = (),
+              buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+def render() -> str:
+    """All registered metrics in the Prometheus text exposition format"""
+    return REGISTRY.render()
+
+
+STAGE_SECONDS = histogram('hrms_stage_duration_seconds', 'Duration of processing stages', ['stage'])
+ERRORS = counter('hrms_errors_total', 'Errors by stage and exception type', ['stage', 'type'])
+LLM_TOKENS = counter('hrms_llm_tokens_total', 'LLM tokens used', ['model', 'kind'])
+LLM_COST = counter('hrms_llm_cost_usd_total', 'Estimated LLM spend in USD', ['model'])
+CACHE_REQUESTS = counter('hrms_cache_requests_total', 'Cache lookups by cache and result', ['cache', 'result'])
+
+
+class SessionMetrics:
+    """
+    Stage durations and LLM usage collected for one unit of work, e.g. a
+    screening session
+
+    Bind it to the threads doing the work with recording(); every timed()
+    stage and every LLM call made on those threads is then added here as
+    well as to the process-wide metrics.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost_usd = 0.0
+        self.llm_calls = 0
+        self.lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float):
+        with self.lock:
+            count, total, slowest = self.stages.get(stage, (0, 0.0, 0.0))
+            self.stages[stage] = (count + 1, total + seconds, max(slowest, seconds))
+
+    def add_usage(self, prompt_tokens: int, completion_tokens: int, cost: float):
+        with self.lock:
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self.cost_usd += cost
+            self.llm_calls += 1
+
+    def summary(self) -> Dict:
+        """Stage timings ({stage: count, total_seconds, max_seconds}) and LLM usage"""
+        with self.lock:
+            return {
+                'stages': {
+                    stage: {'count': count, 'total_seconds': round(total, 4), 'max_seconds': round(slowest, 4)}
+                    for stage, (count, total, slowest) in self.stages.items()
+                },
+                'llm_calls': self.llm_calls,
+                'prompt_tokens': self.prompt_tokens,
+                'completion_tokens': self.completion_tokens,
+                'cost_usd': round(self.cost_usd, 6)
+            }
+
+
+_local = threading.local()
+
+
+@contextmanager
+def recording(session: Optional[SessionMetrics]):
+    """Add stages timed and LLM calls made on this thread to session while the block runs"""
+    previous = getattr(_local, 'session', None)
+    _local.session = session
+    try:
+        yield session
+    finally:
+        _local.session = previous
+
+
+def current_session() -> Optional[SessionMetrics]:
+    """The SessionMetrics bound to this thread, if any"""
+    return getattr(_local, 'session', None)
+
+
+def bind(func: Callable, session: Optional[SessionMetrics]) -> Callable:
+    """Wrap func so it records into session on whichever thread runs it"""
+    if session is None:
+        return func
+
+    def run(*args, **kwargs):
+        with recording(session):
+            return func(*args, **kwargs)
+    return run
+
+
+@contextmanager
+def timed(stage: str):
+    """
+    Time a block (or, used as a decorator, a function) as a processing stage
+
+    The duration goes to hrms_stage_duration_seconds and to the
+    SessionMetrics bound to this thread, if any. Exceptions are counted in hrms_errors_total
+    and re-raised.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        count_error(stage, e)
+        raise
+    finally:
+        seconds = time.perf_counter() - started
+        STAGE_SECONDS.observe(seconds, stage=stage)
+        session = getattr(_local, 'session', None)
+        if session is not None:
+            session.add(stage, seconds)
+
+
+def count_error(stage: str, error) -> None:
+    """Count an error; error may be an exception or a type name"""
+    ERRORS.inc(stage=stage, type=error if isinstance(error, str) else type(error).__name__)
+
+
+def llm_cost(prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimated USD cost of a call at the configured per-1K-token prices"""
+    return (prompt_tokens * config.LLM_PROMPT_COST_PER_1K_TOKENS
+            + completion_tokens * config.LLM_COMPLETION_COST_PER_1K_TOKENS) / 1000
+
+
+def record_llm_usage(model: str, prompt_tokens: int, completion_tokens: int):
+    """Count a call's tokens and cost, process-wide and for the bound session"""
+    cost = llm_cost(prompt_tokens, completion_tokens)
+    LLM_TOKENS.inc(prompt_tokens, model=model, kind='prompt')
+    LLM_TOKENS.inc(completion_tokens, model=model, kind='completion')
+    LLM_COST.inc(cost, model=model)
+    session = getattr(_local, 'session', None)
+    if session is not None:
+        session.add_usage(prompt_tokens, completion_tokens, cost)
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
@@ -1,9 +1,19 @@
 import json
 import os
-from typing import Dict, List
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, TextIO, Union
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment
+from openpyxl.utils import get_column_letter
 from datetime import datetime
+import config
+from utils.metrics import timed
+
+EXCEL_HEADERS = ['Rank', 'Name', 'Match Score', 'Experience (Years)',
+                 'Current Role', 'Current Company', 'Education',
+                 'Recommendation', 'Email', 'Phone']
+
+EXCEL_MAX_COLUMN_WIDTH = 50
 
 class OutputGenerator:
     """Generate output files (Excel, JSON) from screening results"""
@@ -13,17 +23,29 @@ class OutputGenerator:
         if not os.path.exists(output_folder):
             os.makedirs(output_folder)
     
-    def generate_excel(self, results: Dict, session_id: str) -> str:
+    def generate_excel(self, results: Dict, session_id: str, streaming: bool = None) -> str:
         """
         Generate Excel report from screening results
         
         Args:
             results: Screening results dictionary
             session_id: Session identifier
+            streaming: Use a write-only workbook (defaults to EXCEL_STREAMING)
             
         Returns:
             Path to generated Excel file
         """
+        if streaming is None:
+            streaming = config.EXCEL_STREAMING
+        if streaming:
+            candidates = results.get('candidates', [])
+            return self.generate_excel_stream(lambda: candidates, session_id)
+        
+        return self._generate_excel_in_memory(results, session_id)
+    
+    @timed('export_xlsx')
+    def _generate_excel_in_memory(self, results: Dict, session_id: str) -> str:
+        """Build the Excel report as a regular (in-memory) workbook"""
         wb = Workbook()
         ws = wb.active
         ws.title = "Screening Results"
@@ -50,7 +72,7 @@ class OutputGenerator:
                 idx,
                 candidate.get('name', 'Unknown'),
                 candidate.get('match_score', 0),
-                candidate.get('experience_years', 0),
+                _experience(candidate),
                 candidate.get('current_role', 'N/A'),
                 candidate.get('current_company', 'N/A'),
                 candidate.get('education', 'N/A'),
@@ -82,6 +104,83 @@ class OutputGenerator:
         
         return filepath
     
+    def generate_excel_stream(self, candidates: Callable[[], Iterable[Dict]], session_id: str) -> str:
+        """
+        Generate Excel report with a write-only workbook
+        
+        Args:
+            candidates: Returns a fresh iterable of candidates in rank order
+                each time it is called (it is read twice)
+            session_id: Session identifier
+            
+        Returns:
+            Path to generated Excel file
+        """
+        filename = f"screening_results_{session_id}.xlsx"
+        filepath = os.path.join(self.output_folder, filename)
+        self.write_excel_stream(candidates, filepath)
+        return filepath
+    
+    @timed('export_xlsx')
+    def write_excel_stream(self, candidates: Callable[[], Iterable[Dict]],
+                           target: Union[str, BinaryIO]):
+        """
+        Write the Excel report to a path or binary file object
+        
+        Rows go through a write-only worksheet, which spools them to disk
+        as they are appended, so memory use does not grow with the number
+        of candidates. Column widths have to be written before any rows, so
+        they come from a first pass over the row values rather than from
+        reading cells back afterwards.
+        
+        Args:
+            candidates: Returns a fresh iterable of candidates in rank order
+                each time it is called (it is read twice)
+            target: File path or writable binary file object
+        """
+        widths = [len(header) for header in EXCEL_HEADERS]
+        for row in self._excel_rows(candidates()):
+            for col, value in enumerate(row):
+                widths[col] = max(widths[col], len(str(value)))
+        
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Screening Results")
+        for col, width in enumerate(widths, 1):
+            ws.column_dimensions[get_column_letter(col)].width = min(width + 2, EXCEL_MAX_COLUMN_WIDTH)
+        
+        header_fill = PatternFill(start_color="E50914", end_color="E50914", fill_type="solid")
+        header_font = Font(bold=True, color="FFFFFF")
+        header_row = []
+        for header in EXCEL_HEADERS:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.fill = header_fill
+            cell.font = header_font
+            cell.alignment = Alignment(horizontal='center', vertical='center')
+            header_row.append(cell)
+        ws.append(header_row)
+        
+        for row in self._excel_rows(candidates()):
+            ws.append(row)
+        
+        wb.save(target)
+    
+    @staticmethod
+    def _excel_rows(candidates: Iterable[Dict]) -> Iterator[List]:
+        """Yield one report row per candidate"""
+        for idx, candidate in enumerate(candidates, 1):
+            yield [
+                idx,
+                candidate.get('name', 'Unknown'),
+                candidate.get('match_score', 0),
+                _experience(candidate),
+                candidate.get('current_role', 'N/A'),
+                candidate.get('current_company', 'N/A'),
+                candidate.get('education', 'N/A'),
+                candidate.get('recommendation', 'N/A'),
+                candidate.get('email', 'N/A'),
+                candidate.get('phone', 'N/A')
+            ]
+    
     def generate_json(self, results: Dict, session_id: str) -> str:
         """
         Generate JSON file from screening results
@@ -93,21 +192,26 @@ class OutputGenerator:
         Returns:
             Path to generated JSON file
         """
-        # Add metadata
-        output = {
-            'session_id': session_id,
-            'generated_at': datetime.now().isoformat(),
-            'results': results
-        }
-        
         filename = f"screening_results_{session_id}.json"
         filepath = os.path.join(self.output_folder, filename)
         
         with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
+            self.write_json(results, session_id, f)
         
         return filepath
     
+    @timed('export_json')
+    def write_json(self, results: Dict, session_id: str, target: TextIO):
+        """Write the JSON report to a text file object"""
+        # Add metadata
+        output = {
+            'session_id': session_id,
+            'generated_at': datetime.now().isoformat(),
+            'results': results
+        }
+        json.dump(output, target, indent=2, ensure_ascii=False)
+    
+    @timed('export_report')
     def generate_candidate_report(self, candidate: Dict, session_id: str) -> str:
         """
         Generate detailed HTML report for a single candidate
@@ -185,7 +289,7 @@ class OutputGenerator:
             
             <div class="section">
                 <h2>Experience</h2>
-                <p><span class="label">Years:</span> {candidate.get('experience_years', 0)}</p>
+                <p><span class="label">Years:</span> {_experience(candidate)}</p>
                 <p><span class="label">Current Role:</span> {candidate.get('current_role', 'N/A')}</p>
                 <p><span class="label">Current Company:</span> {candidate.get('current_company', 'N/A')}</p>
             </div>
@@ -225,3 +329,9 @@ class OutputGenerator:
         """
         
         return html
+
+
+def _experience(candidate: Dict):
+    """Years of experience, or 'Unknown' when they couldn't be extracted"""
+    years = candidate.get('experience_years')
+    return 'Unknown' if years is None else years
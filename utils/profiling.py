@@ -0,0 +1,263 @@
+import json
+import os
+import re
+import sys
+import sysconfig
+import threading
+import time
+import uuid
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+import config
+
+# Worker threads differ only by their numbers; merge them in the stacks
+_THREAD_NUMBER = re.compile(r'[_-]\d+')
+
+_STDLIB = sysconfig.get_paths()['stdlib'] + os.sep
+
+_local = threading.local()
+
+
+class Profile:
+    """
+    Sampling profile of one request and the background work it starts
+
+    A sampler thread records the stacks of every attached thread at a fixed
+    interval. The request thread is attached from start() until finish();
+    functions wrapped with bind() attach whichever thread runs them, so
+    screening jobs and their worker pools are profiled too. The profile is
+    written once the request and every bound function have finished (or
+    PROFILING_MAX_SECONDS has passed).
+    """
+
+    def __init__(self, label: Dict, profiles_dir: str = None, interval: float = None,
+                 max_seconds: float = None):
+        """
+        Args:
+            label: Metadata saved with the profile (endpoint, method, path...)
+            profiles_dir: Output directory (defaults to PROFILES_FOLDER)
+            interval: Seconds between samples (defaults to PROFILING_INTERVAL_MS)
+            max_seconds: Sampling limit (defaults to PROFILING_MAX_SECONDS)
+        """
+        self.profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.label = dict(label)
+        self.profiles_dir = profiles_dir or config.PROFILES_FOLDER
+        self.interval = interval or config.PROFILING_INTERVAL_MS / 1000
+        self.max_seconds = max_seconds or config.PROFILING_MAX_SECONDS
+
+        self.stacks = {}
+        self.samples = 0
+        self.threads = {}
+        self.holds = 0
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        self.sampler = threading.Thread(target=self._sample_loop, name='profiler', daemon=True)
+        self.started = time.time()
+
+    def start(self):
+        self.sampler.start()
+
+    def attach(self):
+        """Sample the calling thread until detach()"""
+        ident = threading.get_ident()
+        with self.lock:
+            self.threads[ident] = self.threads.get(ident, 0) + 1
+
+    def detach(self):
+        ident = threading.get_ident()
+        with self.lock:
+            count = self.threads.get(ident, 0) - 1
+            if count > 0:
+                self.threads[ident] = count
+            else:
+                self.threads.pop(ident, None)
+        self._maybe_finish()
+
+    def hold(self):
+        """Keep the profile open for work that hasn't started yet"""
+        with self.lock:
+            self.holds += 1
+
+    def release(self):
+        with self.lock:
+            self.holds -= 1
+        self._maybe_finish()
+
+    def _maybe_finish(self):
+        with self.lock:
+            if not self.threads and self.holds <= 0:
+                self.done.set()
+
+    def _sample_loop(self):
+        deadline = self.started + self.max_seconds
+        while not self.done.wait(self.interval) and time.time() < deadline:
+            self._sample()
+        try:
+            self.save()
+        except Exception as e:
+            print(f"Error saving profile {self.profile_id}: {str(e)}")
+
+    def _sample(self):
+        with self.lock:
+            idents = list(self.threads)
+        frames = sys._current_frames()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident in idents:
+            frame = frames.get(ident)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack.append(_THREAD_NUMBER.sub('', names.get(ident, 'thread')))
+            key = ';'.join(reversed(stack))
+            self.stacks[key] = self.stacks.get(key, 0) + 1
+        self.samples += 1
+
+    def save(self):
+        """Write the collapsed stacks and a summary with the slowest frames"""
+        os.makedirs(self.profiles_dir, exist_ok=True)
+        base = os.path.join(self.profiles_dir, self.profile_id)
+        # One "frame;frame;frame count" line per stack, as read by flamegraph.pl and speedscope
+        with open(base + '.collapsed', 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+
+        summary = {
+            'id': self.profile_id,
+            'started_at': self.started,
+            'duration_seconds': round(time.time() - self.started, 4),
+            'interval_seconds': self.interval,
+            'samples': self.samples,
+            **self.label,
+            'slowest_frames': slowest_frames(self.stacks, self.interval)
+        }
+        with open(base + '.json', 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        prune_profiles(self.profiles_dir)
+
+
+def slowest_frames(stacks: Dict[str, int], interval: float, limit: int = 10) -> List[Dict]:
+    """
+    Frames with the most time spent in them (self) and under them (total)
+
+    Args:
+        stacks: Collapsed stack -> sample count
+        interval: Seconds per sample
+        limit: Number of frames returned, ordered by self time
+
+    Returns:
+        List of {'frame', 'self_seconds', 'total_seconds'} dicts
+    """
+    own, total = {}, {}
+    for stack, count in stacks.items():
+        frames = stack.split(';')[1:]  # Skip the thread name
+        if not frames:
+            continue
+        own[frames[-1]] = own.get(frames[-1], 0) + count
+        for frame in set(frames):
+            total[frame] = total.get(frame, 0) + count
+    ranked = sorted(own.items(), key=lambda item: item[1], reverse=True)[:limit]
+    return [
+        {'frame': frame, 'self_seconds': round(count * interval, 4),
+         'total_seconds': round(total[frame] * interval, 4)}
+        for frame, count in ranked
+    ]
+
+
+def start(label: Dict) -> Profile:
+    """Start profiling the calling thread (e.g. a Flask request) until finish()"""
+    profile = Profile(label)
+    profile.attach()
+    profile.start()
+    _local.profile = profile
+    return profile
+
+
+def finish():
+    """Detach the calling thread from the profile begun with start()"""
+    profile = getattr(_local, 'profile', None)
+    if profile is None:
+        return
+    _local.profile = None
+    profile.detach()
+
+
+def current() -> Optional[Profile]:
+    """The profile the calling thread is attached to, if any"""
+    return getattr(_local, 'profile', None)
+
+
+def bind(func: Callable) -> Callable:
+    """
+    Wrap func so the thread running it joins the caller's profile
+
+    Returns func itself when the caller isn't being profiled. The profile
+    stays open until the wrapper has run to completion at least once.
+    """
+    profile = getattr(_local, 'profile', None)
+    if profile is None:
+        return func
+    profile.hold()
+    first_run = threading.Lock()
+
+    def run(*args, **kwargs):
+        previous = getattr(_local, 'profile', None)
+        _local.profile = profile
+        profile.attach()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.profile = previous
+            if first_run.acquire(blocking=False):
+                profile.release()
+            profile.detach()
+    return run
+
+
+def list_profiles(profiles_dir: str = None, limit: int = 50) -> List[Dict]:
+    """Summaries of the most recent profiles, newest first"""
+    profiles_dir = profiles_dir or config.PROFILES_FOLDER
+    if not os.path.isdir(profiles_dir):
+        return []
+    names = sorted((name for name in os.listdir(profiles_dir) if name.endswith('.json')), reverse=True)
+    summaries = []
+    for name in names[:limit]:
+        try:
+            with open(os.path.join(profiles_dir, name), encoding='utf-8') as f:
+                summaries.append(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"Error reading profile {name}: {str(e)}")
+    return summaries
+
+
+def prune_profiles(profiles_dir: str, keep: int = None):
+    """Delete all but the newest PROFILING_KEEP profiles"""
+    keep = config.PROFILING_KEEP if keep is None else keep
+    ids = sorted({os.path.splitext(name)[0] for name in os.listdir(profiles_dir)
+                  if name.endswith(('.json', '.collapsed'))}, reverse=True)
+    for profile_id in ids[keep:]:
+        for ext in ('.json', '.collapsed'):
+            try:
+                os.remove(os.path.join(profiles_dir, profile_id + ext))
+            except FileNotFoundError:
+                pass
+
+
+@lru_cache(maxsize=4096)
+def _short_path(filename: str) -> str:
+    """Path relative to site-packages or the app, so frames stay readable"""
+    if not os.path.isabs(filename):
+        return filename  # e.g. <frozen importlib._bootstrap>
+    for marker in ('site-packages' + os.sep, 'dist-packages' + os.sep):
+        index = filename.rfind(marker)
+        if index != -1:
+            return filename[index + len(marker):]
+    if filename.startswith(_STDLIB):
+        return filename[len(_STDLIB):]
+    try:
+        return os.path.relpath(filename)
+    except ValueError:
+        return filename
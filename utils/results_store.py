@@ -0,0 +1,310 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+import config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    job_description TEXT,
+    criteria TEXT,
+    prerank TEXT,
+    file_paths TEXT,
+    metrics TEXT,
+    owner_pid INTEGER,
+    duplicates INTEGER,
+    hard_filters TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_updated_at ON sessions (updated_at);
+
+CREATE TABLE IF NOT EXISTS candidates (
+    session_id TEXT NOT NULL REFERENCES sessions (session_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT,
+    match_score REAL,
+    recommendation TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (session_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_candidates_score ON candidates (session_id, match_score);
+"""
+
+
+class ResultsStore:
+    """
+    Persist screening sessions and their candidates in a local SQLite database
+
+    The database runs in WAL mode so any number of app worker processes can
+    read results while one of them writes. While a job runs, candidates are
+    appended in completion order; once it finishes they are replaced by the
+    final ranking, so candidate positions match the results page.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or config.RESULTS_DB_PATH
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._local = threading.local()
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        # Databases created before these session columns were added
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}
+        for column, column_type in (('metrics', 'TEXT'), ('owner_pid', 'INTEGER'), ('duplicates', 'INTEGER'),
+                                    ('hard_filters', 'TEXT')):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE sessions ADD COLUMN {column} {column_type}")
+
+    def create_session(self, session_id: str, total: int, job_description: str = None,
+                       criteria: Dict = None, file_paths: List[str] = None):
+        """Record a newly queued screening session, owned by the calling process"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, status, total, completed, job_description,"
+                " criteria, file_paths, owner_pid, created_at, updated_at)"
+                " VALUES (?, 'queued', ?, 0, ?, ?, ?, ?, ?, ?)",
+                (session_id, total, job_description, _dumps(criteria), _dumps(file_paths), os.getpid(), now, now)
+            )
+
+    def set_status(self, session_id: str, status: str, error: str = None):
+        """Update a session's status (queued, running, completed, failed)"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE sessions SET status = ?, error = ?, updated_at = ? WHERE session_id = ?",
+                (status, error, time.time(), session_id)
+            )
+
+    def fail_orphaned(self) -> int:
+        """
+        Mark queued or running sessions whose owning process has exited as failed
+
+        Jobs run in the process that queued them, so a session left in flight
+        by a restart would otherwise be polled forever. Call this at startup,
+        before the process queues jobs of its own.
+
+        Returns:
+            Number of sessions marked as failed
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT session_id, owner_pid FROM sessions WHERE status IN ('queued', 'running')"
+            ).fetchall()
+            orphaned = [(time.time(), row[0]) for row in rows
+                        if row[1] is None or row[1] == os.getpid() or not _process_alive(row[1])]
+            conn.executemany(
+                "UPDATE sessions SET status = 'failed', error = 'Interrupted by a server restart',"
+                " updated_at = ? WHERE session_id = ? AND status IN ('queued', 'running')",
+                orphaned
+            )
+        return len(orphaned)
+
+    def add_candidate(self, session_id: str, candidate: Dict):
+        """Append a candidate screened while the job is still running"""
+        with self._connect() as conn:
+            position = conn.execute(
+                "SELECT completed FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if position is None:
+                return
+            conn.execute(
+                "INSERT OR REPLACE INTO candidates (session_id, position, name, match_score, recommendation, data)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                _candidate_row(session_id, position[0], candidate)
+            )
+            conn.execute(
+                "UPDATE sessions SET completed = completed + 1, updated_at = ? WHERE session_id = ?",
+                (time.time(), session_id)
+            )
+
+    def save_results(self, session_id: str, results: Dict, file_paths: List[str] = None):
+        """
+        Store the final results of a screening session
+
+        Args:
+            session_id: Session identifier
+            results: Results dictionary from ScreeningEngine.screen_resumes
+            file_paths: Paths of the uploaded resumes
+        """
+        candidates = results.get('candidates', [])
+        now = time.time()
+        with self._connect() as conn:
+            created = conn.execute(
+                "SELECT created_at FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, status, total, completed, error, job_description,"
+                " criteria, prerank, file_paths, metrics, duplicates, hard_filters, created_at, updated_at)"
+                " VALUES (?, 'completed', ?, ?, NULL, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (session_id, len(candidates), len(candidates), results.get('job_description'),
+                 _dumps(results.get('criteria')), _dumps(results.get('prerank')), _dumps(file_paths),
+                 _dumps(results.get('metrics')), results.get('duplicates'), _dumps(results.get('hard_filters')),
+                 created[0] if created else now, now)
+            )
+            conn.execute("DELETE FROM candidates WHERE session_id = ?", (session_id,))
+            conn.executemany(
+                "INSERT INTO candidates (session_id, position, name, match_score, recommendation, data)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (_candidate_row(session_id, position, candidate) for position, candidate in enumerate(candidates))
+            )
+
+    def get_session(self, session_id: str) -> Optional[Dict]:
+        """Return a session's status and metadata (without candidates), or None"""
+        row = self._connect().execute(
+            "SELECT * FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        session = dict(row)
+        for field in ('criteria', 'prerank', 'file_paths', 'metrics', 'hard_filters'):
+            session[field] = _loads(session[field])
+        return session
+
+    def get_candidates(self, session_id: str, offset: int = 0, limit: int = None) -> List[Dict]:
+        """Return a page of a session's candidates in rank (or completion) order"""
+        rows = self._connect().execute(
+            "SELECT data FROM candidates WHERE session_id = ? ORDER BY position LIMIT ? OFFSET ?",
+            (session_id, -1 if limit is None else limit, offset)
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def iter_candidates(self, session_id: str, page_size: int = 500) -> Iterator[Dict]:
+        """
+        Yield all of a session's candidates in position order, one page at a time
+
+        Pages are fetched by position rather than OFFSET, so each query is an
+        index range scan and memory holds at most one page.
+        """
+        position = -1
+        while True:
+            rows = self._connect().execute(
+                "SELECT position, data FROM candidates WHERE session_id = ? AND position > ?"
+                " ORDER BY position LIMIT ?",
+                (session_id, position, page_size)
+            ).fetchall()
+            for row in rows:
+                yield json.loads(row[1])
+            if len(rows) < page_size:
+                return
+            position = rows[-1][0]
+
+    def get_candidate(self, session_id: str, position: int) -> Optional[Dict]:
+        """Return a single candidate by its position, or None"""
+        row = self._connect().execute(
+            "SELECT data FROM candidates WHERE session_id = ? AND position = ?", (session_id, position)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_results(self, session_id: str, offset: int = 0, limit: int = None) -> Optional[Dict]:
+        """
+        Return a completed session shaped like ScreeningEngine results
+
+        Args:
+            session_id: Session identifier
+            offset: Index of the first candidate to include
+            limit: Maximum number of candidates to include (None = all)
+
+        Returns:
+            Results dictionary, or None if the session is unknown or unfinished
+        """
+        session = self.get_session(session_id)
+        if session is None or session['status'] != 'completed':
+            return None
+
+        candidates = self.get_candidates(session_id, offset, limit)
+        top_candidate = candidates[0] if offset == 0 and candidates else self.get_candidate(session_id, 0)
+        results = {
+            'candidates': candidates,
+            'top_candidate': top_candidate,
+            'total_candidates': session['total'],
+            'job_description': session['job_description'],
+            'criteria': session['criteria'] or {}
+        }
+        if session['prerank']:
+            results['prerank'] = session['prerank']
+        if session['duplicates']:
+            results['duplicates'] = session['duplicates']
+        if session['hard_filters']:
+            results['hard_filters'] = session['hard_filters']
+        if session['metrics']:
+            results['metrics'] = session['metrics']
+        return results
+
+    def delete_session(self, session_id: str):
+        """Remove a session and its candidates"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def evict_older_than(self, max_age_seconds: float, limit: int = None) -> int:
+        """
+        Delete sessions not updated within max_age_seconds
+
+        Args:
+            max_age_seconds: Age after which a session is removed
+            limit: Maximum number of sessions removed (oldest first, None = all)
+
+        Returns:
+            Number of sessions removed
+        """
+        cutoff = time.time() - max_age_seconds
+        with self._connect() as conn:
+            return conn.execute(
+                "DELETE FROM sessions WHERE session_id IN (SELECT session_id FROM sessions"
+                " WHERE updated_at < ? ORDER BY updated_at LIMIT ?)",
+                (cutoff, -1 if limit is None else limit)
+            ).rowcount
+
+    def has_session(self, session_id: str) -> bool:
+        return self._connect().execute(
+            "SELECT 1 FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone() is not None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'connection', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.connection = conn
+        return conn
+
+
+def _candidate_row(session_id: str, position: int, candidate: Dict) -> tuple:
+    return (
+        session_id,
+        position,
+        candidate.get('name'),
+        candidate.get('match_score'),
+        candidate.get('recommendation'),
+        json.dumps(candidate)
+    )
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # Exists, but owned by another user
+    return True
+
+
+def _dumps(value) -> Optional[str]:
+    return None if value is None else json.dumps(value)
+
+
+def _loads(value: Optional[str]):
+    return None if value is None else json.loads(value)
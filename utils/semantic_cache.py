@@ -0,0 +1,144 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+
+
+def normalize_question(text: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation"""
+    return re.sub(r'\s+', ' ', text).strip().lower().rstrip('?!. ')
+
+
+class LRUCache:
+    """Small thread-safe in-memory LRU mapping"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+class SemanticCache:
+    """
+    In-memory answer cache matched by embedding similarity
+
+    A lookup returns the stored answer whose question embedding has the
+    highest cosine similarity to the query, provided it reaches the
+    threshold and was stored under the same index version. Embeddings are
+    kept as rows of one normalized matrix, so a lookup is a single
+    matrix-vector product.
+    """
+
+    def __init__(self, max_entries: int = 500, threshold: float = 0.92, ttl: float = None):
+        """
+        Args:
+            max_entries: Answers kept before the least recently used is evicted
+            threshold: Minimum cosine similarity for a hit
+            ttl: Seconds an answer stays valid (None = until evicted)
+        """
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl = ttl
+        self._matrix = None
+        self._entries = []
+        self._last_used = []
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, embedding, version: str) -> Optional[Tuple[Any, float]]:
+        """
+        Find a cached answer for a question embedding
+
+        Returns:
+            Tuple of (answer, similarity), or None on a miss
+        """
+        query = _unit(embedding)
+        with self._lock:
+            if self._matrix is not None:
+                similarities = self._matrix @ query
+                now = time.time()
+                for row in np.argsort(similarities)[::-1]:
+                    if similarities[row] < self.threshold:
+                        break
+                    entry = self._entries[row]
+                    if entry['version'] != version or self._expired(entry, now):
+                        continue
+                    self._last_used[row] = now
+                    self.hits += 1
+                    return entry['answer'], float(similarities[row])
+            self.misses += 1
+            return None
+
+    def store(self, embedding, answer: Any, version: str, question: str = None):
+        """Cache an answer under its question embedding and index version"""
+        if self.max_entries <= 0:
+            return
+        vector = _unit(embedding)
+        now = time.time()
+        entry = {'question': question, 'answer': answer, 'version': version, 'created_at': now}
+        with self._lock:
+            # Entries from an older index are never served again
+            stale = [row for row, cached in enumerate(self._entries)
+                     if cached['version'] != version or self._expired(cached, now)]
+            if stale:
+                self._remove_rows(stale)
+            if len(self._entries) >= self.max_entries:
+                self._remove_rows([int(np.argmin(self._last_used))])
+
+            self._matrix = vector[np.newaxis, :] if self._matrix is None else np.vstack([self._matrix, vector])
+            self._entries.append(entry)
+            self._last_used.append(now)
+
+    def clear(self):
+        with self._lock:
+            self._matrix = None
+            self._entries = []
+            self._last_used = []
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+    def _expired(self, entry: Dict, now: float) -> bool:
+        return self.ttl is not None and now - entry['created_at'] > self.ttl
+
+    def _remove_rows(self, rows):
+        removed = set(rows)
+        keep = [row for row in range(len(self._entries)) if row not in removed]
+        self._entries = [self._entries[row] for row in keep]
+        self._last_used = [self._last_used[row] for row in keep]
+        self._matrix = self._matrix[keep] if keep else None
+
+
+def _unit(embedding) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32).ravel()
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
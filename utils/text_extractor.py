@@ -0,0 +1,68 @@
+from typing import Iterable, Iterator, Optional, Tuple, Union
+from PyPDF2 import PdfReader
+import docx
+
+
+def iter_pdf_pages(source: Union[str, PdfReader]) -> Iterator[str]:
+    """
+    Yield the text of each PDF page lazily
+
+    Pages are only extracted as the caller asks for them, so stopping
+    early skips the remaining pages entirely. Pages without a text layer
+    (extract_text() returning None) yield an empty string.
+
+    Args:
+        source: Path to the PDF, or an already opened PdfReader
+    """
+    reader = source if isinstance(source, PdfReader) else PdfReader(source)
+    for page in reader.pages:
+        yield page.extract_text() or ""
+
+
+def iter_docx_paragraphs(file_path: str) -> Iterator[str]:
+    """Yield the text of each DOCX paragraph"""
+    document = docx.Document(file_path)
+    for paragraph in document.paragraphs:
+        yield paragraph.text
+
+
+def join_within_budget(parts: Iterable[str], max_chars: Optional[int] = None,
+                       separator: str = "\n") -> Tuple[str, bool]:
+    """
+    Join text parts until a character budget is reached
+
+    Parts are collected in a list and joined once, avoiding quadratic
+    string concatenation, and the source iterator is not consumed past
+    the part that fills the budget.
+
+    Args:
+        parts: Iterable of text fragments (e.g. pages or paragraphs)
+        max_chars: Character budget (None or 0 = unlimited)
+        separator: Inserted between parts
+
+    Returns:
+        Tuple of (joined and stripped text, whether it was truncated)
+    """
+    collected = []
+    length = 0
+    truncated = False
+    for part in parts:
+        if max_chars and length + len(part) > max_chars:
+            collected.append(part[:max(0, max_chars - length)])
+            truncated = True
+            break
+        collected.append(part)
+        length += len(part) + len(separator)
+    return separator.join(collected).strip(), truncated
+
+
+def extract_pdf_text(file_path: str, max_chars: Optional[int] = None) -> str:
+    """Extract PDF text, stopping once max_chars characters have been read"""
+    text, _ = join_within_budget(iter_pdf_pages(file_path), max_chars)
+    return text
+
+
+def extract_docx_text(file_path: str, max_chars: Optional[int] = None) -> str:
+    """Extract DOCX text, stopping once max_chars characters have been read"""
+    text, _ = join_within_budget(iter_docx_paragraphs(file_path), max_chars)
+    return text